@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-model performance report from Llamita's analytics log
+
+Summarizes the per-turn timings recorded when ANALYTICS_ENABLED = True
+(time to first token, tokens/s, retrieval time, cache hits) so models can be
+compared on real usage.
+
+Usage:
+    python scripts/analytics_report.py
+    python scripts/analytics_report.py --period week
+    python scripts/analytics_report.py --file /path/to/llamita_analytics.jsonl --json
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import date
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics import Analytics, add_turn, model_stats_summary, new_model_stats
+
+
+def period_of(timestamp: str, period: str) -> str:
+    """Label of the day or ISO week a timestamp belongs to"""
+    day = timestamp[:10]
+    if period == "day" or not day:
+        return day or "unknown"
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def models_by_period(analytics: Analytics, period: str) -> dict:
+    """Stream the log and aggregate turn events per period and model"""
+    periods = {}
+    for event in analytics.iter_events():
+        if event.get("event") != "turn":
+            continue
+        label = period_of(str(event.get("timestamp", "")), period)
+        model_stats = periods.setdefault(label, {}).setdefault(event.get("model", "unknown"), new_model_stats())
+        add_turn(model_stats, event)
+    return {
+        label: {model: model_stats_summary(model_stats) for model, model_stats in models.items()}
+        for label, models in sorted(periods.items())
+    }
+
+
+def print_table(models: dict):
+    header = f"   {'model':22s} {'turns':>6s} {'cache':>6s} {'retr p50':>9s} {'ttft p50':>9s} {'ttft p95':>9s} {'tok/s p50':>10s} {'total p50':>10s}"
+    print(header)
+    print("   " + "-" * (len(header) - 3))
+
+    measured = {model: stats for model, stats in models.items() if stats["ttft_ms"]["count"]}
+    fastest = min(measured, key=lambda model: measured[model]["ttft_ms"]["p50"]) if measured else None
+
+    for model, stats in sorted(models.items(), key=lambda item: -item[1]["turns"]):
+        marker = " ⭐" if model == fastest and len(measured) > 1 else ""
+        print(f"   {model:22s} {stats['turns']:6d} {stats['cache_hit_rate']:6.0%} "
+              f"{stats['retrieval_ms']['p50']:9.1f} {stats['ttft_ms']['p50']:9.0f} {stats['ttft_ms']['p95']:9.0f} "
+              f"{stats['tokens_per_s']['p50']:10.1f} {stats['generation_ms']['p50']:10.0f}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Llamita performance per model")
+    parser.add_argument("--file", help="Analytics log (default: ANALYTICS_FILE from config.py)")
+    parser.add_argument("--period", choices=["all", "day", "week"], default="all",
+                        help="Group turns by day or ISO week instead of over all time")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    analytics_file = args.file
+    if not analytics_file:
+        import config
+        analytics_file = getattr(config, 'ANALYTICS_FILE', "llamita_analytics.jsonl")
+    analytics = Analytics(enabled=False, analytics_file=analytics_file)
+
+    if args.period == "all":
+        report = {"all time": analytics.get_usage_stats().get("models", {})}
+    else:
+        report = models_by_period(analytics, args.period)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    if not any(report.values()):
+        print(f"📊 No chat turns recorded in {analytics_file} (set ANALYTICS_ENABLED = True in config.py)")
+        return
+
+    for label, models in report.items():
+        print(f"\n📊 {label}  (times in ms)")
+        print_table(models)
+    print("\n⭐ = lowest median time to first token")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
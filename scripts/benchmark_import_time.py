@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Cold import time benchmark for Llamita modules
+Runs each import in a fresh interpreter with -X importtime
+"""
+
+import os
+import re
+import argparse
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+MODULES = ["voice_assistant", "document_processor", "google_docs_processor"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(.+)")
+
+
+def measure_import(module_name, runs=5):
+    """
+    Import a module in fresh interpreters and parse the -X importtime report
+
+    Returns:
+        Tuple of (best cumulative import time in ms, list of (module, self ms) for the run)
+    """
+    best_total = None
+    best_breakdown = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+        total = None
+        breakdown = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, _, name = match.groups()
+            breakdown.append((name.strip(), int(self_us) / 1000))
+            if name.strip() == module_name:
+                total = int(cumulative_us) / 1000
+
+        if total is not None and (best_total is None or total < best_total):
+            best_total = total
+            best_breakdown = breakdown
+    return best_total, best_breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time benchmark")
+    parser.add_argument("modules", nargs="*", default=MODULES,
+                        help=f"Modules to import from src/ (default: {' '.join(MODULES)})")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (the best run is reported)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imported modules to list per module")
+    args = parser.parse_args()
+
+    print(f"🚀 Measuring cold import time (best of {args.runs} runs)...\n")
+
+    for module_name in args.modules:
+        try:
+            total_ms, breakdown = measure_import(module_name, args.runs)
+        except RuntimeError as e:
+            print(f"❌ {module_name}: {e}")
+            continue
+
+        print(f"📦 {module_name}: {total_ms:.1f} ms")
+        for name, self_ms in sorted(breakdown, key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"   {self_ms:7.1f} ms  {name}")
+        print()
+
+    print("💡 Heavy document backends (PyPDF2, docx, pandas) should not appear above;")
+    print("   they are imported the first time a document of that format is processed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Ingestion and retrieval microbenchmarks for DocumentProcessor
+
+Feeds a synthetic corpus through DocumentProcessor's upload path and reports
+ingestion/save/load throughput, query rate and memory high-water mark.
+
+Usage:
+    python scripts/benchmark_retrieval.py --docs 500 --zipf 1.2 --queries 300
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from synthetic_corpus import SyntheticCorpus, ingest_corpus, load_library
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_benchmark(corpus, query_count, storage_dir, trace_memory=False):
+    """
+    Run the ingestion and retrieval phases
+    
+    Args:
+        corpus: SyntheticCorpus to ingest
+        query_count: Number of queries to run
+        storage_dir: Empty directory used as document storage
+        trace_memory: Track Python allocations with tracemalloc (slows every phase down)
+
+    Returns:
+        Dict of results per phase
+    """
+    from document_processor import DocumentProcessor
+
+    results = {}
+    documents = list(corpus.documents())
+    total_mb = sum(len(text) for _, text in documents) / (1024 * 1024)
+    results["corpus"] = {
+        "documents": len(documents),
+        "size_mb": round(total_mb, 2),
+        "vocab_size": corpus.vocab_size,
+        "zipf_skew": corpus.zipf_skew
+    }
+
+    if trace_memory:
+        tracemalloc.start()
+
+    # Ingest through the upload path: extract, normalize, chunk and save every document
+    processor = DocumentProcessor(storage_dir)
+    _, elapsed = ingest_corpus(processor, corpus, storage_dir + "_source")
+    results["ingestion"] = {
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(total_mb / elapsed, 2),
+        "chunks": sum(len(chunks) for chunks in processor.document_chunks.values())
+    }
+
+    # Rewrite the whole library
+    start_time = time.perf_counter()
+    processor.save_documents()
+    elapsed = time.perf_counter() - start_time
+    storage_bytes = sum(entry.stat().st_size for entry in os.scandir(storage_dir) if entry.is_file())
+    results["save_documents"] = {
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(total_mb / elapsed, 2),
+        "storage_mb": round(storage_bytes / (1024 * 1024), 2)
+    }
+
+    # Reload from disk
+    processor = DocumentProcessor(storage_dir)
+    _, load_ms = load_library(processor)
+    elapsed = load_ms / 1000
+    results["load_documents"] = {
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(total_mb / elapsed, 2)
+    }
+
+    # Query
+    queries = corpus.queries(query_count)
+    for label, cached in (("uncached", False), ("cached", True)):
+        elapsed = 0.0
+        for query in queries:
+            processor.context_cache.clear()
+            if cached:
+                processor.get_document_context(query)
+            start_time = time.perf_counter()
+            processor.get_document_context(query)
+            elapsed += time.perf_counter() - start_time
+        results[f"query_{label}"] = {
+            "queries": len(queries),
+            "queries_per_s": round(len(queries) / elapsed, 1),
+            "mean_ms": round(elapsed / len(queries) * 1000, 3)
+        }
+
+    results["memory"] = {"process_peak_rss_mb": peak_rss_mb()}
+    if trace_memory:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["memory"]["python_peak_mb"] = round(traced_peak / (1024 * 1024), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DocumentProcessor ingestion and retrieval benchmark")
+    parser.add_argument("--docs", type=int, default=200, help="Number of documents")
+    parser.add_argument("--doc-size", type=int, default=8000, help="Average document size in characters")
+    parser.add_argument("--vocab", type=int, default=5000, help="Vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf skew of word frequencies")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report the Python allocation peak (tracemalloc, slows the run down)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(args.docs, args.doc_size, args.vocab, args.zipf, args.seed)
+    storage_dir = tempfile.mkdtemp(prefix="llamita_retrieval_bench_")
+    print(f"🚀 Benchmarking {args.docs} documents (zipf={args.zipf}, vocab={args.vocab})...\n")
+    try:
+        results = run_benchmark(corpus, args.queries, storage_dir, trace_memory=args.trace_memory)
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+        shutil.rmtree(storage_dir + "_source", ignore_errors=True)
+
+    print(f"📚 Corpus:        {results['corpus']['documents']} docs, {results['corpus']['size_mb']} MB")
+    print(f"✂️  Ingestion:     {results['ingestion']['mb_per_s']} MB/s ({results['ingestion']['chunks']} chunks)")
+    print(f"💾 Save:          {results['save_documents']['mb_per_s']} MB/s ({results['save_documents']['storage_mb']} MB on disk)")
+    print(f"📂 Load:          {results['load_documents']['mb_per_s']} MB/s")
+    print(f"🔍 Queries:       {results['query_uncached']['queries_per_s']} q/s uncached, "
+          f"{results['query_cached']['queries_per_s']} q/s cached")
+    memory_line = f"🧠 Memory peak:   {results['memory']['process_peak_rss_mb']} MB RSS"
+    if "python_peak_mb" in results["memory"]:
+        memory_line += f", {results['memory']['python_peak_mb']} MB traced"
+    print(memory_line)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
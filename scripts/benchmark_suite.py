@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Headless startup and document pipeline benchmark suite for Llamita
+
+Usage:
+    python scripts/benchmark_suite.py --output results.json
+    python scripts/benchmark_suite.py --baseline baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from benchmark_import_time import measure_import
+from metrics import percentile
+from synthetic_corpus import SyntheticCorpus, ingest_corpus, load_library
+
+LIBRARY_SIZES = [10, 100, 1000]
+LOAD_REPEATS = 5  # Best of several runs keeps small timings stable
+RETRIEVAL_QUERIES = 200
+NOISE_FLOOR_MS = 1.0  # Smaller differences between timings are never reported as regressions
+
+
+def build_library(storage_dir, doc_count, seed=42):
+    """Add a synthetic document library to a storage directory through the upload path"""
+    from document_processor import DocumentProcessor
+
+    corpus = SyntheticCorpus(doc_count=doc_count, doc_size=7000, seed=seed)
+    ingest_corpus(DocumentProcessor(storage_dir), corpus, storage_dir + "_source")
+
+
+def bench_import_time(results):
+    """Cold import time of the main modules"""
+    for module_name in ["voice_assistant", "document_processor"]:
+        total_ms, _ = measure_import(module_name, runs=3)
+        results[f"import.{module_name}_ms"] = {"value": round(total_ms, 2), "better": "lower"}
+
+
+def bench_first_interactive(results):
+    """Time from constructing VoiceAssistant until the loading screen is gone"""
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"⚠️ Skipping first-interactive benchmark (no display): {e}")
+        return
+
+    import config
+    config.WARM_UP_MODEL = False
+    from voice_assistant import VoiceAssistant
+
+    root.withdraw()
+    start_time = time.perf_counter()
+    app = VoiceAssistant(root)
+    deadline = start_time + 30
+    while time.perf_counter() < deadline:
+        root.update()
+        if getattr(app, '_startup_finished', False) or getattr(app, 'loading_window', None) is None:
+            break
+        time.sleep(0.001)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    root.destroy()
+
+    results["startup.first_interactive_ms"] = {"value": round(elapsed_ms, 2), "better": "lower"}
+
+
+def bench_load_documents(results, work_dir):
+    """Loading synthetic libraries of several sizes"""
+    from document_processor import DocumentProcessor
+
+    for doc_count in LIBRARY_SIZES:
+        storage_dir = os.path.join(work_dir, f"library_{doc_count}")
+        build_library(storage_dir, doc_count)
+
+        metadata_ms = total_ms = None
+        for _ in range(LOAD_REPEATS):
+            # The background chunk loader is joined, so runs cannot overlap
+            run_metadata_ms, run_total_ms = load_library(DocumentProcessor(storage_dir))
+            metadata_ms = run_metadata_ms if metadata_ms is None else min(metadata_ms, run_metadata_ms)
+            total_ms = run_total_ms if total_ms is None else min(total_ms, run_total_ms)
+
+        results[f"load_documents.{doc_count}_docs.metadata_ms"] = {"value": round(metadata_ms, 2), "better": "lower"}
+        results[f"load_documents.{doc_count}_docs.all_chunks_ms"] = {"value": round(total_ms, 2), "better": "lower"}
+
+
+def bench_retrieval(results, work_dir):
+    """Retrieval latency percentiles on the 100 document library"""
+    from document_processor import DocumentProcessor
+
+    storage_dir = os.path.join(work_dir, "library_100")
+    processor = DocumentProcessor(storage_dir)
+    load_library(processor)
+
+    queries = SyntheticCorpus(doc_count=100, doc_size=7000).queries(RETRIEVAL_QUERIES)
+
+    for label, cached in (("uncached", False), ("cached", True)):
+        latencies = []
+        for query in queries:
+            processor.context_cache.clear()
+            if cached:
+                processor.get_document_context(query)
+            start_time = time.perf_counter()
+            processor.get_document_context(query)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            results[f"retrieval.{label}.{name}_ms"] = {
+                "value": round(percentile(latencies, fraction), 3),
+                "better": "lower"
+            }
+
+
+def bench_chunking(results):
+    """Chunking throughput in MB/s"""
+    from document_processor import DocumentProcessor
+
+    processor = DocumentProcessor(tempfile.mkdtemp(prefix="llamita_chunking_"))
+    texts = [text for _, text in SyntheticCorpus(doc_count=50, doc_size=40000, seed=3).documents()]
+
+    start_time = time.perf_counter()
+    for text in texts:
+        processor._create_chunks_ultra_fast(text)
+    elapsed = time.perf_counter() - start_time
+    shutil.rmtree(processor.storage_dir, ignore_errors=True)
+
+    megabytes = sum(len(text) for text in texts) / (1024 * 1024)
+    results["chunking.throughput_mb_s"] = {"value": round(megabytes / elapsed, 2), "better": "higher"}
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Compare results with a stored baseline
+
+    Returns:
+        List of (metric, baseline value, current value, change) for regressions
+    """
+    regressions = []
+    for metric, current in results.items():
+        previous = baseline.get(metric)
+        if not previous or not previous.get("value"):
+            continue
+        if metric.endswith("_ms") and abs(current["value"] - previous["value"]) < NOISE_FLOOR_MS:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        if current.get("better") == "higher":
+            change = -change
+        if change > threshold:
+            regressions.append((metric, previous["value"], current["value"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Llamita benchmark suite")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results stored in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before a metric counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    print("🚀 Starting Llamita benchmark suite...\n")
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="llamita_bench_")
+    cwd = os.getcwd()
+    try:
+        # Keep any files the app writes out of the repository
+        os.chdir(work_dir)
+        benchmarks = [
+            ("Cold import time", lambda: bench_import_time(results)),
+            ("First interactive", lambda: bench_first_interactive(results)),
+            ("Load documents", lambda: bench_load_documents(results, work_dir)),
+            ("Retrieval latency", lambda: bench_retrieval(results, work_dir)),
+            ("Chunking throughput", lambda: bench_chunking(results)),
+        ]
+        for name, benchmark in benchmarks:
+            print(f"🧪 {name}...")
+            benchmark()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    for metric, result in sorted(results.items()):
+        print(f"   {metric:45s} {result['value']:>10}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for metric, previous, current, change in regressions:
+                print(f"   {metric}: {previous} -> {current} ({change:+.0%})")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} compared to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
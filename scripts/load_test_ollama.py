@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Load driver for Llamita's Ollama client layer
+
+Runs many concurrent conversations through ChatEngine, one Session each, and
+reports latency percentiles. Starts local mock Ollama servers unless --url is given; with
+several servers (--backends, or --url repeated) requests are balanced across them.
+
+Usage:
+    python scripts/load_test_ollama.py --conversations 8 --turns 5
+    python scripts/load_test_ollama.py --url http://localhost:11434/api/generate --model llama3.2:1b
+    python scripts/load_test_ollama.py --backends 3 --conversations 12
+
+Requests go through the same scheduler as the app (OLLAMA_MAX_PARALLEL per
+server from config.py), so the results show the concurrency the app really gets.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+
+from backend_pool import BackendPool
+from chat_engine import ChatEngine
+from metrics import percentile
+from ollama_client import OllamaClient
+from mock_ollama_server import MockOllamaConfig, MockOllamaServer
+
+QUESTIONS = [
+    "What is the refund policy?",
+    "Can you summarize the last report?",
+    "How do I reset my password?",
+    "What are the shipping options?",
+    "Explain the warranty terms.",
+    "Who should I contact for billing questions?"
+]
+
+
+def run_conversation(engine, conversation_id, turns, latencies, errors, lock):
+    """Run one conversation through the chat engine with its own session, like the app does"""
+    session = engine.new_session(f"load-{conversation_id}")
+    for turn in range(turns):
+        question = QUESTIONS[(conversation_id + turn) % len(QUESTIONS)]
+
+        start_time = time.perf_counter()
+        try:
+            answer = engine.chat(session, question)
+        except requests.exceptions.RequestException:
+            answer = None
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        with lock:
+            if answer is None:
+                errors.append(elapsed_ms)
+            else:
+                latencies.append(elapsed_ms)
+
+
+def run_load_test(urls, model, conversations, turns):
+    """
+    Fire concurrent conversations against one or more Ollama endpoints
+
+    Args:
+        urls: Ollama URLs (more than one balances requests with a BackendPool)
+
+    Returns:
+        Dict with request counts, throughput and latency percentiles
+    """
+    pool = None
+    if len(urls) > 1:
+        pool = BackendPool(urls)
+        pool.check_health()
+    engine = ChatEngine(OllamaClient(urls[0], pool=pool), model, timeout=60)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=conversations) as executor:
+        futures = [executor.submit(run_conversation, engine, conversation_id, turns, latencies, errors, lock)
+                   for conversation_id in range(conversations)]
+    elapsed = time.perf_counter() - start_time
+
+    # Anything other than a failed request aborts the conversation; report it instead of losing it
+    failed_conversations = 0
+    for conversation_id, future in enumerate(futures):
+        try:
+            future.result()
+        except Exception as e:
+            failed_conversations += 1
+            print(f"❌ Conversation {conversation_id} failed: {type(e).__name__}: {e}")
+
+    total = len(latencies) + len(errors)
+    results = {
+        "conversations": conversations,
+        "turns": turns,
+        "requests": total,
+        "errors": len(errors),
+        "failed_conversations": failed_conversations,
+        "error_rate": round(len(errors) / total, 3) if total else 0.0,
+        "requests_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.5), 1),
+            "p90": round(percentile(latencies, 0.9), 1),
+            "p99": round(percentile(latencies, 0.99), 1),
+            "max": round(max(latencies), 1) if latencies else 0.0
+        }
+    }
+    if pool:
+        results["backends"] = pool.get_stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent conversation load test")
+    parser.add_argument("--url", action="append", help="Ollama generate URL, repeat for several servers "
+                                                       "(default: start local mock servers)")
+    parser.add_argument("--backends", type=int, default=1, help="Mock servers to start without --url")
+    parser.add_argument("--model", default="llama3:8b")
+    parser.add_argument("--conversations", type=int, default=8, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=5, help="Messages per conversation")
+    parser.add_argument("--ttft", type=float, default=0.1, help="Mock server time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Mock server token rate")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Mock server failure rate")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    servers = []
+    urls = args.url
+    if not urls:
+        for _ in range(max(1, args.backends)):
+            server = MockOllamaServer(config=MockOllamaConfig(
+                ttft=args.ttft,
+                tokens_per_second=args.tokens_per_second,
+                failure_rate=args.failure_rate,
+                models=[args.model]
+            )).start()
+            servers.append(server)
+            print(f"🦙 Started mock Ollama on {server.base_url}")
+        urls = [server.generate_url for server in servers]
+
+    print(f"🚀 Running {args.conversations} conversations x {args.turns} turns against {', '.join(urls)}...\n")
+    try:
+        results = run_load_test(urls, args.model, args.conversations, args.turns)
+    finally:
+        for server in servers:
+            server.stop()
+
+    latency = results["latency_ms"]
+    print(f"📨 Requests:   {results['requests']} ({results['errors']} failed, {results['requests_per_s']} req/s)")
+    if results["failed_conversations"]:
+        print(f"❌ Aborted:    {results['failed_conversations']} of {results['conversations']} conversations")
+    print(f"⏱️  Latency:    p50 {latency['p50']} ms, p90 {latency['p90']} ms, p99 {latency['p99']} ms, max {latency['max']} ms")
+    for backend in results.get("backends", []):
+        status = "✅" if backend["healthy"] else "❌"
+        print(f"{status} {backend['url']}: {backend['requests']} requests")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    return 1 if results["failed_conversations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
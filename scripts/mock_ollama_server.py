@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Ollama HTTP API, for latency and load testing
+
+Implements /api/generate, /api/chat, /api/embeddings and /api/tags with a
+configurable time-to-first-token, token rate and failure injection.
+
+Usage:
+    python scripts/mock_ollama_server.py --port 11435 --ttft 0.2 --tokens-per-second 40
+    # then point config.OLLAMA_URL at http://localhost:11435/api/generate
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockOllamaConfig:
+    def __init__(self, ttft: float = 0.1, tokens_per_second: float = 50.0, response_tokens: int = 40,
+                 failure_rate: float = 0.0, load_time: float = 0.0,
+                 models=("llama3:8b", "llama3.2:1b", "nomic-embed-text"), embedding_size: int = 64,
+                 seed: int = 0):
+        """
+        Behaviour of the mock server
+
+        Args:
+            ttft: Seconds before the first token is produced
+            tokens_per_second: Generation speed after the first token
+            response_tokens: Number of tokens in every generated answer
+            failure_rate: Fraction of requests answered with HTTP 500
+            load_time: Extra delay the first time each model is used (simulated model load)
+            models: Model names reported by /api/tags
+            embedding_size: Dimension of returned embeddings
+            seed: Seed for failure injection
+        """
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self.load_time = load_time
+        self.models = list(models)
+        self.embedding_size = embedding_size
+        self.rng = random.Random(seed)
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _should_fail(self):
+        with self.server.lock:
+            return self.mock.rng.random() < self.mock.failure_rate
+
+    def _load_model(self, model):
+        """Simulate the model load delay on first use; returns load duration in seconds"""
+        with self.server.lock:
+            first_use = model not in self.server.loaded_models
+            self.server.loaded_models.add(model)
+        if first_use and self.mock.load_time:
+            time.sleep(self.mock.load_time)
+            return self.mock.load_time
+        return 0.0
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [
+                {"name": name, "model": name, "size": 0, "digest": hashlib.sha256(name.encode()).hexdigest()}
+                for name in self.mock.models
+            ]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [{"name": name, "model": name} for name in sorted(self.server.loaded_models)]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        try:
+            data = self._read_json()
+        except ValueError:
+            self._send_json({"error": "invalid JSON"}, status=400)
+            return
+
+        if self._should_fail():
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+
+        model = data.get("model", "")
+        if self.mock.models and model not in self.mock.models:
+            self._send_json({"error": f"model '{model}' not found"}, status=404)
+            return
+
+        if self.path == "/api/generate":
+            self._generate(data, chat=False)
+        elif self.path == "/api/chat":
+            self._generate(data, chat=True)
+        elif self.path in ("/api/embeddings", "/api/embed"):
+            self._embeddings(data)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _generate(self, data, chat):
+        model = data.get("model", "")
+        if chat:
+            prompt = " ".join(message.get("content", "") for message in data.get("messages", []))
+        else:
+            prompt = data.get("prompt", "")
+
+        load_duration = self._load_model(model)
+
+        # An empty prompt only loads the model, like Ollama does
+        if not prompt and not chat:
+            self._send_json({"model": model, "created_at": _now(), "response": "", "done": True,
+                             "done_reason": "load", "load_duration": int(load_duration * 1e9)})
+            return
+
+        request_start = time.perf_counter()
+        prompt_tokens = max(1, len(prompt.split()))
+        tokens = [f"token{i} " for i in range(self.mock.response_tokens)]
+        token_interval = 1.0 / self.mock.tokens_per_second if self.mock.tokens_per_second else 0.0
+
+        def chunk(text, done=False):
+            payload = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                payload["message"] = {"role": "assistant", "content": text}
+            else:
+                payload["response"] = text
+            return payload
+
+        def final_stats(payload, eval_started):
+            total = time.perf_counter() - request_start
+            payload.update({
+                "done_reason": "stop",
+                "total_duration": int((total + load_duration) * 1e9),
+                "load_duration": int(load_duration * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(self.mock.ttft * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": int((time.perf_counter() - eval_started) * 1e9)
+            })
+            return payload
+
+        time.sleep(self.mock.ttft)
+        eval_started = time.perf_counter()
+
+        if data.get("stream", True):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for index, token in enumerate(tokens):
+                    if index:
+                        time.sleep(token_interval)
+                    self._write_chunk(chunk(token))
+                self._write_chunk(final_stats(chunk("", done=True), eval_started))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+
+        time.sleep(token_interval * max(0, len(tokens) - 1))
+        self._send_json(final_stats(chunk("".join(tokens).strip(), done=True), eval_started))
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode('utf-8')
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def _embeddings(self, data):
+        text = data.get("prompt", data.get("input", ""))
+        self._load_model(data.get("model", ""))
+        # Deterministic pseudo-embedding: the same text always maps to the same vector
+        rng = random.Random(hashlib.sha256(str(text).encode()).hexdigest())
+        vector = [rng.uniform(-1, 1) for _ in range(self.mock.embedding_size)]
+        if self.path == "/api/embed":
+            self._send_json({"model": data.get("model", ""), "embeddings": [vector]})
+        else:
+            self._send_json({"embedding": vector})
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MockOllamaServer:
+    """Mock Ollama server running in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: MockOllamaConfig = None):
+        self.httpd = ThreadingHTTPServer((host, port), MockOllamaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = config or MockOllamaConfig()
+        self.httpd.lock = threading.Lock()
+        self.httpd.loaded_models = set()
+        self.httpd.request_count = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def generate_url(self) -> str:
+        return f"{self.base_url}/api/generate"
+
+    @property
+    def request_count(self) -> int:
+        return self.httpd.request_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server for latency and load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.1, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail with HTTP 500")
+    parser.add_argument("--load-time", type=float, default=0.0, help="Simulated model load time on first use")
+    parser.add_argument("--models", default="llama3:8b,llama3.2:1b,nomic-embed-text")
+    args = parser.parse_args()
+
+    config = MockOllamaConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        failure_rate=args.failure_rate,
+        load_time=args.load_time,
+        models=[name for name in args.models.split(",") if name]
+    )
+    server = MockOllamaServer(args.host, args.port, config)
+    print(f"🦙 Mock Ollama listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mock Ollama stopped")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic document corpus for Llamita benchmarks
+
+Word frequencies follow a Zipf distribution so that, like real documents, a few
+words are very common and most are rare.
+
+Usage:
+    python scripts/synthetic_corpus.py --docs 100 --output-dir /tmp/corpus
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+import contextlib
+from typing import Iterator, List, Tuple
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ren", "ta", "vu", "sel", "dor", "pi", "na",
+    "qua", "bri", "zo", "fen", "ul", "mar", "tis", "ge", "ho", "ly"
+]
+
+
+class SyntheticCorpus:
+    def __init__(self, doc_count: int = 100, doc_size: int = 8000, vocab_size: int = 5000,
+                 zipf_skew: float = 1.1, seed: int = 42):
+        """
+        Initialize the corpus generator
+
+        Args:
+            doc_count: Number of documents to generate
+            doc_size: Average document size in characters (actual sizes vary +/- 50%)
+            vocab_size: Number of distinct words
+            zipf_skew: Zipf exponent; higher values concentrate usage on fewer words
+            seed: Random seed, the same arguments always produce the same corpus
+        """
+        self.doc_count = doc_count
+        self.doc_size = doc_size
+        self.vocab_size = vocab_size
+        self.zipf_skew = zipf_skew
+        self.seed = seed
+        self.vocabulary = self._build_vocabulary()
+
+        weights = [1.0 / (rank ** zipf_skew) for rank in range(1, vocab_size + 1)]
+        self._cum_weights = list(itertools.accumulate(weights))
+
+    def _build_vocabulary(self) -> List[str]:
+        """Create distinct pseudo-words, shortest first so common words are short"""
+        words = []
+        length = 1
+        while len(words) < self.vocab_size:
+            for combination in itertools.product(SYLLABLES, repeat=length):
+                words.append("".join(combination))
+                if len(words) == self.vocab_size:
+                    break
+            length += 1
+        return words
+
+    def _words(self, rng: random.Random, count: int) -> List[str]:
+        return rng.choices(self.vocabulary, cum_weights=self._cum_weights, k=count)
+
+    def _make_text(self, rng: random.Random, length: int) -> str:
+        sentences = []
+        size = 0
+        while size < length:
+            words = self._words(rng, rng.randint(6, 18))
+            sentence = " ".join(words).capitalize() + rng.choice([". ", ". ", ". ", "? ", "! "])
+            if rng.random() < 0.1:
+                sentence += "\n\n"
+            sentences.append(sentence)
+            size += len(sentence)
+        return "".join(sentences)[:length]
+
+    def documents(self) -> Iterator[Tuple[str, str]]:
+        """Yield (filename, text) for every document in the corpus"""
+        rng = random.Random(self.seed)
+        for index in range(self.doc_count):
+            length = max(200, int(self.doc_size * rng.uniform(0.5, 1.5)))
+            yield f"synthetic_{index:05d}.txt", self._make_text(rng, length)
+
+    def queries(self, count: int, min_terms: int = 2, max_terms: int = 6) -> List[str]:
+        """Generate queries drawn from the same word distribution as the documents"""
+        rng = random.Random(self.seed + 1)
+        return [" ".join(self._words(rng, rng.randint(min_terms, max_terms))) for _ in range(count)]
+
+    def write_files(self, directory: str) -> List[str]:
+        """Write the corpus as .txt files and return their paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for filename, text in self.documents():
+            path = os.path.join(directory, filename)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            paths.append(path)
+        return paths
+
+
+def ingest_corpus(processor, corpus: SyntheticCorpus, source_dir: str) -> Tuple[List[str], float]:
+    """
+    Add a corpus to a DocumentProcessor the way uploads do
+
+    The documents are written as .txt files first (not timed), then each one
+    goes through process_document (extract, normalize, chunk, save).
+    Per-document log lines are suppressed so printing is not measured.
+
+    Returns:
+        Tuple of (document ids, seconds spent in process_document)
+    """
+    paths = corpus.write_files(source_dir)
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        doc_ids = [processor.process_document(path) for path in paths]
+    elapsed = time.perf_counter() - start_time
+    missing = doc_ids.count(None)
+    if missing:
+        raise RuntimeError(f"{missing} synthetic documents could not be ingested")
+    return doc_ids, elapsed
+
+
+def load_library(processor) -> Tuple[float, float]:
+    """
+    Load a stored library like the app does and wait for every chunk file
+
+    load_documents() reads the metadata and starts a background chunk loader;
+    the loader is joined, so nothing is still reading when the caller moves on
+    (or deletes the directory). Log lines are suppressed.
+
+    Returns:
+        Tuple of (milliseconds until the metadata was loaded, milliseconds until all chunks were)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        processor.load_documents()
+        metadata_ms = (time.perf_counter() - start_time) * 1000
+        processor.wait_for_chunks()
+        total_ms = (time.perf_counter() - start_time) * 1000
+    return metadata_ms, total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic document corpus")
+    parser.add_argument("--docs", type=int, default=100, help="Number of documents")
+    parser.add_argument("--doc-size", type=int, default=8000, help="Average document size in characters")
+    parser.add_argument("--vocab", type=int, default=5000, help="Vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf skew of word frequencies")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output-dir", required=True, help="Directory to write .txt files into")
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(args.docs, args.doc_size, args.vocab, args.zipf, args.seed)
+    paths = corpus.write_files(args.output_dir)
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    print(f"✅ Wrote {len(paths)} documents ({total_bytes / 1024 / 1024:.1f} MB) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for spreading Ollama requests across several servers
+Uses the mock Ollama server, so no real Ollama is needed
+"""
+
+import os
+import sys
+import time
+import shutil
+import socket
+import tempfile
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+
+from backend_pool import BackendPool
+from chat_engine import ChatEngine
+from metrics import registry
+from ollama_client import OllamaClient
+from request_scheduler import INTERACTIVE, RequestScheduler
+from session_manager import SessionManager
+from mock_ollama_server import MockOllamaConfig, MockOllamaServer
+
+MODEL = "llama3:8b"
+
+
+def unused_url():
+    """URL of a port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/generate"
+
+
+def start_server(ttft=0.01):
+    return MockOllamaServer(config=MockOllamaConfig(ttft=ttft, tokens_per_second=1000, response_tokens=5,
+                                                    models=[MODEL])).start()
+
+
+def run_concurrent(function, count):
+    """Call function from count threads at once"""
+    threads = [threading.Thread(target=function) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+
+def test_scaling():
+    """Scheduler limits follow the number of healthy backends"""
+    print("\n1️⃣ Capacity per backend")
+    servers = [start_server(ttft=0.3) for _ in range(3)]
+    try:
+        pool = BackendPool([server.generate_url for server in servers])
+        scheduler = RequestScheduler(max_in_flight={INTERACTIVE: 2}, max_parallel=2)
+        client = OllamaClient(servers[0].base_url, scheduler=scheduler, pool=pool)
+        assert scheduler.backends == 3
+        assert scheduler.get_stats()[INTERACTIVE]["max_in_flight"] == 6
+
+        start_time = time.perf_counter()
+        run_concurrent(lambda: client.generate("Hello", MODEL, timeout=10), 6)
+        elapsed = time.perf_counter() - start_time
+        assert elapsed < 0.55, f"6 requests on 3 servers took {elapsed:.2f}s"
+        assert [backend.requests for backend in pool.backends] == [2, 2, 2]
+        print(f"   ✅ 6 requests on 3 servers ran in one wave ({elapsed:.2f}s)")
+
+        pool.mark_down(pool.backends[2], ConnectionError("test"))
+        assert scheduler.backends == 2
+        scheduler.set_backends(0)
+        assert scheduler.backends == 1
+        print("   ✅ Capacity shrinks when a backend goes down")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def test_failover():
+    """A request moves to the next backend when one cannot be reached"""
+    print("\n2️⃣ Failover")
+    model = MODEL
+    server = start_server()
+    try:
+        pool = BackendPool([unused_url(), server.generate_url])
+        scheduler = RequestScheduler(max_parallel=1)
+        client = OllamaClient(pool.backends[0].base_url, scheduler=scheduler, pool=pool)
+        assert scheduler.backends == 2
+
+        failovers = registry.counter("ollama_failovers_total").value
+        result = client.generate("Hello", model, timeout=10)
+        assert result is not None and result["response"]
+        assert registry.counter("ollama_failovers_total").value == failovers + 1
+        dead, alive = pool.backends
+        assert not dead.healthy and alive.healthy
+        assert alive.requests == 1 and alive.has_loaded(model)
+        assert scheduler.backends == 1
+        print("   ✅ Unreachable backend marked down, request answered by the other one")
+
+        assert client.generate("Hello again", model, timeout=10) is not None
+        assert dead.requests == 1 and alive.requests == 2
+        print("   ✅ Later requests skip the backend that is down")
+    finally:
+        server.stop()
+
+    try:
+        client.generate("Anyone there?", model, timeout=2)
+        raise AssertionError("generate should fail when every backend is down")
+    except requests.exceptions.ConnectionError:
+        pass
+    assert pool.healthy_count() == 0
+    print("   ✅ ConnectionError once every backend has failed")
+
+
+def test_session_manager():
+    """API chat turns are not held back by a fixed number of chat workers"""
+    print("\n3️⃣ Sessions across backends")
+    servers = [start_server(ttft=0.3) for _ in range(3)]
+    storage_dir = tempfile.mkdtemp(prefix="llamita_sessions_")
+    try:
+        pool = BackendPool([server.generate_url for server in servers])
+        scheduler = RequestScheduler(max_in_flight={INTERACTIVE: 2}, max_parallel=2)
+        client = OllamaClient(servers[0].base_url, scheduler=scheduler, pool=pool)
+        manager = SessionManager(ChatEngine(client, MODEL), storage_dir=storage_dir)
+        assert manager.scheduler.max_concurrent == 6
+
+        sessions = [manager.create_session() for _ in range(6)]
+        start_time = time.perf_counter()
+        futures = [manager.chat(session, "Hello") for session in sessions]
+        answers = [future.result(timeout=10) for future in futures]
+        elapsed = time.perf_counter() - start_time
+        assert all(answers)
+        assert elapsed < 0.55, f"6 sessions on 3 servers took {elapsed:.2f}s"
+        print(f"   ✅ 6 sessions on 3 servers answered in one wave ({elapsed:.2f}s)")
+
+        pool.mark_down(pool.backends[2], ConnectionError("test"))
+        assert manager.scheduler.max_concurrent == 4
+        print("   ✅ Chat workers follow the number of healthy backends")
+    finally:
+        for server in servers:
+            server.stop()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+
+def main():
+    print("🧪 Testing Backend Pool")
+    print("=" * 40)
+
+    try:
+        test_scaling()
+        test_failover()
+        test_session_manager()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("\n🎉 Backend pool tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
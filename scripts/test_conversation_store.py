@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the append-only conversation store
+Covers ranged reads, index repair after a crash and retrying failed writes
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import conversation_store
+from conversation_store import OFFSET, ConversationStore
+
+
+def write_conversation(directory, conversation_id, count):
+    """Store count messages and close the store so everything is on disk"""
+    store = ConversationStore(directory, flush_interval=0.01)
+    for number in range(count):
+        store.append(conversation_id, "user" if number % 2 == 0 else "assistant", f"message {number}")
+    store.close()
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+def test_ranged_reads(directory):
+    """load_range reads any slice, including messages still waiting for the writer"""
+    print("\n1️⃣ Ranged reads")
+    write_conversation(directory, "ranges", 100)
+
+    store = ConversationStore(directory, flush_interval=60)
+    assert store.count("ranges") == 100
+    assert contents(store.load_range("ranges", 0, 3)) == ["message 0", "message 1", "message 2"]
+    assert contents(store.load_range("ranges", 97)) == ["message 97", "message 98", "message 99"]
+    assert contents(store.load_range("ranges", 40, 42)) == ["message 40", "message 41"]
+    assert store.load_range("ranges", 100, 120) == []
+    assert contents(store.load_recent("ranges", 2)) == ["message 98", "message 99"]
+    print("   ✅ Slices of stored messages are read through the index")
+
+    # The writer waits up to a minute, so these are only pending
+    store.append("ranges", "user", "pending 100")
+    store.append("ranges", "assistant", "pending 101")
+    assert store.count("ranges") == 102
+    assert contents(store.load_range("ranges", 99, 102)) == ["message 99", "pending 100", "pending 101"]
+    print("   ✅ Pending messages are visible before they are written")
+
+    store.close()
+    reopened = ConversationStore(directory)
+    assert contents(reopened.load_recent("ranges", 3)) == ["message 99", "pending 100", "pending 101"]
+    print("   ✅ Pending messages are written on close")
+
+
+def test_index_repair(directory):
+    """A missing or torn index is rebuilt and a half-written last line is dropped"""
+    print("\n2️⃣ Index repair")
+    write_conversation(directory, "repair", 10)
+    data_file = os.path.join(directory, "repair.jsonl")
+    index_file = os.path.join(directory, "repair.idx")
+
+    os.remove(index_file)
+    store = ConversationStore(directory)
+    assert store.count("repair") == 10
+    assert contents(store.load_range("repair", 9, 10)) == ["message 9"]
+    print("   ✅ Missing index rebuilt from the data file")
+
+    # Crash in the middle of writing an offset
+    with open(index_file, 'ab') as f:
+        f.write(b"\x01\x02\x03")
+    store = ConversationStore(directory)
+    assert store.count("repair") == 10
+    assert os.path.getsize(index_file) == 10 * OFFSET.size
+    print("   ✅ Torn index entry removed")
+
+    # Crash in the middle of writing a message
+    size = os.path.getsize(data_file)
+    with open(data_file, 'ab') as f:
+        f.write(b'{"role":"user","content":"half wri')
+    store = ConversationStore(directory)
+    assert store.count("repair") == 10
+    assert os.path.getsize(data_file) == size
+    print("   ✅ Half-written message cut off")
+
+    store.append("repair", "user", "after repair")
+    store.close()
+    store = ConversationStore(directory)
+    assert contents(store.load_recent("repair", 2)) == ["message 9", "after repair"]
+    print("   ✅ New messages are appended after the repaired ones")
+
+
+def test_write_retry(directory):
+    """A failed write keeps the messages pending and the writer tries again"""
+    print("\n3️⃣ Retrying failed writes")
+    original_fsync = os.fsync
+    original_interval = conversation_store.RETRY_INTERVAL
+    failures = []
+
+    def failing_fsync(fd):
+        if not failures:
+            failures.append(fd)
+            raise OSError("disk full")
+        original_fsync(fd)
+
+    conversation_store.os.fsync = failing_fsync
+    conversation_store.RETRY_INTERVAL = 0.05
+    try:
+        store = ConversationStore(directory, flush_interval=0.01)
+        store.append("retry", "user", "first")
+        store.append("retry", "assistant", "second")
+        store.flush()
+        assert failures, "the write should have failed once"
+        # Readers still see the messages while they wait for the retry
+        assert contents(store.load_range("retry", 0)) == ["first", "second"]
+        store.close()
+    finally:
+        conversation_store.os.fsync = original_fsync
+        conversation_store.RETRY_INTERVAL = original_interval
+
+    reopened = ConversationStore(directory)
+    assert contents(reopened.load_range("retry", 0)) == ["first", "second"]
+    assert os.path.getsize(os.path.join(directory, "retry.idx")) == 2 * OFFSET.size
+    print("   ✅ Messages saved once, after the failed write was rolled back")
+
+
+def main():
+    print("🧪 Testing Conversation Store")
+    print("=" * 40)
+
+    directory = tempfile.mkdtemp(prefix="llamita_conversations_")
+    try:
+        test_ranged_reads(directory)
+        test_index_repair(directory)
+        test_write_retry(directory)
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("\n🎉 Conversation store tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
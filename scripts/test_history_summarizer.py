@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test script for rolling conversation summaries
+Uses a stand-in Ollama client, so no real Ollama is needed
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chat_engine import Session
+from history_summarizer import HistorySummarizer, estimate_tokens, message_tokens
+
+
+class FakeClient:
+    """Answers every summary request with a fixed text, optionally waiting for a signal first"""
+
+    def __init__(self, summary="Earlier the user asked about refunds."):
+        self.summary = summary
+        self.calls = 0
+        self.prompts = []
+        self.started = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def generate(self, prompt, model, options=None, timeout=30, priority=None):
+        self.calls += 1
+        self.prompts.append(prompt)
+        self.started.set()
+        self.proceed.wait(5)
+        if self.summary is None:
+            return None
+        return {"response": self.summary}
+
+
+def fill(session, exchanges, words=40):
+    for number in range(exchanges):
+        session.add_message("user", f"question {number} " + "word " * words, max_messages=1000)
+        session.add_message("assistant", f"answer {number} " + "word " * words, max_messages=1000)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("summary did not finish")
+        time.sleep(0.01)
+
+
+def test_prompt_history():
+    """The prompt keeps the newest messages that fit under the ceiling"""
+    print("\n1️⃣ Prompt history ceiling")
+    summarizer = HistorySummarizer(FakeClient(), "summary-model", max_history_tokens=200)
+    session = Session()
+    fill(session, 10)
+    selected = summarizer.prompt_history(session.history, summary="x" * 200)
+    assert selected == session.history[-len(selected):]
+    assert estimate_tokens("x" * 200) + sum(message_tokens(message) for message in selected) <= 200
+    assert len(selected) < len(session.history)
+    print("   ✅ Oldest messages left out, newest kept in order")
+
+
+def test_summarize_prefix():
+    """Only the summarized prefix is replaced, and turns added meanwhile are kept"""
+    print("\n2️⃣ Summarizing older turns")
+    client = FakeClient()
+    summarizer = HistorySummarizer(client, "summary-model", max_history_tokens=200, keep_recent=4)
+    session = Session()
+    fill(session, 6)
+    before = list(session.history)
+
+    client.proceed.clear()
+    summarizer.maybe_summarize(session)
+    assert client.started.wait(5)
+    # A turn arrives while the summary is being generated
+    session.add_message("user", "late question", max_messages=1000)
+    session.add_message("assistant", "late answer", max_messages=1000)
+    client.proceed.set()
+    wait_until(lambda: len(session.history) == 4)
+
+    assert session.summary == client.summary
+    # The late turns keep the history over the ceiling, so a second summary follows the first
+    assert client.calls == 2
+    assert session.history[:2] == before[-2:]
+    assert [message["content"] for message in session.history[2:]] == ["late question", "late answer"]
+    print("   ✅ Older turns folded into the summary, late turns kept and summarized again when needed")
+
+
+def test_cleared_during_summary():
+    """A summary is thrown away if the history changed underneath it"""
+    print("\n3️⃣ History cleared while summarizing")
+    client = FakeClient()
+    summarizer = HistorySummarizer(client, "summary-model", max_history_tokens=200, keep_recent=4)
+    session = Session()
+    fill(session, 6)
+
+    client.proceed.clear()
+    summarizer.maybe_summarize(session)
+    assert client.started.wait(5)
+    summarizer.maybe_summarize(session)  # Already queued, must not start a second summary
+    session.clear()
+    session.add_message("user", "new conversation", max_messages=1000)
+    client.proceed.set()
+    wait_until(lambda: not summarizer._pending)
+
+    assert client.calls == 1
+    assert session.summary == ""
+    assert [message["content"] for message in session.history] == ["new conversation"]
+    print("   ✅ Cleared history left untouched")
+
+
+def test_batches():
+    """A long backlog is folded in a batch at a time, each request staying under max_input_tokens"""
+    print("\n4️⃣ Bounded summary requests")
+    client = FakeClient()
+    summarizer = HistorySummarizer(client, "summary-model", max_history_tokens=200, keep_recent=4,
+                                   max_input_tokens=150)
+    session = Session()
+    fill(session, 10)
+    session.add_message("user", "huge " * 5000, max_messages=1000)
+    session.add_message("assistant", "short answer", max_messages=1000)
+    fill(session, 2)
+
+    summarizer.maybe_summarize(session)
+    wait_until(lambda: len(session.history) == 4)
+    assert client.calls > 2
+    assert all(len(prompt) < 150 * 4 + 1000 for prompt in client.prompts), max(map(len, client.prompts))
+    print(f"   ✅ {client.calls} requests, the largest prompt {max(map(len, client.prompts))} characters")
+
+
+def test_failures():
+    """Failed summaries back off, and the count limit bounds the history meanwhile"""
+    print("\n5️⃣ Failing summaries")
+    client = FakeClient(summary=None)
+    summarizer = HistorySummarizer(client, "summary-model", max_history_tokens=200, keep_recent=4,
+                                   history_limit_factor=2, retry_backoff=0.3)
+    session = Session(max_history_length=5)
+    fill(session, 6)
+
+    summarizer.maybe_summarize(session)
+    wait_until(lambda: client.calls == 1 and not summarizer._pending)
+    for _ in range(5):
+        summarizer.maybe_summarize(session)
+    time.sleep(0.05)
+    assert client.calls == 1, client.calls
+    print("   ✅ No new summary request on every turn after a failure")
+
+    time.sleep(0.3)
+    summarizer.maybe_summarize(session)
+    wait_until(lambda: client.calls == 2 and not summarizer._pending)
+    summarizer.maybe_summarize(session)
+    assert client.calls == 2
+    print("   ✅ Retried after the backoff, which then doubles")
+
+    limit = summarizer.max_messages(session)
+    assert limit == 20
+    dropped = 0
+    for number in range(20):
+        dropped += session.add_message("user", f"turn {number}", limit)
+    assert len(session.history) == limit and dropped == 12
+    assert session.history[-1]["content"] == "turn 19"
+    print(f"   ✅ History capped at {limit} messages while summaries fail")
+
+    client.summary = "Recovered summary."
+    summarizer._failures.clear()
+    fill(session, 3)
+    summarizer.maybe_summarize(session)
+    wait_until(lambda: session.summary == "Recovered summary.")
+    assert session.session_id not in summarizer._failures
+    print("   ✅ A successful summary clears the failure count")
+
+
+def main():
+    print("🧪 Testing History Summarizer")
+    print("=" * 40)
+
+    try:
+        test_prompt_history()
+        test_summarize_prefix()
+        test_cleared_during_summary()
+        test_batches()
+        test_failures()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("\n🎉 History summarizer tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics helpers (percentiles and the LogHistogram sketch)
+"""
+
+import os
+import sys
+import json
+import random
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from metrics import LogHistogram, MetricsRegistry, percentile
+
+
+def test_percentile():
+    """Nearest-rank percentiles, shared by Histogram and the benchmark scripts"""
+    print("\n1️⃣ percentile()")
+    values = list(range(1, 101))
+    random.Random(0).shuffle(values)
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.9) == 90
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 1.0) == 100
+    assert percentile(values, 0.0) == 1
+    assert percentile([], 0.5) == 0.0
+    assert percentile([7.5], 0.99) == 7.5
+
+    histogram = MetricsRegistry().histogram("test_ms")
+    for value in values:
+        histogram.observe(value)
+    assert histogram.percentile(0.9) == 90
+    print("   ✅ Matches nearest-rank percentiles")
+
+
+def test_log_histogram():
+    """Sketch percentiles stay within the configured relative error"""
+    print("\n2️⃣ LogHistogram")
+    rng = random.Random(1)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(20000)] + [0.0] * 100
+    sketch = LogHistogram(relative_error=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for fraction in (0.5, 0.9, 0.95, 0.99):
+        exact = percentile(values, fraction)
+        estimate = sketch.percentile(fraction)
+        assert abs(estimate - exact) <= 0.011 * exact, (fraction, exact, estimate)
+    assert sketch.percentile(0.001) == 0.0
+    assert len(sketch.buckets) < 2000
+    print("   ✅ Percentiles within 1% using a bounded number of buckets")
+
+    restored = LogHistogram.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.summary() == sketch.summary()
+    print("   ✅ Round-trips through JSON")
+
+    merged = LogHistogram()
+    merged.add(10.0, count=3)
+    assert merged.count == 3 and merged.sum == 30.0
+    assert abs(merged.percentile(0.5) - 10.0) <= 0.1
+    assert LogHistogram().percentile(0.5) == 0.0
+    print("   ✅ Weighted values and empty sketches")
+
+
+def main():
+    print("🧪 Testing Metrics")
+    print("=" * 40)
+
+    try:
+        test_percentile()
+        test_log_histogram()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("\n🎉 Metrics tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the Ollama request scheduler (priority classes and concurrency limits)
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from request_scheduler import BACKGROUND, EMBEDDING, INTERACTIVE, RequestScheduler, SchedulerBusy
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the scheduler")
+        time.sleep(0.005)
+
+
+def test_priority():
+    """Waiting interactive requests start before embedding and background ones"""
+    print("\n1️⃣ Priority")
+    scheduler = RequestScheduler(max_parallel=1)
+    scheduler.acquire(INTERACTIVE)
+    started = []
+
+    def request(priority):
+        with scheduler.slot(priority):
+            started.append(priority)
+
+    threads = []
+    for priority in (BACKGROUND, EMBEDDING, INTERACTIVE):
+        thread = threading.Thread(target=request, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: scheduler.get_stats()[priority]["waiting"] == 1)
+
+    scheduler.release(INTERACTIVE)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert started == [INTERACTIVE, EMBEDDING, BACKGROUND], started
+    print("   ✅ Requests started in priority order, not arrival order")
+
+
+def run_concurrent(scheduler, priority, count, hold=0.05):
+    """Run count requests at once; returns the highest number running together"""
+    running = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def request():
+        with scheduler.slot(priority):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(hold)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return peak[0]
+
+
+def test_limits():
+    """In-flight limits hold per class"""
+    print("\n2️⃣ Limits")
+    scheduler = RequestScheduler(max_in_flight={INTERACTIVE: 2, BACKGROUND: 1}, max_parallel=2)
+    assert run_concurrent(scheduler, INTERACTIVE, 6) == 2
+    assert run_concurrent(scheduler, BACKGROUND, 4) == 1
+    print("   ✅ At most max_in_flight requests of a class run at once")
+
+
+def test_backpressure():
+    """Full queues and long waits are rejected with SchedulerBusy"""
+    print("\n3️⃣ Backpressure")
+    busy = RequestScheduler(max_parallel=1, max_queued=1, queue_timeout=0.3)
+    busy.acquire(INTERACTIVE)
+    outcome = []
+
+    def waiter():
+        try:
+            busy.acquire(INTERACTIVE)
+        except SchedulerBusy:
+            outcome.append("timed out")
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    wait_for(lambda: busy.get_stats()[INTERACTIVE]["waiting"] == 1)
+    try:
+        busy.acquire(INTERACTIVE)
+        raise AssertionError("acquire should be rejected while the queue is full")
+    except SchedulerBusy:
+        pass
+    thread.join(timeout=5)
+    assert outcome == ["timed out"]
+    assert busy.get_stats()[INTERACTIVE]["waiting"] == 0
+    print("   ✅ Requests are rejected when the queue is full or the wait times out")
+
+
+def main():
+    print("🧪 Testing Request Scheduler")
+    print("=" * 40)
+
+    try:
+        test_priority()
+        test_limits()
+        test_backpressure()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("\n🎉 Request scheduler tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
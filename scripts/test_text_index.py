@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the BM25 text index used by conversation search and retrieval
+"""
+
+import os
+import sys
+import random
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import text_index
+from text_index import TextIndex, tokenize
+
+TEXTS = [
+    "The refund policy allows returns within 30 days.",
+    "Shipping is free for orders over 50 dollars.",
+    "Refund requests need the original receipt. Refund refund refund.",
+    "Reset your password from the account settings page.",
+    "The warranty covers manufacturing defects for two years."
+]
+
+
+def test_ranking():
+    """Matching texts are ranked by BM25 and the rest are left out"""
+    print("\n1️⃣ Ranking")
+    index = TextIndex()
+    for text in TEXTS:
+        index.add(text)
+
+    assert tokenize("The Refund, policy!") == ["refund", "policy"]
+    results = index.search("refund policy")
+    docs = [doc for doc, _ in results]
+    assert docs == [0, 2], docs
+    assert results[0][1] > results[1][1] > 0
+    print("   ✅ The text matching both words ranks first")
+
+    assert [doc for doc, _ in index.search("password")] == [3]
+    assert index.search("the a of") == []
+    assert index.search("nonexistent") == []
+    print("   ✅ Stop words and unknown words match nothing")
+
+    assert len(index.search("refund", limit=1)) == 1
+    assert [doc for doc, _ in index.search("refund", allowed={2})] == [2]
+    print("   ✅ limit and allowed restrict the results")
+
+
+def test_removal():
+    """Removed texts are masked out of results and statistics"""
+    print("\n2️⃣ Removal")
+    index = TextIndex()
+    for text in TEXTS:
+        index.add(text)
+    index.remove(2)
+    index.remove(2)
+    assert len(index) == len(TEXTS) - 1
+    assert [doc for doc, _ in index.search("refund")] == [0]
+    assert index.add("Another refund question") == len(TEXTS)
+    assert sorted(doc for doc, _ in index.search("refund")) == [0, len(TEXTS)]
+    print("   ✅ Removed texts no longer match, new texts keep their own numbers")
+
+
+def test_numpy_matches_python():
+    """The numpy and pure Python scoring paths give the same results"""
+    print("\n3️⃣ numpy and pure Python scoring")
+    if not text_index.NUMPY_AVAILABLE:
+        print("   ⚠️ numpy not installed, skipping")
+        return
+
+    rng = random.Random(0)
+    words = ["refund", "policy", "shipping", "order", "password", "warranty", "receipt", "account",
+             "return", "invoice", "billing", "delivery"]
+    index = TextIndex()
+    for _ in range(500):
+        index.add(" ".join(rng.choice(words) for _ in range(rng.randint(3, 30))))
+    for doc in range(0, 500, 7):
+        index.remove(doc)
+    allowed = set(range(0, 500, 3))
+
+    for query in ["refund policy", "shipping delivery order", "billing"]:
+        for subset in (None, allowed):
+            text_index.NUMPY_AVAILABLE = True
+            fast = index.search(query, limit=20, allowed=subset)
+            text_index.NUMPY_AVAILABLE = False
+            slow = index.search(query, limit=20, allowed=subset)
+            text_index.NUMPY_AVAILABLE = True
+            assert [round(score, 3) for _, score in fast] == [round(score, 3) for _, score in slow], query
+            assert not any(doc % 7 == 0 for doc, _ in fast)
+    print("   ✅ Same scores from both paths, with removals and allowed sets")
+
+
+def main():
+    print("🧪 Testing Text Index")
+    print("=" * 40)
+
+    try:
+        test_ranking()
+        test_removal()
+        test_numpy_matches_python()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("\n🎉 Text index tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,7 +33,7 @@ OPTIONS = {
         'NSPrincipalClass': 'NSApplication',
     },
     'packages': ['tkinter', 'requests'] + (['PIL', 'PIL._tkinter_finder'] if hasattr(__import__('sys').modules.get('PIL'), 'Image') else []),
-    'includes': ['config', 'document_processor', 'google_docs_processor'],
+    'includes': ['config', 'backend_pool', 'document_processor', 'google_docs_processor', 'history_summarizer', 'analytics', 'chat_engine', 'chat_transcript', 'conversation_search', 'conversation_store', 'lru_cache', 'metrics', 'metrics_exporter', 'model_router', 'ollama_client', 'request_scheduler', 'response_cache', 'semantic_cache', 'text_index'],
     'excludes': ['PyAudio', 'speech_recognition'],
     'optimize': 1,  # Reduced optimization for better compatibility
     'semi_standalone': False,
@@ -2,87 +2,404 @@
 """
 Simple analytics tracking for Llamita
 Optional - can be disabled for privacy
+
+Events are appended to a JSON Lines file by a background thread in batches,
+so tracking never blocks the UI and never rewrites the whole log.
 """
 
 import json
 import os
-import requests
+import queue
+import time
+import atexit
+import threading
+from collections import Counter
 from datetime import datetime
+from typing import Dict, Iterator, List
+
+from metrics import LogHistogram, registry
+
+# Event names counted by get_usage_stats
+STATS_EVENTS = {
+    "app_start": "app_starts",
+    "message_sent": "messages",
+    "response_received": "responses",
+    "turn": "turns"
+}
+
+# Numeric event fields summarized with percentiles
+LENGTH_FIELDS = ("message_length", "response_length")
+
+# Per-turn performance fields summarized per model
+TURN_FIELDS = ("retrieval_ms", "ttft_ms", "generation_ms", "tokens_per_s", "prompt_tokens")
+
+# Days of per-day counts kept in the summary
+SUMMARY_DAYS = 90
+
+
+class UsageSummary:
+    """Aggregates that are updated per event so usage stats never rescan the log"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.days = {}
+        self.lengths = {field: LogHistogram() for field in LENGTH_FIELDS}
+        self.models = {}
+
+    def add(self, event: Dict):
+        name = event.get("event")
+        self.counts[name] += 1
+
+        day = str(event.get("timestamp", ""))[:10]
+        if day:
+            if day not in self.days:
+                self.days[day] = Counter()
+                for old_day in sorted(self.days)[:-SUMMARY_DAYS]:
+                    del self.days[old_day]
+            if day in self.days:
+                self.days[day][name] += 1
+
+        for field in LENGTH_FIELDS:
+            if isinstance(event.get(field), (int, float)):
+                self.lengths[field].add(event[field])
+
+        if name == "turn":
+            model_stats = self.models.setdefault(event.get("model", "unknown"), new_model_stats())
+            add_turn(model_stats, event)
+
+    def stats(self) -> Dict:
+        stats = {"total_events": sum(self.counts.values())}
+        for event, name in STATS_EVENTS.items():
+            stats[name] = self.counts[event]
+        stats["daily"] = {
+            day: {name: counts[event] for event, name in STATS_EVENTS.items()}
+            for day, counts in sorted(self.days.items())
+        }
+        for field, sketch in self.lengths.items():
+            stats[field] = sketch.summary()
+        stats["models"] = {model: model_stats_summary(model_stats) for model, model_stats in self.models.items()}
+        return stats
+
+    def to_dict(self) -> Dict:
+        return {
+            "counts": dict(self.counts),
+            "days": {day: dict(counts) for day, counts in self.days.items()},
+            "lengths": {field: sketch.to_dict() for field, sketch in self.lengths.items()},
+            "models": {
+                model: {
+                    "turns": model_stats["turns"],
+                    "cache_hits": model_stats["cache_hits"],
+                    "fields": {field: sketch.to_dict() for field, sketch in model_stats["fields"].items()}
+                }
+                for model, model_stats in self.models.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UsageSummary":
+        summary = cls()
+        summary.counts = Counter(data.get("counts", {}))
+        summary.days = {day: Counter(counts) for day, counts in data.get("days", {}).items()}
+        for field, sketch in data.get("lengths", {}).items():
+            if field in summary.lengths:
+                summary.lengths[field] = LogHistogram.from_dict(sketch)
+        for model, model_stats in data.get("models", {}).items():
+            restored = new_model_stats()
+            restored["turns"] = model_stats.get("turns", 0)
+            restored["cache_hits"] = model_stats.get("cache_hits", 0)
+            for field, sketch in model_stats.get("fields", {}).items():
+                if field in restored["fields"]:
+                    restored["fields"][field] = LogHistogram.from_dict(sketch)
+            summary.models[model] = restored
+        return summary
+
+
+def new_model_stats() -> Dict:
+    return {"turns": 0, "cache_hits": 0, "fields": {field: LogHistogram() for field in TURN_FIELDS}}
+
+
+def add_turn(model_stats: Dict, event: Dict):
+    """Add one turn event to a model's performance aggregates"""
+    model_stats["turns"] += 1
+    if event.get("cache"):
+        model_stats["cache_hits"] += 1
+        return
+    for field in TURN_FIELDS:
+        if isinstance(event.get(field), (int, float)):
+            model_stats["fields"][field].add(event[field])
+
+
+def model_stats_summary(model_stats: Dict) -> Dict:
+    """Turn counts, cache hit rate and percentiles of every performance field"""
+    turns = model_stats["turns"]
+    summary = {
+        "turns": turns,
+        "cache_hit_rate": round(model_stats["cache_hits"] / turns, 3) if turns else 0.0
+    }
+    for field, sketch in model_stats["fields"].items():
+        summary[field] = sketch.summary()
+    return summary
+
 
 class Analytics:
-    def __init__(self, enabled=True):
+    def __init__(self, enabled=True, analytics_file="llamita_analytics.jsonl", flush_interval=2.0,
+                 batch_size=100, max_bytes=5 * 1024 * 1024, backup_count=3, summary_file=None):
+        """
+        Initialize analytics
+
+        Args:
+            enabled: Save events to disk
+            analytics_file: JSON Lines log file
+            flush_interval: Seconds between writes of queued events
+            batch_size: Write as soon as this many events are queued
+            max_bytes: Rotate the log when it grows past this size
+            backup_count: Number of rotated files to keep (file.1 ... file.N)
+            summary_file: Where aggregates are persisted (default: <log name>_summary.json)
+        """
         self.enabled = enabled
-        self.analytics_file = "llamita_analytics.json"
-        
+        self.analytics_file = analytics_file
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.summary_file = summary_file or os.path.splitext(analytics_file)[0] + "_summary.json"
+
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+        self._migrated = False
+        self._migrate_lock = threading.Lock()
+
+        # Aggregates, loaded from the summary file (or rebuilt from the log) on first use
+        self._summary = None
+        self._summary_lock = threading.Lock()
+
     def track_app_start(self):
         """Track when the app starts"""
-        if not self.enabled:
-            return
-            
         data = {
             "event": "app_start",
             "timestamp": datetime.now().isoformat(),
             "version": "1.0.0"
         }
-        self._save_event(data)
-        
+        self._track(data)
+
     def track_message_sent(self, message_length):
         """Track when a message is sent"""
-        if not self.enabled:
-            return
-            
         data = {
             "event": "message_sent",
             "timestamp": datetime.now().isoformat(),
             "message_length": message_length
         }
-        self._save_event(data)
-        
+        self._track(data)
+
     def track_response_received(self, response_length):
         """Track when a response is received"""
-        if not self.enabled:
-            return
-            
         data = {
             "event": "response_received",
             "timestamp": datetime.now().isoformat(),
             "response_length": response_length
         }
-        self._save_event(data)
-        
+        self._track(data)
+
+    def track_turn(self, timings: Dict):
+        """
+        Track the latency breakdown of one chat turn
+
+        Args:
+            timings: Per-turn trace (model, retrieval_ms, ttft_ms, generation_ms,
+                     tokens_per_s, prompt_tokens, cache, ...)
+        """
+        data = {
+            "event": "turn",
+            "timestamp": datetime.now().isoformat(),
+            "model": timings.get("model", "unknown")
+        }
+        for field in TURN_FIELDS + ("eval_count", "cache"):
+            if timings.get(field) is not None:
+                data[field] = timings[field]
+        self._track(data)
+
+    def _track(self, data):
+        """Count the event in the metrics registry and save it if analytics is enabled"""
+        # In-memory counters only leave the process through the optional metrics exporter
+        registry.counter(f"analytics_{data['event']}_total", f"Analytics {data['event']} events").inc()
+        if self.enabled:
+            self._save_event(data)
+
     def _save_event(self, data):
-        """Save event to local file"""
+        """Queue an event for the background writer"""
+        if self._closed:
+            return
+        self._ensure_writer()
+        self._queue.put(data)
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _writer_loop(self):
+        """Collect queued events for up to flush_interval seconds and append them in one write"""
+        # Migrating the old log and rebuilding the summary can read the whole
+        # history, so it happens here rather than on the thread that tracked
+        # the first event (the GUI thread for track_app_start)
+        self._load_summary()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            events = [event for event in batch if event is not None]
+            if events and self._write_batch(events):
+                # Only events that are on disk are counted, so the saved
+                # summary never gets ahead of the log it is rebuilt from
+                with self._summary_lock:
+                    for event in events:
+                        self._summary.add(event)
+                self._save_summary()
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, events: List[Dict]) -> bool:
+        """Append events to the log, rotating it first if it is too large; returns True if written"""
         try:
-            events = []
-            if os.path.exists(self.analytics_file):
-                with open(self.analytics_file, 'r') as f:
-                    events = json.load(f)
-            
-            events.append(data)
-            
-            with open(self.analytics_file, 'w') as f:
-                json.dump(events, f, indent=2)
-                
+            self._rotate_if_needed()
+            lines = "".join(json.dumps(event, separators=(',', ':')) + "\n" for event in events)
+            with open(self.analytics_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            return True
         except Exception as e:
             print(f"Analytics error: {e}")
-            
-    def get_usage_stats(self):
-        """Get usage statistics"""
-        if not os.path.exists(self.analytics_file):
-            return {"total_events": 0, "app_starts": 0, "messages": 0}
-            
+            return False
+
+    def _load_summary(self):
+        """Load the persisted aggregates, or build them by streaming the log once"""
+        self._migrate_legacy_file()
+        with self._summary_lock:
+            if self._summary is not None:
+                return
+            if os.path.exists(self.summary_file):
+                try:
+                    with open(self.summary_file, 'r', encoding='utf-8') as f:
+                        self._summary = UsageSummary.from_dict(json.load(f))
+                    return
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Rebuilding analytics summary: {e}")
+
+            summary = UsageSummary()
+            for event in self.iter_events():
+                summary.add(event)
+            self._summary = summary
+
+    def _save_summary(self):
+        """Write the aggregates atomically"""
         try:
-            with open(self.analytics_file, 'r') as f:
+            with self._summary_lock:
+                data = self._summary.to_dict()
+            temp_file = self.summary_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_file, self.summary_file)
+        except Exception as e:
+            print(f"Analytics summary error: {e}")
+
+    def _rotate_if_needed(self):
+        if self.max_bytes <= 0 or not os.path.exists(self.analytics_file):
+            return
+        if os.path.getsize(self.analytics_file) < self.max_bytes:
+            return
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.analytics_file}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.analytics_file}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.analytics_file, f"{self.analytics_file}.1")
+        else:
+            os.remove(self.analytics_file)
+
+    def _migrate_legacy_file(self):
+        """Convert the old JSON array log (llamita_analytics.json) to JSON Lines once"""
+        with self._migrate_lock:
+            if self._migrated:
+                return
+            self._migrated = True
+            legacy_file = os.path.splitext(self.analytics_file)[0] + ".json"
+            if legacy_file != self.analytics_file and os.path.exists(legacy_file):
+                self._convert_legacy_file(legacy_file)
+
+    def _convert_legacy_file(self, legacy_file: str):
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
                 events = json.load(f)
-                
-            stats = {
-                "total_events": len(events),
-                "app_starts": len([e for e in events if e.get("event") == "app_start"]),
-                "messages": len([e for e in events if e.get("event") == "message_sent"]),
-                "responses": len([e for e in events if e.get("event") == "response_received"])
-            }
-            return stats
-            
+            with open(self.analytics_file, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event, separators=(',', ':')) + "\n")
+            os.replace(legacy_file, legacy_file + ".migrated")
+            print(f"📊 Migrated {len(events)} analytics events to {self.analytics_file}")
+        except Exception as e:
+            print(f"Analytics migration error: {e}")
+
+    def flush(self):
+        """Block until every queued event has been written (at most flush_interval seconds)"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write remaining events and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+
+    def iter_events(self) -> Iterator[Dict]:
+        """Stream saved events, oldest first, including rotated files"""
+        paths = [f"{self.analytics_file}.{index}" for index in range(self.backup_count, 0, -1)]
+        paths.append(self.analytics_file)
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A partly written last line after a crash
+                        continue
+
+    def get_usage_stats(self):
+        """
+        Get usage statistics
+
+        Returns:
+            Totals per event type, per-day counts and message/response length
+            percentiles, read from aggregates updated as each batch is written
+            (call flush() first to include events that are still queued)
+        """
+        try:
+            self._load_summary()
+            with self._summary_lock:
+                return self._summary.stats()
+
         except Exception as e:
             print(f"Error reading analytics: {e}")
             return {"total_events": 0, "app_starts": 0, "messages": 0}
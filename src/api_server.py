@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP API for Llamita
+Shares one document library and one warm model between several users
+
+Endpoints:
+    GET    /health                      Server, model and library status
+    GET    /metrics                     Prometheus text format metrics
+    GET    /documents                   List documents
+    POST   /documents?filename=a.pdf    Upload a document (raw file bytes as the body)
+    DELETE /documents/<id>              Remove a document
+    POST   /context                     {"query": ..., "max_chunks": 3} -> relevant excerpts
+    POST   /chat                        {"message": ..., "session_id": ..., "stream": true}
+                                        Streams Server-Sent Events: token ... done
+                                        (without session_id, pass "history" to chat statelessly)
+    GET    /sessions                    Sessions in memory
+    POST   /sessions                    Create a session
+    GET    /sessions/<id>               Session history
+    DELETE /sessions/<id>               Delete a session
+    GET    /search?q=refund&limit=10    Search saved conversations (optionally &session_id=...)
+
+Every endpoint except /health requires "Authorization: Bearer <token>" when
+API_TOKEN (or --token) is set.
+
+Usage:
+    python src/api_server.py --host 127.0.0.1 --port 8765
+"""
+
+import os
+import sys
+import json
+import hmac
+import time
+import asyncio
+import argparse
+import threading
+from http import HTTPStatus
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+
+import metrics
+from chat_engine import ChatEngine, Session, create_chat_engine, register_collectors
+from conversation_search import create_conversation_search
+from document_processor import DocumentProcessor
+from request_scheduler import SchedulerBusy
+from metrics_exporter import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from ollama_client import GenerationCancelled
+from session_manager import SessionManager
+
+try:
+    import config
+except ImportError:
+    config = None
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # Same limit as DocumentProcessor.process_document
+MAX_BODY_BYTES = MAX_UPLOAD_BYTES + 64 * 1024
+REQUEST_TIMEOUT = 30  # Seconds to wait for a client to send its request
+EVICTION_INTERVAL = 60  # Seconds between checks for idle sessions
+PUBLIC_PATHS = {"/health"}  # Served without a token
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+
+def _config_value(name: str, default):
+    return getattr(config, name, default) if config else default
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HttpRequest:
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Dict:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return data
+
+
+class LlamitaApiServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 chat_engine: Optional[ChatEngine] = None, upload_dir: str = "uploads",
+                 session_manager: Optional[SessionManager] = None, api_token: Optional[str] = None):
+        """
+        Initialize the server
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            chat_engine: Engine with the shared document library and Ollama client
+                         (default: configured from config.py with ./documents)
+            upload_dir: Where uploaded files are kept
+            session_manager: Conversations kept by the server (default: configured from config.py)
+            api_token: Bearer token required by every endpoint except /health
+                       (default: API_TOKEN from config.py; empty or None disables the check)
+        """
+        self.host = host
+        self.port = port
+        self.api_token = api_token if api_token is not None else _config_value('API_TOKEN', None)
+        self.chat_engine = chat_engine or create_chat_engine(DocumentProcessor())
+        self.document_processor = self.chat_engine.document_processor
+        self.upload_dir = upload_dir
+        self.session_manager = session_manager or SessionManager(
+            self.chat_engine,
+            storage_dir=_config_value('SESSION_DIR', "sessions"),
+            max_sessions=_config_value('MAX_SESSIONS_IN_MEMORY', 100),
+            idle_timeout=_config_value('SESSION_IDLE_TIMEOUT', 30 * 60),
+            max_concurrent=_config_value('MAX_CONCURRENT_CHATS', None)
+        )
+        self.conversation_search = create_conversation_search(self.chat_engine.conversation_store)
+        # Cache and chunk store gauges for /metrics
+        self._metrics_collector = register_collectors(self.chat_engine)
+
+        # DocumentProcessor is not thread-safe; every access from worker threads goes through this lock
+        self._library_lock = self.chat_engine.library_lock
+        self._server = None
+        self._eviction_task = None
+
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/metrics"): self.handle_metrics,
+            ("GET", "/documents"): self.handle_list_documents,
+            ("POST", "/documents"): self.handle_upload_document,
+            ("POST", "/context"): self.handle_context,
+            ("POST", "/chat"): self.handle_chat,
+            ("GET", "/sessions"): self.handle_list_sessions,
+            ("POST", "/sessions"): self.handle_create_session,
+            ("GET", "/search"): self.handle_search,
+        }
+
+    # Server lifecycle
+
+    async def start(self):
+        """Load the document library, start warming the model and begin listening"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._load_library)
+        if _config_value('WARM_UP_MODEL', True):
+            for model in self.chat_engine.models():
+                loop.run_in_executor(None, self.chat_engine.ollama_client.warm_up, model)
+
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self._eviction_task = asyncio.create_task(self._evict_idle_sessions())
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"🦙 Llamita API listening on http://{self.host}:{self.port} (model: {self.chat_engine.model})")
+        if not self.api_token and self.host not in LOOPBACK_HOSTS:
+            print("⚠️ API_TOKEN is not set: anyone who can reach this address can upload, delete and chat")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server:
+            self._server.close()
+        self.session_manager.save_all()
+        metrics.registry.remove_collector(self._metrics_collector)
+        if self.chat_engine.conversation_store:
+            self.chat_engine.conversation_store.close()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(EVICTION_INTERVAL)
+            await self._run_blocking(self.session_manager.evict_idle)
+
+    def _load_library(self):
+        with self._library_lock:
+            self.document_processor.load_documents()
+            for doc_id in list(self.document_processor.documents):
+                self.document_processor.get_chunks_for_document(doc_id)
+
+    # HTTP handling
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one request per connection"""
+        start_time = time.perf_counter()
+        route = "unknown"
+        try:
+            request = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+            self._check_token(request)
+            handler, route = self._find_handler(request)
+            await handler(request, writer)
+        except HttpError as e:
+            await self._send_json(writer, {"error": e.message}, status=e.status)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"❌ API error: {e}")
+            try:
+                await self._send_json(writer, {"error": "Internal server error"}, status=500)
+            except ConnectionError:
+                pass
+        finally:
+            metrics.registry.counter("api_requests_total", "HTTP API requests").inc()
+            metrics.registry.observe(f"api_{route}_ms", (time.perf_counter() - start_time) * 1000)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> HttpRequest:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"Request body larger than {MAX_BODY_BYTES // (1024 * 1024)}MB")
+        body = await reader.readexactly(length) if length else b""
+        return HttpRequest(method.upper(), target, headers, body)
+
+    def _check_token(self, request: HttpRequest):
+        if not self.api_token or request.path in PUBLIC_PATHS:
+            return
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.api_token.encode()):
+            raise HttpError(401, "Missing or invalid API token (send \"Authorization: Bearer <token>\")")
+
+    def _find_handler(self, request: HttpRequest):
+        handler = self.routes.get((request.method, request.path))
+        if handler:
+            return handler, request.path.strip("/")
+        if request.path.startswith("/documents/") and request.method == "DELETE":
+            return self.handle_delete_document, "documents_delete"
+        if request.path.startswith("/sessions/") and request.method in ("GET", "DELETE"):
+            if request.method == "GET":
+                return self.handle_get_session, "session_get"
+            return self.handle_delete_session, "session_delete"
+        if any(path == request.path for _, path in self.routes):
+            raise HttpError(405, f"Method {request.method} not allowed")
+        raise HttpError(404, f"Not found: {request.path}")
+
+    async def _send_response(self, writer: asyncio.StreamWriter, body: bytes, content_type: str, status: int = 200):
+        reason = HTTPStatus(status).phrase
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, payload, status: int = 200):
+        await self._send_response(writer, json.dumps(payload).encode('utf-8'), "application/json", status)
+
+    async def _run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # Endpoints
+
+    async def handle_health(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        health = {
+            "status": "ok",
+            "model": self.chat_engine.model,
+            "documents": len(self.document_processor.documents)
+        }
+        pool = self.chat_engine.ollama_client.pool
+        if pool is not None:
+            health["backends"] = pool.get_stats()
+        if self.chat_engine.router is not None:
+            health["routes"] = self.chat_engine.router.get_stats()
+        await self._send_json(writer, health)
+
+    async def handle_metrics(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        # Collectors read cache and chunk store stats (including file sizes on disk)
+        body = (await self._run_blocking(render_metrics, metrics.registry)).encode('utf-8')
+        await self._send_response(writer, body, METRICS_CONTENT_TYPE)
+
+    async def handle_list_documents(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        def list_documents():
+            with self._library_lock:
+                return self.document_processor.list_documents()
+        await self._send_json(writer, {"documents": await self._run_blocking(list_documents)})
+
+    async def handle_upload_document(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        filename = os.path.basename(request.query.get("filename") or request.headers.get("x-filename", ""))
+        if not filename:
+            raise HttpError(400, "Pass the file name as ?filename=...")
+        extension = os.path.splitext(filename)[1].lower()
+        supported = self.document_processor.get_supported_formats()
+        if extension not in supported:
+            raise HttpError(415, f"Unsupported format '{extension}'. Supported: {', '.join(supported)}")
+        if not request.body:
+            raise HttpError(400, "Empty upload")
+        if len(request.body) > MAX_UPLOAD_BYTES:
+            raise HttpError(413, "File too large (10MB limit)")
+
+        def process_upload():
+            os.makedirs(self.upload_dir, exist_ok=True)
+            file_path = os.path.join(self.upload_dir, filename)
+            with open(file_path, 'wb') as f:
+                f.write(request.body)
+            with self._library_lock:
+                return self.document_processor.process_document(file_path)
+
+        doc_id = await self._run_blocking(process_upload)
+        if not doc_id:
+            raise HttpError(422, f"Could not extract text from {filename}")
+        await self._send_json(writer, {"id": doc_id, "filename": filename}, status=201)
+
+    async def handle_delete_document(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        doc_id = request.path[len("/documents/"):]
+        if doc_id not in self.document_processor.documents:
+            raise HttpError(404, f"Unknown document: {doc_id}")
+
+        def remove_document():
+            with self._library_lock:
+                return self.document_processor.remove_document(doc_id)
+
+        removed = await self._run_blocking(remove_document)
+        await self._send_json(writer, {"id": doc_id, "removed": removed})
+
+    async def handle_context(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        data = request.json()
+        query = str(data.get("query", "")).strip()
+        if not query:
+            raise HttpError(400, "'query' is required")
+        try:
+            max_chunks = max(1, min(20, int(data.get("max_chunks", 3))))
+        except (TypeError, ValueError):
+            raise HttpError(400, "'max_chunks' must be a number")
+
+        context = await self._run_blocking(self.chat_engine.retrieve, query, max_chunks)
+        await self._send_json(writer, {"query": query, "context": context})
+
+    async def handle_search(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        if self.conversation_search is None:
+            raise HttpError(404, "Conversation search is disabled (SAVE_CONVERSATIONS / CONVERSATION_SEARCH_ENABLED)")
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise HttpError(400, "Pass the search words as ?q=...")
+        try:
+            limit = max(1, min(100, int(request.query.get("limit", 10))))
+        except ValueError:
+            raise HttpError(400, "'limit' must be a number")
+        session_id = request.query.get("session_id") or None
+
+        results = await self._run_blocking(self.conversation_search.search, query, limit, session_id)
+        await self._send_json(writer, {"query": query, "results": results,
+                                       "complete": self.conversation_search.ready.is_set()})
+
+    async def handle_chat(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        data = request.json()
+        message = str(data.get("message", "")).strip()
+        if not message:
+            raise HttpError(400, "'message' is required")
+        history = data.get("history", [])
+        if not isinstance(history, list) or not all(
+                isinstance(entry, dict) and "role" in entry and "content" in entry for entry in history):
+            raise HttpError(400, "'history' must be a list of {\"role\", \"content\"} objects")
+
+        session_id = data.get("session_id")
+        if session_id:
+            # The server keeps the conversation
+            # May load the session or the saved conversation from disk
+            session = await self._run_blocking(self.session_manager.get_session, str(session_id), True)
+            if session is None:
+                raise HttpError(400, "'session_id' may only contain letters, digits, '-' and '_'")
+            start = lambda on_token: self.session_manager.chat(session, message, on_token)
+        else:
+            # The client keeps the conversation; the engine only reads the history
+            session = Session(max_history_length=max(1, len(history)))
+            session.history = history
+            start = lambda on_token: self.session_manager.respond(session, message, on_token)
+
+        if data.get("stream", True):
+            await self._stream_chat(writer, session, start)
+            return
+
+        try:
+            answer = await asyncio.wrap_future(start(None))
+        except SchedulerBusy as e:
+            raise HttpError(503, f"Server busy, try again later: {e}")
+        except requests.exceptions.RequestException as e:
+            raise HttpError(502, f"Ollama is not reachable: {e}")
+        if answer is None:
+            raise HttpError(502, "Ollama returned an error")
+        await self._send_json(writer, {"response": answer, "session_id": session_id,
+                                       "timings": session.last_turn_timings})
+
+    async def _stream_chat(self, writer: asyncio.StreamWriter, session: Session, start):
+        """Relay tokens from the chat worker thread to the client as Server-Sent Events"""
+        loop = asyncio.get_running_loop()
+        tokens = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def on_token(piece):
+            if cancelled.is_set():
+                raise GenerationCancelled()
+            loop.call_soon_threadsafe(tokens.put_nowait, piece)
+
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+
+        generation = asyncio.wrap_future(start(on_token))
+        generation.add_done_callback(lambda _: tokens.put_nowait(None))
+        try:
+            while True:
+                piece = await tokens.get()
+                if piece is None:
+                    break
+                writer.write(_sse("token", {"token": piece}))
+                await writer.drain()
+
+            try:
+                answer = generation.result()
+            except SchedulerBusy as e:
+                writer.write(_sse("error", {"error": f"Server busy, try again later: {e}"}))
+            except requests.exceptions.RequestException as e:
+                writer.write(_sse("error", {"error": f"Ollama is not reachable: {e}"}))
+            else:
+                if answer is None:
+                    writer.write(_sse("error", {"error": "Ollama returned an error"}))
+                else:
+                    writer.write(_sse("done", {"response": answer, "session_id": session.session_id,
+                                               "timings": session.last_turn_timings}))
+            await writer.drain()
+        except ConnectionError:
+            # Client went away: stop generating so the model is free for others
+            cancelled.set()
+            generation.add_done_callback(lambda future: future.exception())
+
+    async def handle_list_sessions(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        # The session lock is also held while idle sessions are written to disk
+        await self._send_json(writer, {"sessions": await self._run_blocking(self.session_manager.list_sessions)})
+
+    async def handle_create_session(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        session = await self._run_blocking(self.session_manager.create_session)
+        await self._send_json(writer, {"session_id": session.session_id}, status=201)
+
+    async def handle_get_session(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        session_id = request.path[len("/sessions/"):]
+        session = await self._run_blocking(self.session_manager.get_session, session_id)
+        if session is None:
+            raise HttpError(404, f"Unknown session: {session_id}")
+        await self._send_json(writer, {"session_id": session.session_id, "history": session.history,
+                                       "summary": session.summary})
+
+    async def handle_delete_session(self, request: HttpRequest, writer: asyncio.StreamWriter):
+        session_id = request.path[len("/sessions/"):]
+        if not await self._run_blocking(self.session_manager.delete_session, session_id):
+            raise HttpError(404, f"Unknown session: {session_id}")
+        await self._send_json(writer, {"session_id": session_id, "deleted": True})
+
+
+def _sse(event: str, payload: Dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Llamita headless HTTP API")
+    parser.add_argument("--host", default=_config_value('API_HOST', "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=_config_value('API_PORT', 8765))
+    parser.add_argument("--model", default=None, help="Chat model (default: DEFAULT_MODEL from config.py)")
+    parser.add_argument("--storage-dir", default="documents", help="Document library directory")
+    parser.add_argument("--upload-dir", default="uploads", help="Where uploaded files are saved")
+    parser.add_argument("--token", default=_config_value('API_TOKEN', None),
+                        help="Require \"Authorization: Bearer <token>\" (default: API_TOKEN from config.py)")
+    args = parser.parse_args()
+
+    server = LlamitaApiServer(
+        host=args.host,
+        port=args.port,
+        chat_engine=create_chat_engine(DocumentProcessor(args.storage_dir), model=args.model),
+        upload_dir=args.upload_dir,
+        api_token=args.token or ""
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Llamita API stopped")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Load balancing across several Ollama servers
+Health checks, least-outstanding-requests routing, model affinity and failover
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set
+
+import requests
+
+from metrics import registry
+
+# Errors after which a backend is considered down until the next successful health check
+BACKEND_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                  requests.exceptions.ChunkedEncodingError)
+
+
+def _model_names(name: str) -> Set[str]:
+    """Names a model can be listed under ("llama3" is "llama3:latest")"""
+    return {name, name if ":" in name else f"{name}:latest"}
+
+
+class Backend:
+    def __init__(self, url: str):
+        """
+        One Ollama server
+
+        Args:
+            url: Server URL (a /api/... suffix is ignored)
+        """
+        self.base_url = url.rsplit('/api/', 1)[0].rstrip('/')
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.available_models: Optional[Set[str]] = None  # None until the first health check
+        self.loaded_models: Set[str] = set()
+        self.last_error = ""
+        self.last_checked = 0.0
+
+    def has_model(self, model: str) -> bool:
+        return self.available_models is None or bool(_model_names(model) & self.available_models)
+
+    def has_loaded(self, model: str) -> bool:
+        return bool(_model_names(model) & self.loaded_models)
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "loaded_models": sorted(self.loaded_models),
+            "last_error": self.last_error
+        }
+
+
+class BackendPool:
+    def __init__(self, urls: List[str], health_check_interval: float = 15.0, health_check_timeout: float = 2.0,
+                 affinity_weight: int = 2):
+        """
+        Initialize the pool
+
+        Args:
+            urls: Ollama server URLs
+            health_check_interval: Seconds between background health checks
+            health_check_timeout: Timeout of each /api/tags request
+            affinity_weight: Extra outstanding requests a backend with the model
+                             already loaded may have and still be preferred
+                             (loading a model usually costs more than waiting)
+        """
+        if not urls:
+            raise ValueError("BackendPool needs at least one Ollama URL")
+        self.backends = [Backend(url) for url in urls]
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.affinity_weight = affinity_weight
+
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._health_thread = None
+
+    def healthy_count(self) -> int:
+        return sum(1 for backend in self.backends if backend.healthy)
+
+    def add_listener(self, callback: Callable[[int], None]):
+        """Call callback(healthy backends) whenever a backend goes down or comes back (e.g. to scale limits)"""
+        self._listeners.append(callback)
+        callback(self.healthy_count())
+
+    # Health checks
+
+    def check_backend(self, backend: Backend) -> bool:
+        """Query /api/tags (installed models) and /api/ps (loaded models)"""
+        try:
+            response = requests.get(f"{backend.base_url}/api/tags", timeout=self.health_check_timeout)
+            if response.status_code != 200:
+                raise requests.exceptions.RequestException(f"/api/tags returned {response.status_code}")
+            available = {model.get("name", "") for model in response.json().get("models", [])}
+
+            loaded = None
+            response = requests.get(f"{backend.base_url}/api/ps", timeout=self.health_check_timeout)
+            if response.status_code == 200:
+                loaded = {model.get("name", "") for model in response.json().get("models", [])}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.mark_down(backend, e)
+            return False
+
+        with self._lock:
+            if not backend.healthy:
+                print(f"✅ Ollama backend {backend.base_url} is back")
+            backend.healthy = True
+            backend.available_models = available
+            if loaded is not None:
+                backend.loaded_models = loaded
+            backend.last_error = ""
+            backend.last_checked = time.time()
+            self._update_gauges()
+        return True
+
+    def check_health(self) -> int:
+        """Check every backend; returns the number of healthy ones"""
+        return sum(1 for backend in self.backends if self.check_backend(backend))
+
+    def mark_down(self, backend: Backend, error: Exception):
+        with self._lock:
+            if backend.healthy:
+                print(f"⚠️ Ollama backend {backend.base_url} is down: {error}")
+            backend.healthy = False
+            backend.last_error = str(error)
+            backend.last_checked = time.time()
+            self._update_gauges()
+
+    def _update_gauges(self):
+        healthy = self.healthy_count()
+        registry.gauge("ollama_backends_healthy", "Ollama backends passing health checks").set(healthy)
+        for callback in self._listeners:
+            callback(healthy)
+
+    def start(self):
+        """Check backend health now and then periodically, in a background thread"""
+        if self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True, name="ollama-health")
+            self._health_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _health_loop(self):
+        self.check_health()
+        while not self._stop_event.wait(self.health_check_interval):
+            self.check_health()
+
+    # Routing
+
+    def choose(self, model: str, exclude: Optional[List[Backend]] = None) -> Optional[Backend]:
+        """
+        Pick the backend for a request
+
+        Healthy backends that have the model installed are preferred; among
+        them the one with the fewest outstanding requests wins, counting a
+        backend with the model already loaded as affinity_weight requests
+        less busy. If no healthy backend qualifies, the remaining ones are
+        tried anyway (a health check may simply not have run yet).
+
+        Returns:
+            The backend, or None if every backend has been excluded
+        """
+        exclude = exclude or []
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend not in exclude]
+            if not candidates:
+                return None
+            preferred = [backend for backend in candidates if backend.healthy and backend.has_model(model)]
+            candidates = preferred or [backend for backend in candidates if backend.healthy] or candidates
+            return min(candidates, key=lambda backend: (
+                backend.outstanding - (self.affinity_weight if backend.has_loaded(model) else 0),
+                backend.outstanding
+            ))
+
+    @contextmanager
+    def lease(self, backend: Backend, model: str):
+        """Count a request as outstanding on a backend while it runs"""
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+        try:
+            yield backend
+        except BACKEND_ERRORS as e:
+            self.mark_down(backend, e)
+            raise
+        else:
+            with self._lock:
+                backend.loaded_models.add(model)
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def get_stats(self) -> List[Dict]:
+        with self._lock:
+            return [backend.to_dict() for backend in self.backends]
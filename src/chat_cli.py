@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Command line chat for Llamita
+Uses the same chat engine and document library as the desktop app, without a GUI
+
+Usage:
+    python src/chat_cli.py
+    python src/chat_cli.py --model llama3.2:3b --timings
+    python src/chat_cli.py --resume 3f2a9c0d1b7e
+"""
+
+import sys
+import argparse
+
+import requests
+
+from chat_engine import create_chat_engine
+from document_processor import DocumentProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat with Llamita in the terminal")
+    parser.add_argument("--model", default=None, help="Chat model (default: DEFAULT_MODEL from config.py)")
+    parser.add_argument("--storage-dir", default="documents", help="Document library directory")
+    parser.add_argument("--no-documents", action="store_true", help="Answer without document context")
+    parser.add_argument("--timings", action="store_true", help="Print the timing breakdown after each answer")
+    parser.add_argument("--resume", metavar="ID", help="Continue a saved conversation")
+    args = parser.parse_args()
+
+    document_processor = None
+    if not args.no_documents:
+        document_processor = DocumentProcessor(args.storage_dir)
+        document_processor.load_documents()
+
+    engine = create_chat_engine(document_processor, model=args.model)
+    session = None
+    if args.resume:
+        session = engine.resume_session(args.resume)
+        if session is None:
+            print(f"⚠️ No saved conversation '{args.resume}', starting a new one")
+        else:
+            print(f"📂 Resumed conversation {session.session_id} ({len(session.history)} recent messages)")
+    session = session or engine.new_session()
+    print(f"🦙 Llamita ({engine.model}) - type /clear to reset the conversation, /quit to exit")
+    if engine.conversation_store:
+        print(f"💾 Saving as {session.session_id} (continue later with --resume {session.session_id})")
+
+    while True:
+        try:
+            message = input("\nYou: ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if not message:
+            continue
+        if message in ("/quit", "/exit"):
+            break
+        if message == "/clear":
+            session = engine.new_session()
+            print("Llamita: Chat cleared. How can I help you?")
+            continue
+
+        print("Llamita: ", end="", flush=True)
+        try:
+            answer = engine.chat(session, message, on_token=lambda piece: print(piece, end="", flush=True))
+        except requests.exceptions.RequestException as e:
+            print(f"\n❌ Could not reach Ollama: {e}")
+            continue
+        if answer is None:
+            print("\n❌ Ollama returned an error")
+            continue
+        if session.last_turn_timings.get("cache"):
+            print(answer, end="")
+        print()
+
+        if args.timings:
+            timings = ", ".join(f"{name}={value}" for name, value in session.last_turn_timings.items())
+            print(f"⏱️ {timings}")
+
+    if engine.conversation_store:
+        engine.conversation_store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
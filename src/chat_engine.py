@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+GUI-independent chat core for Llamita
+Conversation history, document retrieval, prompt assembly and Ollama calls,
+shared by the desktop app, the command line chat and the HTTP API server
+"""
+
+import time
+import uuid
+import threading
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from conversation_store import ConversationStore, create_conversation_store
+from history_summarizer import HistorySummarizer, create_history_summarizer
+from model_router import ModelRouter, create_model_router
+from ollama_client import OllamaClient, create_ollama_client
+from response_cache import ResponseCache
+
+DEFAULT_SYSTEM_PROMPT = "You are Llamita, a helpful AI assistant."
+
+
+def build_prompt(message: str, history: List[Dict], document_context: str = "",
+                 system_prompt: str = DEFAULT_SYSTEM_PROMPT, summary: str = "") -> str:
+    """
+    Build the prompt sent to Ollama
+
+    Args:
+        message: Current user message
+        history: Previous messages as {"role": "user"|"assistant", "content": ...}
+        document_context: Relevant document excerpts, if any
+        system_prompt: Instructions placed at the top of the prompt
+        summary: Summary of conversation turns older than history
+
+    Returns:
+        Complete prompt ending with "Llamita:" for the model to continue
+    """
+    parts = [f"{system_prompt}\n\n"]
+
+    if document_context:
+        parts.append(f"Relevant document information:\n{document_context}\n\n")
+
+    if summary:
+        parts.append(f"Summary of the earlier conversation:\n{summary}\n\n")
+
+    for entry in history:
+        if entry["role"] == "user":
+            parts.append(f"User: {entry['content']}\n")
+        elif entry["role"] == "assistant":
+            parts.append(f"Llamita: {entry['content']}\n")
+
+    parts.append(f"User: {message}\nLlamita:")
+    return "".join(parts)
+
+
+class Session:
+    def __init__(self, session_id: Optional[str] = None, max_history_length: int = 10):
+        """
+        One conversation
+
+        Args:
+            session_id: Identifier (a random one is generated if not given)
+            max_history_length: Number of exchanges (user + assistant) kept in the history
+        """
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.max_history_length = max_history_length
+        self.history: List[Dict] = []
+        self.summary = ""  # Rolling summary of turns no longer in history
+        self.lock = threading.RLock()
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.last_turn_timings: Dict = {}
+
+    def add_message(self, role: str, content: str, max_messages: Optional[int] = None) -> int:
+        """
+        Append a message
+
+        Args:
+            max_messages: Messages kept in the history (default: the most recent
+                          max_history_length exchanges)
+
+        Returns:
+            Number of older messages dropped to stay under the limit
+        """
+        limit = max_messages if max_messages is not None else self.max_history_length * 2
+        with self.lock:
+            self.history.append({"role": role, "content": content})
+            dropped = max(0, len(self.history) - limit)
+            if dropped:
+                self.history = self.history[dropped:]
+        self.last_active = time.time()
+        return dropped
+
+    def clear(self):
+        with self.lock:
+            self.history = []
+            self.summary = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "max_history_length": self.max_history_length,
+            "history": self.history,
+            "summary": self.summary,
+            "created_at": self.created_at,
+            "last_active": self.last_active
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Session":
+        session = cls(data["session_id"], data.get("max_history_length", 10))
+        session.history = list(data.get("history", []))
+        session.summary = data.get("summary", "")
+        session.created_at = data.get("created_at", session.created_at)
+        session.last_active = data.get("last_active", session.last_active)
+        return session
+
+
+class ChatEngine:
+    def __init__(self, ollama_client: OllamaClient, model: str, document_processor=None,
+                 system_prompt: str = DEFAULT_SYSTEM_PROMPT, options: Optional[Dict] = None,
+                 response_cache: Optional[ResponseCache] = None, response_cache_force: bool = False,
+                 timeout: float = 30, router: Optional[ModelRouter] = None,
+                 summarizer: Optional[HistorySummarizer] = None,
+                 conversation_store: Optional[ConversationStore] = None):
+        """
+        Initialize the engine
+
+        Args:
+            ollama_client: Client for the Ollama server
+            model: Chat model name
+            document_processor: Document library used for context (can be set later)
+            system_prompt: Instructions placed at the top of every prompt
+            options: Ollama model options
+            response_cache: Optional cache for answers to identical prompts
+            response_cache_force: Cache answers even when sampling is not deterministic
+            timeout: Ollama request timeout in seconds
+            router: Send simple messages to a smaller model (model is used for the rest)
+            summarizer: Keep the history in prompts under a token ceiling with a rolling summary
+            conversation_store: Save every exchange to disk
+        """
+        self.ollama_client = ollama_client
+        self.model = model
+        self.document_processor = document_processor
+        self.system_prompt = system_prompt
+        self.options = options or {}
+        self.response_cache = response_cache
+        self.response_cache_force = response_cache_force
+        self.timeout = timeout
+        self.router = router
+        self.summarizer = summarizer
+        self.conversation_store = conversation_store
+
+        # DocumentProcessor is not thread-safe; callers sharing it across threads use this lock too
+        self.library_lock = threading.RLock()
+
+    def models(self) -> List[str]:
+        """Every model this engine may answer with (e.g. to warm them up)"""
+        if self.router:
+            return [self.router.large_model, self.router.small_model]
+        return [self.model]
+
+    def new_session(self, session_id: Optional[str] = None, max_history_length: int = 10) -> Session:
+        return Session(session_id, max_history_length)
+
+    def resume_session(self, session_id: str, max_history_length: int = 10) -> Optional[Session]:
+        """
+        Continue a saved conversation with its most recent exchanges as history
+
+        Returns:
+            The session, or None if the conversation was never saved
+        """
+        if not self.conversation_store or not self.conversation_store.is_valid_id(session_id):
+            return None
+        messages = self.conversation_store.load_recent(session_id, max_history_length * 2)
+        if not messages:
+            return None
+        session = Session(session_id, max_history_length)
+        session.history = [{"role": message["role"], "content": message["content"]} for message in messages]
+        session.created_at = messages[0].get("ts", session.created_at)
+        return session
+
+    def retrieve(self, query: str, max_chunks: int = 3, trace: Optional[Dict] = None) -> str:
+        """Find document excerpts relevant to the query"""
+        if not self.document_processor:
+            return ""
+        with metrics.registry.span("retrieval", trace):
+            with self.library_lock:
+                document_context = self.document_processor.get_document_context(query, max_chunks=max_chunks)
+        if document_context:
+            print(f"📄 Added document context for query: {query[:50]}...")
+        return document_context
+
+    def corpus_fingerprint(self) -> str:
+        """Identifier of the current document set ("" without documents)"""
+        if not self.document_processor:
+            return ""
+        with self.library_lock:
+            return self.document_processor.get_corpus_fingerprint()
+
+    def respond(self, session: Session, message: str,
+                on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Generate an answer to a message in the context of a session
+
+        The session history is not changed; use chat() to record the exchange.
+        The timing breakdown is stored in session.last_turn_timings.
+
+        Returns:
+            The answer, or None if Ollama returned an error
+
+        Raises:
+            requests.exceptions.RequestException: If Ollama cannot be reached
+        """
+        trace = {"model": self.model}
+        session.last_turn_timings = trace
+
+        document_context = self.retrieve(message, trace=trace)
+        model, route = self.model, None
+        if self.router:
+            model, route, trace["route_reason"] = self.router.route(message, document_context)
+            trace["model"] = model
+            trace["route"] = route
+        with metrics.registry.span("prompt_build", trace):
+            with session.lock:
+                history, summary = session.history, session.summary
+            if self.summarizer:
+                history = self.summarizer.prompt_history(history, summary)
+            prompt = build_prompt(message, history, document_context, self.system_prompt, summary)
+        trace["prompt_chars"] = len(prompt)
+
+        # Answer identical prompts from the response cache when allowed
+        cache_key = None
+        if self.response_cache and ResponseCache.is_cacheable(self.options, force=self.response_cache_force):
+            cache_key = ResponseCache.make_key(model, self.options, prompt)
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                print("⚡ Using cached response")
+                trace["cache"] = "exact"
+                metrics.registry.record_trace(trace)
+                return cached_response
+
+        result = self.ollama_client.generate(prompt, model, options=self.options,
+                                             timeout=self.timeout, on_token=on_token)
+        if result is None:
+            return None
+
+        trace.update(result.get("timings", {}))
+        metrics.registry.record_trace(trace)
+        if route:
+            self.router.record(route, trace)
+
+        answer = result.get('response', '').strip()
+        if cache_key and answer:
+            self.response_cache.put(cache_key, answer, model=model)
+        return answer
+
+    def chat(self, session: Session, message: str,
+             on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Answer a message and add the exchange to the session history
+
+        Raises:
+            requests.exceptions.RequestException: If Ollama cannot be reached
+        """
+        answer = None
+        try:
+            answer = self.respond(session, message, on_token)
+        finally:
+            self._record_exchange(session, message, answer)
+        return answer
+
+    def _record_exchange(self, session: Session, message: str, answer: Optional[str]):
+        """Add an exchange to the history, save it, and compress older turns if needed"""
+        # With a summarizer older turns normally leave the history only once they are in the
+        # summary; the much higher count limit is a backstop for when summaries keep failing
+        limit = self.summarizer.max_messages(session) if self.summarizer else None
+        dropped = session.add_message("user", message, limit)
+        if answer:
+            dropped += session.add_message("assistant", answer, limit)
+        if dropped and self.summarizer:
+            print(f"⚠️ Dropped {dropped} unsummarized messages from session {session.session_id}")
+            metrics.registry.counter("history_messages_dropped_total",
+                                     "Messages dropped from a history before they were summarized").inc(dropped)
+        if self.conversation_store:
+            self.conversation_store.append(session.session_id, "user", message)
+            if answer:
+                self.conversation_store.append(session.session_id, "assistant", answer,
+                                               model=session.last_turn_timings.get("model", self.model))
+        if self.summarizer:
+            self.summarizer.maybe_summarize(session)
+
+    def record_cached_answer(self, session: Session, message: str, answer: str, cache: str = "semantic"):
+        """Add an exchange answered from a cache outside the engine (e.g. the semantic cache)"""
+        session.last_turn_timings = {"model": self.model, "cache": cache}
+        metrics.registry.record_trace(session.last_turn_timings)
+        self._record_exchange(session, message, answer)
+
+
+def create_chat_engine(document_processor=None, model: Optional[str] = None) -> ChatEngine:
+    """
+    Create a ChatEngine configured from config.py
+
+    Args:
+        document_processor: Document library used for context
+        model: Chat model (default: config.DEFAULT_MODEL)
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    def setting(name, default):
+        return getattr(config, name, default) if config else default
+
+    response_cache = None
+    if setting('RESPONSE_CACHE_ENABLED', False):
+        response_cache = ResponseCache(
+            cache_dir=setting('RESPONSE_CACHE_DIR', "response_cache"),
+            ttl=setting('RESPONSE_CACHE_TTL', 24 * 60 * 60),
+            max_entries=setting('RESPONSE_CACHE_MAX_ENTRIES', 500),
+            max_bytes=setting('RESPONSE_CACHE_MAX_BYTES', 20 * 1024 * 1024)
+        )
+
+    model = model or setting('DEFAULT_MODEL', "llama3:8b")
+    ollama_client = create_ollama_client()
+    return ChatEngine(
+        ollama_client,
+        model,
+        document_processor=document_processor,
+        system_prompt=(setting('SYSTEM_PROMPTS', {}) or {}).get("default", DEFAULT_SYSTEM_PROMPT),
+        options=setting('OLLAMA_OPTIONS', {}),
+        response_cache=response_cache,
+        response_cache_force=setting('RESPONSE_CACHE_FORCE', False),
+        router=create_model_router(model),
+        summarizer=create_history_summarizer(ollama_client),
+        conversation_store=create_conversation_store()
+    )
+
+
+def register_collectors(chat_engine: ChatEngine, semantic_cache=None,
+                        registry: Optional[metrics.MetricsRegistry] = None) -> Callable:
+    """
+    Publish cache hit ratios and chunk store sizes as gauges whenever metrics are read
+
+    Shared by the desktop app and the HTTP API server so /metrics reports the
+    same series in both. The document processor is looked up on every read,
+    so it can be attached to the engine after this is called.
+
+    Args:
+        chat_engine: Engine whose response cache and document processor are reported
+        semantic_cache: Optional cache for paraphrased questions (desktop app only)
+        registry: Registry to update (default: metrics.registry)
+
+    Returns:
+        The collector, e.g. for registry.remove_collector()
+    """
+    registry = registry or metrics.registry
+
+    def collect(registry):
+        caches = []
+        if chat_engine.response_cache:
+            caches.append(("response_cache", chat_engine.response_cache.get_stats()))
+        if semantic_cache:
+            caches.append(("semantic_cache", semantic_cache.get_stats()))
+
+        document_processor = chat_engine.document_processor
+        if document_processor:
+            cache_stats = document_processor.get_cache_stats()
+            caches.append(("retrieval_cache", cache_stats['context_cache']))
+            caches.append(("chunk_text_cache", cache_stats['chunk_text_cache']))
+
+            store_stats = document_processor.get_chunk_store_stats()
+            registry.gauge("chunk_store_documents", "Documents in the chunk store").set(store_stats['documents'])
+            registry.gauge("chunk_store_chunks", "Chunks in the chunk store").set(store_stats['chunks'])
+            registry.gauge("chunk_store_text_bytes", "Characters of document text").set(store_stats['text_bytes'])
+            registry.gauge("chunk_store_disk_bytes", "Size of chunk files on disk").set(store_stats['disk_bytes'])
+
+        for name, stats in caches:
+            registry.gauge(f"{name}_hits", f"Hits in the {name.replace('_', ' ')}").set(stats['hits'])
+            registry.gauge(f"{name}_misses", f"Misses in the {name.replace('_', ' ')}").set(stats['misses'])
+            registry.gauge(f"{name}_hit_ratio", f"Hit rate of the {name.replace('_', ' ')}").set(stats['hit_rate'])
+
+    registry.add_collector(collect)
+    return collect
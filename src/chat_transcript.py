@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Virtualized chat transcript for the Llamita window
+Keeps only a window of messages in the Text widget and pages older ones in from the conversation store
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import tkinter as tk
+
+FRAME_INTERVAL_MS = 33  # Streamed tokens are drawn at most ~30 times per second
+SPEAKERS = {"user": "You", "assistant": "Llamita"}
+
+
+class ChatTranscript:
+    def __init__(self, text_widget: tk.Text, loader: Optional[Callable[[int, int], List[Dict]]] = None,
+                 window_size: int = 200, page_size: int = 50):
+        """
+        Wrap a Text widget (e.g. a ScrolledText)
+
+        Messages are either stored (user and assistant messages that the
+        conversation store also saves, numbered from 0 like the store) or
+        notes (welcome text, errors) that only exist on screen. At most
+        window_size messages are in the widget; scrolling to the top loads the
+        previous page_size stored messages through loader and drops the
+        newest, scrolling back down does the reverse.
+
+        Args:
+            text_widget: Widget showing the conversation
+            loader: loader(start, end) returns stored messages start..end-1 of
+                    the current conversation (None disables paging)
+            window_size: Messages kept in the widget
+            page_size: Messages loaded per scroll step
+        """
+        self.text = text_widget
+        self.loader = loader
+        self.window_size = window_size
+        self.page_size = page_size
+
+        self._entries = deque()  # {"mark": name, "position": stored message number or None}
+        self._next_mark = 0
+        self._next_position = 0  # Number of the next stored message
+        self._paging = False
+        self._scroll_pending = False
+
+        # Streaming state; tokens arrive on a worker thread and are drawn from the Tk event loop
+        self._stream_entry = None
+        self._stream_id = 0  # Id of the stream being shown, 0 if none
+        self._last_stream_id = 0
+        self._stream_buffer = []
+        self._stream_lock = threading.Lock()
+        self._stream_job = None
+
+        self._scrollbar_set = getattr(getattr(text_widget, 'vbar', None), 'set', None)
+        self.text.configure(yscrollcommand=self._on_yscroll)
+
+    # Content
+
+    def reset(self, next_position: int = 0, loader: Optional[Callable[[int, int], List[Dict]]] = None):
+        """Empty the widget for another conversation whose next stored message is next_position"""
+        self._cancel_stream()
+        self.text.delete("1.0", tk.END)
+        for entry in self._entries:
+            self.text.mark_unset(entry["mark"])
+        self._entries.clear()
+        self._next_position = next_position
+        if loader is not None:
+            self.loader = loader
+
+    def add_note(self, message: str):
+        """Show text that is not part of the saved conversation"""
+        self._follow_live()
+        self._insert_entry(tk.END, self._format(message), None)
+        self._trim_oldest()
+        self._schedule_scroll()
+
+    def add_message(self, role: str, content: str, ts: Optional[float] = None):
+        """Show a message the conversation store saves as well"""
+        self._follow_live()
+        self._insert_entry(tk.END, self._format(f"{SPEAKERS.get(role, role)}: {content}", ts), self._next_position)
+        self._next_position += 1
+        self._trim_oldest()
+        self._schedule_scroll()
+
+    def skip_message(self):
+        """Account for a stored message that is not shown"""
+        self._next_position += 1
+
+    def _format(self, message: str, ts: Optional[float] = None) -> str:
+        moment = datetime.fromtimestamp(ts) if ts else datetime.now()
+        return f"[{moment.strftime('%H:%M:%S')}] {message}\n\n"
+
+    def _insert_entry(self, index: str, text: str, position: Optional[int]) -> Dict:
+        """Insert a message at the end or the start ("1.0") of the widget"""
+        mark = f"message{self._next_mark}"
+        self._next_mark += 1
+        entry = {"mark": mark, "position": position}
+        # Marks move right with text inserted at their position, so prepending keeps the other marks in place
+        start = self.text.index("end-1c") if index == tk.END else "1.0"
+        self.text.insert(start, text)
+        self.text.mark_set(mark, start)
+        self.text.mark_gravity(mark, tk.RIGHT)
+        if index == tk.END:
+            self._entries.append(entry)
+        else:
+            self._entries.appendleft(entry)
+        return entry
+
+    def _trim_oldest(self):
+        while len(self._entries) > self.window_size:
+            removed = self._entries.popleft()
+            self.text.delete("1.0", self._entries[0]["mark"])
+            self.text.mark_unset(removed["mark"])
+
+    def _trim_newest(self):
+        while len(self._entries) > self.window_size:
+            removed = self._entries.pop()
+            self.text.delete(removed["mark"], tk.END)
+            self.text.mark_unset(removed["mark"])
+
+    def _schedule_scroll(self):
+        """Scroll to the newest message once per idle period, however many inserts came in"""
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            self.text.after_idle(self._scroll_to_end)
+
+    def _scroll_to_end(self):
+        self._scroll_pending = False
+        self.text.see(tk.END)
+
+    # Paging
+
+    def _stored_positions(self) -> List[int]:
+        return [entry["position"] for entry in self._entries if entry["position"] is not None]
+
+    def _is_live(self) -> bool:
+        """True if the newest stored messages are in the widget"""
+        positions = self._stored_positions()
+        return not positions or positions[-1] >= self._next_position - 1
+
+    def _follow_live(self):
+        """Before adding a message, bring back the newest page if the user paged away from it"""
+        if self._is_live() or self.loader is None:
+            return
+        self._cancel_stream()
+        self.text.delete("1.0", tk.END)
+        for entry in self._entries:
+            self.text.mark_unset(entry["mark"])
+        self._entries.clear()
+        start = max(0, self._next_position - self.page_size)
+        for offset, record in enumerate(self._load(start, self._next_position)):
+            self._insert_stored(tk.END, start + offset, record)
+
+    def _load(self, start: int, end: int) -> List[Dict]:
+        try:
+            return self.loader(start, end)
+        except Exception as e:
+            print(f"⚠️ Error loading conversation messages: {e}")
+            return []
+
+    def _insert_stored(self, index: str, position: int, record: Dict) -> Dict:
+        message = f"{SPEAKERS.get(record.get('role'), record.get('role'))}: {record.get('content', '')}"
+        return self._insert_entry(index, self._format(message, record.get("ts")), position)
+
+    def _on_yscroll(self, first, last):
+        if self._scrollbar_set:
+            self._scrollbar_set(first, last)
+        if self.loader is None or self._paging or self._stream_entry is not None:
+            return
+        if float(first) <= 0.0 and float(last) < 1.0:
+            self._paging = True
+            self.text.after_idle(self._load_older)
+        elif float(last) >= 1.0 and float(first) > 0.0 and not self._is_live():
+            self._paging = True
+            self.text.after_idle(self._load_newer)
+
+    def _load_older(self):
+        """Insert the previous page of stored messages above the first one shown"""
+        try:
+            positions = self._stored_positions()
+            first = positions[0] if positions else self._next_position
+            if first <= 0 or not self._entries:
+                return
+            start = max(0, first - self.page_size)
+            records = self._load(start, first)
+            if not records:
+                return
+            anchor = self._entries[0]["mark"]
+            for offset in range(len(records) - 1, -1, -1):
+                self._insert_stored("1.0", start + offset, records[offset])
+            self._trim_newest()
+            # Keep the message the user was looking at in place
+            self.text.yview(anchor)
+        finally:
+            self._paging = False
+
+    def _load_newer(self):
+        """Append the next page of stored messages after the last one shown"""
+        try:
+            positions = self._stored_positions()
+            if not positions:
+                return
+            start = positions[-1] + 1
+            records = self._load(start, min(self._next_position, start + self.page_size))
+            anchor = self._entries[-1]["mark"]
+            for offset, record in enumerate(records):
+                self._insert_stored(tk.END, start + offset, record)
+            self._trim_oldest()
+            self.text.see(anchor)
+        finally:
+            self._paging = False
+
+    # Streaming
+
+    def begin_stream(self, role: str = "assistant") -> int:
+        """
+        Start a message whose text arrives piece by piece through stream_token()
+
+        Returns:
+            Stream id to pass to stream_token() and end_stream(); calls with the
+            id of an earlier stream (e.g. one cut off by reset()) are ignored
+        """
+        if self._stream_entry is not None:
+            # Only one message streams at a time; drop an unfinished one
+            self.end_stream(self._stream_id, None)
+        self._follow_live()
+        self._stream_entry = self._insert_entry(tk.END, self._format(f"{SPEAKERS.get(role, role)}: "), None)
+        # Streamed text goes in front of the blank line that ends the message
+        self.text.mark_set("stream_end", "end-1c -2c")
+        self.text.mark_gravity("stream_end", tk.RIGHT)
+        with self._stream_lock:
+            self._last_stream_id += 1
+            self._stream_id = self._last_stream_id
+            self._stream_buffer = []
+        self._trim_oldest()
+        self._schedule_scroll()
+        self._stream_job = self.text.after(FRAME_INTERVAL_MS, self._flush_stream)
+        return self._stream_id
+
+    def stream_token(self, stream_id: int, piece: str) -> bool:
+        """
+        Queue streamed text (safe to call from any thread)
+
+        Returns:
+            False if the stream is no longer shown, so the caller can stop generating
+        """
+        with self._stream_lock:
+            if stream_id != self._stream_id:
+                return False
+            self._stream_buffer.append(piece)
+            return True
+
+    def is_streaming(self, stream_id: int) -> bool:
+        with self._stream_lock:
+            return stream_id == self._stream_id
+
+    def _flush_stream(self):
+        """Draw the text that arrived since the last frame in one insert"""
+        with self._stream_lock:
+            text = "".join(self._stream_buffer)
+            self._stream_buffer = []
+        if text and self._stream_entry is not None:
+            self.text.insert("stream_end", text)
+            self._schedule_scroll()
+        if self._stream_entry is not None:
+            self._stream_job = self.text.after(FRAME_INTERVAL_MS, self._flush_stream)
+
+    def end_stream(self, stream_id: int, content: Optional[str], role: str = "assistant"):
+        """
+        Finish the streamed message
+
+        Args:
+            stream_id: Id returned by begin_stream() (stale ids are ignored)
+            content: Final text (replaces what was streamed), or None to remove the message
+        """
+        if not self.is_streaming(stream_id):
+            return
+        entry = self._stream_entry
+        self._cancel_stream()
+        if entry is None:
+            return
+        start = self.text.index(entry["mark"])
+        self.text.delete(start, "stream_end +2c")
+        if content is None:
+            self._entries.remove(entry)
+            self.text.mark_unset(entry["mark"])
+        else:
+            # The streamed text is replaced by the final answer, which may differ (e.g. after a retry)
+            self.text.insert(start, self._format(f"{SPEAKERS.get(role, role)}: {content}"))
+            self.text.mark_set(entry["mark"], start)
+            entry["position"] = self._next_position
+            self._next_position += 1
+        self.text.mark_unset("stream_end")
+        self._schedule_scroll()
+
+    def _cancel_stream(self):
+        if self._stream_job is not None:
+            self.text.after_cancel(self._stream_job)
+            self._stream_job = None
+        self._stream_entry = None
+        with self._stream_lock:
+            self._stream_id = 0
+            self._stream_buffer = []
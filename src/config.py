@@ -6,6 +6,11 @@ Modify these settings to customize your experience
 
 # Ollama Configuration
 OLLAMA_URL = "http://localhost:11434/api/generate"
+# Several Ollama servers: requests go to the least busy healthy one, preferring
+# servers that already have the model loaded (leave empty to use only OLLAMA_URL)
+OLLAMA_URLS = []  # e.g. ["http://localhost:11434", "http://workstation-2:11434"]
+OLLAMA_HEALTH_CHECK_INTERVAL = 15  # Seconds between /api/tags checks
+OLLAMA_AFFINITY_WEIGHT = 2  # How many extra queued requests a server with the model loaded may have
 DEFAULT_MODEL = "llama3:8b"  # Using the model you have installed
 
 # Available models you can use (recommended for Llamita):
@@ -18,6 +23,52 @@ DEFAULT_MODEL = "llama3:8b"  # Using the model you have installed
 # - "llama3:8b" - More capable but slower
 # - "codellama:7b" - Specialized for coding tasks
 
+# Keep the model loaded between messages (e.g. "30m", "2h", "-1" to keep it loaded forever)
+OLLAMA_KEEP_ALIVE = "30m"
+WARM_UP_MODEL = True  # Load DEFAULT_MODEL in the background while Llamita starts
+
+# Request scheduling: interactive chat > embeddings > background work (warm-up, summaries)
+OLLAMA_MAX_PARALLEL = 2  # Requests sent to each Ollama server at once (match OLLAMA_NUM_PARALLEL on the server)
+OLLAMA_MAX_IN_FLIGHT = {"interactive": 2, "embedding": 1, "background": 1}
+OLLAMA_MAX_QUEUED = 32  # Requests waiting per class before new ones are rejected
+OLLAMA_QUEUE_TIMEOUT = 60  # Seconds a request may wait for a slot
+
+# Model routing: short, simple messages go to SMALL_MODEL; long, complex or
+# document questions go to DEFAULT_MODEL
+MODEL_ROUTING_ENABLED = False
+SMALL_MODEL = "llama3.2:1b"
+ROUTING_MAX_SMALL_WORDS = 12  # Longer messages always use DEFAULT_MODEL
+
+# Conversation summaries: older turns are compressed into a rolling summary by
+# a small model in the background, keeping every prompt under a token ceiling
+HISTORY_SUMMARY_ENABLED = False
+SUMMARY_MODEL = "llama3.2:1b"
+HISTORY_MAX_TOKENS = 1024  # Summary + recent messages included in each prompt
+SUMMARY_MAX_TOKENS = 256
+SUMMARY_KEEP_RECENT = 4  # Latest messages always sent word for word
+SUMMARY_MAX_INPUT_TOKENS = 2048  # History folded in per summary request
+SUMMARY_RETRY_BACKOFF = 30  # Seconds before retrying after a failed summary (doubles up to 10 minutes)
+HISTORY_LIMIT_FACTOR = 4  # Backstop: keep at most 4x max_history_length exchanges if summaries keep failing
+
+# Model options sent with every request (e.g. {"temperature": 0} for repeatable answers)
+OLLAMA_OPTIONS = {}
+
+# Response Cache Configuration
+RESPONSE_CACHE_ENABLED = False  # Reuse answers when the exact same prompt is sent again
+RESPONSE_CACHE_DIR = "response_cache"
+RESPONSE_CACHE_TTL = 24 * 60 * 60  # Seconds before a cached answer expires
+RESPONSE_CACHE_MAX_ENTRIES = 500
+RESPONSE_CACHE_MAX_BYTES = 20 * 1024 * 1024
+RESPONSE_CACHE_FORCE = False  # Also cache when temperature > 0 (answers would normally vary)
+
+# Semantic Cache Configuration (reuse answers for paraphrased questions)
+SEMANTIC_CACHE_ENABLED = False
+SEMANTIC_CACHE_MODE = "offer"  # "offer" asks before reusing an answer, "serve" reuses it directly
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Minimum cosine similarity between questions
+SEMANTIC_CACHE_MAX_ENTRIES = 200
+SEMANTIC_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # Seconds before a cached answer expires
+EMBEDDING_MODEL = "nomic-embed-text"  # Install with: ollama pull nomic-embed-text
+
 # Speech Recognition Configuration
 SPEECH_TIMEOUT = 5  # Seconds to wait for speech input
 PHRASE_TIME_LIMIT = 10  # Maximum length of a phrase in seconds
@@ -35,6 +86,8 @@ VOICE_INTERRUPTION_TIMEOUT = 1  # Seconds to wait for interruption detection
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 WINDOW_TITLE = "🦙 Llamita - Voice Assistant"
+TRANSCRIPT_WINDOW_MESSAGES = 200  # Messages kept in the chat widget; older ones are loaded on scroll
+TRANSCRIPT_PAGE_SIZE = 50  # Saved messages loaded per scroll step
 
 # Color Scheme
 COLORS = {
@@ -60,7 +113,27 @@ LOG_FILE = "voice_assistant.log"
 # Advanced Configuration
 ENABLE_DEBUG_MODE = False  # Set to True for verbose logging
 SAVE_CONVERSATIONS = True  # Save conversation history
-CONVERSATION_FILE = "conversations.txt"
+CONVERSATION_FILE = "conversations.txt"  # One JSONL file per conversation in conversations/
+CONVERSATION_FLUSH_INTERVAL = 1.0  # Seconds between batched writes (one fsync per file)
+CONVERSATION_SEARCH_ENABLED = True  # Full-text search over saved conversations (Ctrl+F, GET /search)
+ANALYTICS_ENABLED = False  # Save usage events to ANALYTICS_FILE
+ANALYTICS_FILE = "llamita_analytics.jsonl"  # Append-only JSON Lines log
+ANALYTICS_FLUSH_INTERVAL = 2.0  # Seconds events are batched before being written
+ANALYTICS_MAX_BYTES = 5 * 1024 * 1024  # Rotate the log at this size (keeps 3 old files)
+
+# Headless API Server (python src/api_server.py)
+API_HOST = "127.0.0.1"  # Use "0.0.0.0" to share with other machines
+API_PORT = 8765
+API_TOKEN = None  # Set a secret to require "Authorization: Bearer <token>"; do this before binding to 0.0.0.0
+SESSION_DIR = "sessions"  # Where idle conversations are saved
+MAX_SESSIONS_IN_MEMORY = 100  # Least recently used sessions beyond this are saved to disk
+SESSION_IDLE_TIMEOUT = 30 * 60  # Seconds without activity before a session is saved to disk
+MAX_CONCURRENT_CHATS = None  # Chat turns generated at once (None: the Ollama scheduler's interactive limit x healthy backends)
+
+# Metrics Exporter (Prometheus text format at http://HOST:PORT/metrics)
+METRICS_EXPORTER_ENABLED = False
+METRICS_EXPORTER_HOST = "127.0.0.1"  # Use "0.0.0.0" to allow scraping from other machines
+METRICS_EXPORTER_PORT = 9464
 
 # System Prompts (optional - for more advanced model control)
 SYSTEM_PROMPTS = {
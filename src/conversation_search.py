@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Full-text search over saved conversations
+"What did Llamita tell me about X last week?"
+"""
+
+import time
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from conversation_store import ConversationStore
+from metrics import registry
+from text_index import TextIndex
+
+# Messages read from disk per step while (re)building the index
+INDEX_BATCH = 1000
+
+
+class ConversationSearch:
+    def __init__(self, store: ConversationStore):
+        """
+        Initialize the search index
+
+        The index lives in memory. start() fills it from the store in a
+        background thread; after that, new messages are indexed as they are
+        saved, so a search never re-reads conversation files.
+
+        Args:
+            store: Conversation store to index (and to read matching messages from)
+        """
+        self.store = store
+        self.index = TextIndex()
+
+        self._conversation_ids: List[str] = []
+        self._conversation_numbers: Dict[str, int] = {}
+        # Conversation number and message position of every indexed text
+        self._doc_conversation = array('I')
+        self._doc_position = array('I')
+        self._docs_by_conversation: Dict[str, array] = {}
+        self._indexed: Dict[str, int] = {}  # Messages indexed per conversation
+        self._stale = set()  # Conversations with messages saved out of order
+        self._lock = threading.RLock()
+        self._thread = None
+        self.ready = threading.Event()
+
+        store.add_listener(self)
+
+    def start(self):
+        """Index every stored conversation in the background"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.build, daemon=True, name="conversation-index")
+            self._thread.start()
+
+    def build(self):
+        start_time = time.perf_counter()
+        for conversation in self.store.list_conversations():
+            self._index_conversation(conversation["conversation_id"])
+        self.ready.set()
+        print(f"🔎 Indexed {len(self.index)} conversation messages in {time.perf_counter() - start_time:.1f}s")
+
+    def _add(self, conversation_id: str, position: int, record: Dict):
+        number = self._conversation_numbers.get(conversation_id)
+        if number is None:
+            number = self._conversation_numbers[conversation_id] = len(self._conversation_ids)
+            self._conversation_ids.append(conversation_id)
+        doc = self.index.add(record.get("content", ""))
+        self._doc_conversation.append(number)
+        self._doc_position.append(position)
+        self._docs_by_conversation.setdefault(conversation_id, array('I')).append(doc)
+        self._indexed[conversation_id] = position + 1
+
+    def _index_conversation(self, conversation_id: str, end: Optional[int] = None):
+        """Index the messages of a conversation that are not indexed yet, a batch at a time"""
+        end = self.store.count(conversation_id) if end is None else end
+        while True:
+            with self._lock:
+                start = self._indexed.get(conversation_id, 0)
+                if start >= end:
+                    return
+                records = self.store.load_range(conversation_id, start, min(end, start + INDEX_BATCH))
+                if not records:
+                    return
+                for offset, record in enumerate(records):
+                    self._add(conversation_id, start + offset, record)
+
+    # Store listener
+
+    def message_added(self, conversation_id: str, position: int, record: Dict):
+        with self._lock:
+            if self._indexed.get(conversation_id, 0) == position:
+                self._add(conversation_id, position, record)
+            else:
+                # Not reached by build() yet, or messages arrived out of order
+                self._stale.add(conversation_id)
+
+    def conversation_deleted(self, conversation_id: str):
+        with self._lock:
+            for doc in self._docs_by_conversation.pop(conversation_id, []):
+                self.index.remove(doc)
+            self._indexed.pop(conversation_id, None)
+            self._stale.discard(conversation_id)
+
+    # Searching
+
+    def search(self, query: str, limit: int = 10, conversation_id: Optional[str] = None) -> List[Dict]:
+        """
+        Find saved messages matching a query
+
+        Args:
+            query: Search words
+            limit: Maximum number of results
+            conversation_id: Only search this conversation
+
+        Returns:
+            Matching messages, best first, as dicts with conversation_id,
+            position, role, content, ts and score
+        """
+        start_time = time.perf_counter()
+        with self._lock:
+            stale, self._stale = self._stale, set()
+        for stale_id in stale:
+            self._index_conversation(stale_id)
+
+        with self._lock:
+            allowed = None
+            if conversation_id is not None:
+                allowed = set(self._docs_by_conversation.get(conversation_id, []))
+                if not allowed:
+                    return []
+            hits = [
+                (self._conversation_ids[self._doc_conversation[doc]], self._doc_position[doc], score)
+                for doc, score in self.index.search(query, limit, allowed)
+            ]
+
+        results = []
+        for hit_conversation, position, score in hits:
+            records = self.store.load_range(hit_conversation, position, position + 1)
+            if not records:
+                continue
+            result = {"conversation_id": hit_conversation, "position": position, "score": round(score, 3)}
+            result.update(records[0])
+            results.append(result)
+        registry.observe("conversation_search_ms", (time.perf_counter() - start_time) * 1000)
+        return results
+
+    def get_stats(self) -> Dict:
+        stats = self.index.get_stats()
+        stats["conversations"] = len(self._docs_by_conversation)
+        stats["ready"] = self.ready.is_set()
+        return stats
+
+
+def create_conversation_search(store: Optional[ConversationStore]) -> Optional[ConversationSearch]:
+    """
+    Create and start a ConversationSearch configured from config.py
+
+    Returns:
+        The search index, or None without a store or if CONVERSATION_SEARCH_ENABLED is off
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    if store is None or not getattr(config, 'CONVERSATION_SEARCH_ENABLED', True):
+        return None
+    search = ConversationSearch(store)
+    search.start()
+    return search
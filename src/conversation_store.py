@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Conversation persistence for Llamita
+Append-only JSONL per conversation with an offset index, written by a background thread
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from metrics import registry
+
+CONVERSATION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Each index entry is the byte offset of one message in the conversation file
+OFFSET = struct.Struct("<Q")
+RETRY_INTERVAL = 5.0  # Seconds before messages that could not be written are tried again
+
+
+class ConversationStore:
+    def __init__(self, directory: str = "conversations", flush_interval: float = 1.0, batch_size: int = 200):
+        """
+        Initialize the store
+
+        Every conversation is saved as <id>.jsonl (one message per line,
+        never rewritten) plus <id>.idx, the byte offset of each message.
+        The index lets any range of messages be read with two seeks, so
+        resuming the end of a long conversation does not read the whole file.
+
+        Args:
+            directory: Where conversation files are kept
+            flush_interval: Seconds the writer collects messages before one write and fsync per file
+            batch_size: Write as soon as this many messages are queued
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Messages queued but not yet on disk, so readers see them too
+        self._pending: Dict[str, List[Dict]] = {}
+        # Messages per conversation that are completely on disk (index and data)
+        self._counts: Dict[str, int] = {}
+        # Guards _pending and _counts; never held during file writes or fsync
+        self._lock = threading.Lock()
+        # Held by the writer while it appends to files, and by delete()
+        self._file_lock = threading.Lock()
+        self._closed = False
+        self._listeners = []
+
+    @staticmethod
+    def is_valid_id(conversation_id: str) -> bool:
+        return bool(conversation_id and CONVERSATION_ID_PATTERN.match(conversation_id))
+
+    def _paths(self, conversation_id: str):
+        if not self.is_valid_id(conversation_id):
+            raise ValueError(f"Invalid conversation id: {conversation_id!r}")
+        base = os.path.join(self.directory, conversation_id)
+        return base + ".jsonl", base + ".idx"
+
+    def add_listener(self, listener):
+        """
+        Notify an object of changes (e.g. a search index)
+
+        The listener needs message_added(conversation_id, position, record)
+        and conversation_deleted(conversation_id) methods.
+        """
+        self._listeners.append(listener)
+
+    # Writing
+
+    def append(self, conversation_id: str, role: str, content: str, **fields):
+        """Queue a message for the background writer (returns immediately)"""
+        if self._closed:
+            return
+        self._paths(conversation_id)
+        record = {"role": role, "content": content, "ts": round(time.time(), 3)}
+        record.update(fields)
+        self._ensure_writer()
+        with self._lock:
+            pending = self._pending.setdefault(conversation_id, [])
+            position = self._committed_count(conversation_id) + len(pending)
+            pending.append(record)
+            self._queue.put((conversation_id, record))
+        for listener in self._listeners:
+            listener.message_added(conversation_id, position, record)
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use"""
+        with self._writer_lock:
+            if self._writer is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="conversation-writer")
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _writer_loop(self):
+        """Collect queued messages for up to flush_interval seconds and write them in one batch"""
+        failed: Dict[str, List[Dict]] = {}
+        while True:
+            try:
+                # Messages that could not be written are retried even if nothing new arrives
+                batch = [self._queue.get(timeout=RETRY_INTERVAL if failed else None)]
+            except queue.Empty:
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while batch and len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            by_conversation, failed = failed, {}
+            for item in batch:
+                if item is not None:
+                    by_conversation.setdefault(item[0], []).append(item[1])
+            for conversation_id, records in by_conversation.items():
+                if not self._write_records(conversation_id, records):
+                    failed[conversation_id] = records
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                if failed:
+                    count = sum(len(records) for records in failed.values())
+                    print(f"❌ {count} conversation messages could not be saved")
+                return
+
+    def _write_records(self, conversation_id: str, records: List[Dict]) -> bool:
+        """
+        Append messages and their offsets, with one fsync per file
+
+        Readers are not blocked meanwhile: they keep seeing these messages as
+        pending until both files are synced. On failure the messages stay
+        pending (and are retried by the writer) and both files are cut back.
+
+        Returns:
+            True if the messages are on disk
+        """
+        start_time = time.perf_counter()
+        data_file, index_file = self._paths(conversation_id)
+        with self._file_lock:
+            with self._lock:
+                # Repairs the index before the first write to this conversation
+                self._committed_count(conversation_id)
+            data_size = os.path.getsize(data_file) if os.path.exists(data_file) else 0
+            index_size = os.path.getsize(index_file) if os.path.exists(index_file) else 0
+            try:
+                offsets = []
+                with open(data_file, 'ab') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    for record in records:
+                        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+                        offsets.append(offset)
+                        f.write(line)
+                        offset += len(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # The index is written after the data, so it never points past the end of the file
+                with open(index_file, 'ab') as f:
+                    f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"❌ Error saving conversation {conversation_id} (will retry): {e}")
+                registry.counter("conversation_write_errors_total", "Failed conversation writes").inc()
+                self._truncate(data_file, data_size)
+                self._truncate(index_file, index_size)
+                return False
+
+            with self._lock:
+                self._counts[conversation_id] = self._counts.get(conversation_id, 0) + len(records)
+                pending = self._pending.get(conversation_id, [])
+                del pending[:len(records)]
+                if not pending:
+                    self._pending.pop(conversation_id, None)
+        registry.observe("conversation_write_ms", (time.perf_counter() - start_time) * 1000)
+        registry.counter("conversation_messages_saved_total", "Conversation messages written to disk").inc(len(records))
+        return True
+
+    @staticmethod
+    def _truncate(path: str, size: int):
+        """Cut a file back to its size before a failed write"""
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+        except OSError as e:
+            print(f"⚠️ Could not roll back {path}: {e}")
+
+    def flush(self):
+        """Block until every queued message has been written (at most flush_interval seconds)"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write remaining messages and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+
+    # Index
+
+    def _repair_index(self, data_file: str, index_file: str):
+        """
+        Make the index match the data file after a crash
+
+        A missing or torn index is rebuilt by scanning the data file once;
+        a torn last line in the data file is cut off.
+        """
+        if not os.path.exists(data_file):
+            if os.path.exists(index_file):
+                os.remove(index_file)
+            return
+
+        data_size = os.path.getsize(data_file)
+        index_size = os.path.getsize(index_file) if os.path.exists(index_file) else -1
+        if index_size >= 0 and index_size % OFFSET.size == 0:
+            if data_size == 0 and index_size == 0:
+                return
+            if index_size > 0:
+                with open(index_file, 'rb') as f:
+                    f.seek(index_size - OFFSET.size)
+                    last_offset = OFFSET.unpack(f.read(OFFSET.size))[0]
+                if last_offset < data_size:
+                    with open(data_file, 'rb') as f:
+                        f.seek(last_offset)
+                        line = f.readline()
+                    if line.endswith(b"\n") and last_offset + len(line) == data_size:
+                        return
+
+        print(f"🔧 Rebuilding conversation index {index_file}")
+        offsets = []
+        offset = 0
+        with open(data_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offsets.append(offset)
+                offset += len(line)
+        if offset != data_size:
+            with open(data_file, 'r+b') as f:
+                f.truncate(offset)
+        temp_file = index_file + ".tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(b"".join(OFFSET.pack(value) for value in offsets))
+        os.replace(temp_file, index_file)
+
+    def _committed_count(self, conversation_id: str) -> int:
+        """
+        Messages of a conversation that readers may read from disk (call with _lock held)
+
+        The index is checked and repaired the first time a conversation is
+        used; after that the count is kept in memory and only the writer
+        advances it, once a batch is completely on disk.
+        """
+        count = self._counts.get(conversation_id)
+        if count is None:
+            data_file, index_file = self._paths(conversation_id)
+            self._repair_index(data_file, index_file)
+            count = os.path.getsize(index_file) // OFFSET.size if os.path.exists(index_file) else 0
+            self._counts[conversation_id] = count
+        return count
+
+    # Reading
+
+    def count(self, conversation_id: str) -> int:
+        """Number of messages in a conversation (including ones not yet written)"""
+        with self._lock:
+            return self._committed_count(conversation_id) + len(self._pending.get(conversation_id, []))
+
+    def load_range(self, conversation_id: str, start: int, end: Optional[int] = None) -> List[Dict]:
+        """
+        Messages start..end-1 of a conversation (oldest is 0)
+
+        Only the index entries and the bytes of the requested messages are read.
+        """
+        data_file, index_file = self._paths(conversation_id)
+        with self._lock:
+            stored = self._committed_count(conversation_id)
+            pending = list(self._pending.get(conversation_id, []))
+        total = stored + len(pending)
+        end = total if end is None else min(end, total)
+        start = max(0, start)
+        if start >= end:
+            return []
+
+        # The files are read without the lock: the writer only appends past the
+        # committed messages, and pending was copied together with the count
+        messages = []
+        if start < stored:
+            stored_end = min(end, stored)
+            with open(index_file, 'rb') as f:
+                f.seek(start * OFFSET.size)
+                offsets = [value for (value,) in OFFSET.iter_unpack(f.read((stored_end - start) * OFFSET.size))]
+                next_offset = None
+                if stored_end < stored:
+                    next_offset = OFFSET.unpack(f.read(OFFSET.size))[0]
+            with open(data_file, 'rb') as f:
+                f.seek(offsets[0])
+                chunk = f.read(next_offset - offsets[0]) if next_offset is not None else f.read()
+            # Lines after the last committed message may be half written, so only parse the ones needed
+            for line in chunk.split(b"\n")[:stored_end - start]:
+                messages.append(json.loads(line))
+        if end > stored:
+            messages.extend(pending[max(0, start - stored):end - stored])
+        return messages
+
+    def load_recent(self, conversation_id: str, count: int) -> List[Dict]:
+        """The last count messages of a conversation"""
+        total = self.count(conversation_id)
+        return self.load_range(conversation_id, total - count, total)
+
+    def iter_messages(self, conversation_id: str) -> Iterator[Dict]:
+        """Stream every stored message of a conversation"""
+        data_file, _ = self._paths(conversation_id)
+        if not os.path.exists(data_file):
+            return
+        with open(data_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+
+    def list_conversations(self) -> List[Dict]:
+        """Stored conversations, most recently updated first (reads no message data)"""
+        if not os.path.isdir(self.directory):
+            return []
+        conversations = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".idx"):
+                continue
+            conversation_id = name[:-4]
+            if not self.is_valid_id(conversation_id):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            conversations.append({
+                "conversation_id": conversation_id,
+                "messages": stat.st_size // OFFSET.size,
+                "updated": stat.st_mtime
+            })
+        conversations.sort(key=lambda conversation: conversation["updated"], reverse=True)
+        return conversations
+
+    def delete(self, conversation_id: str) -> bool:
+        """Remove a conversation from disk"""
+        self.flush()
+        data_file, index_file = self._paths(conversation_id)
+        existed = False
+        with self._file_lock, self._lock:
+            for path in (data_file, index_file):
+                if os.path.exists(path):
+                    os.remove(path)
+                    existed = True
+            self._counts.pop(conversation_id, None)
+        for listener in self._listeners:
+            listener.conversation_deleted(conversation_id)
+        return existed
+
+
+def create_conversation_store() -> Optional[ConversationStore]:
+    """
+    Create a ConversationStore configured from config.py
+
+    Conversations are kept in a directory named after CONVERSATION_FILE
+    ("conversations.txt" -> "conversations/").
+
+    Returns:
+        The store, or None if SAVE_CONVERSATIONS is off
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    if not getattr(config, 'SAVE_CONVERSATIONS', False):
+        return None
+    directory = os.path.splitext(getattr(config, 'CONVERSATION_FILE', "conversations.txt"))[0]
+    return ConversationStore(directory, flush_interval=getattr(config, 'CONVERSATION_FLUSH_INTERVAL', 1.0))
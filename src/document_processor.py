@@ -7,34 +7,39 @@ Handles document upload, parsing, and storage for AI context
 import os
 import json
 import hashlib
+import importlib
+import importlib.util
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import threading
+import time
 import tkinter.ttk as ttk
 
-# Document processing libraries
-try:
-    import PyPDF2
-    # Test if we can create a PdfReader
-    PDF_AVAILABLE = True
-    print("✅ PyPDF2 imported successfully")
-except ImportError as e:
-    PDF_AVAILABLE = False
-    print(f"❌ PyPDF2 import failed: {e}")
+from lru_cache import LRUCache
+from metrics import registry
 
-try:
-    import docx
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# Document processing libraries are heavy (pandas alone takes hundreds of
+# milliseconds to import), so only check that they are installed here and
+# import each one the first time a document of that format is processed.
+def _module_available(module_name: str) -> bool:
+    """Check whether a module can be imported without importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+PDF_AVAILABLE = _module_available("PyPDF2")
+DOCX_AVAILABLE = _module_available("docx")
+PANDAS_AVAILABLE = _module_available("pandas")
+
+if not PDF_AVAILABLE:
+    print("❌ PyPDF2 not installed - PDF processing disabled")
+
+def _load_backend(module_name: str):
+    """Import a document format backend on first use"""
+    return importlib.import_module(module_name)
 
 class DocumentProcessor:
     def __init__(self, storage_dir: str = "documents"):
@@ -47,6 +52,10 @@ class DocumentProcessor:
         self.storage_dir = storage_dir
         self.documents = {}  # Store document metadata and content
         self.document_chunks = {}  # Store document chunks for context
+        self.document_texts = {}  # Normalized text per document, chunks hold offsets into it
+        self.chunk_text_cache = LRUCache(max_size=256)  # Recently materialized chunk text
+        self.context_cache = LRUCache(max_size=128)  # Retrieval results keyed by query terms
+        self._corpus_generation = 0  # Bumped whenever the document set changes
         self.chunk_size = 1000  # Characters per chunk
         self.overlap = 200  # Overlap between chunks
         
@@ -55,6 +64,7 @@ class DocumentProcessor:
         
         # Load existing documents (lazy loading to improve startup time)
         self._documents_loaded = False
+        self._chunk_loader = None  # Background thread started by load_documents()
     
     def load_documents(self):
         """Load existing documents from storage (optimized version)"""
@@ -70,6 +80,7 @@ class DocumentProcessor:
                     self.documents = json.load(f)
                 
                 print(f"Loaded {len(self.documents)} documents from metadata")
+                self._bump_corpus_generation()
                 
                 # Load chunks asynchronously to avoid blocking the UI
                 self._load_chunks_async()
@@ -85,11 +96,12 @@ class DocumentProcessor:
         """Load document chunks asynchronously to avoid blocking the UI"""
         def load_chunks_worker():
             try:
-                for doc_id in self.documents:
+                for doc_id in list(self.documents):
+                    if doc_id in self.document_chunks:
+                        continue
                     chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
                     if os.path.exists(chunks_file):
-                        with open(chunks_file, 'r', encoding='utf-8') as f:
-                            self.document_chunks[doc_id] = json.load(f)
+                        self.document_chunks[doc_id] = self._read_chunks_file(doc_id, chunks_file)
                         print(f"Loaded chunks for document: {self.documents[doc_id].get('filename', 'Unknown')}")
                     else:
                         print(f"Warning: Chunks file not found for document: {doc_id}")
@@ -98,8 +110,20 @@ class DocumentProcessor:
         
         # Start loading chunks in background
         import threading
-        thread = threading.Thread(target=load_chunks_worker, daemon=True)
-        thread.start()
+        self._chunk_loader = threading.Thread(target=load_chunks_worker, daemon=True)
+        self._chunk_loader.start()
+    
+    def wait_for_chunks(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the background chunk loader started by load_documents() is done
+        
+        Returns:
+            True if every chunk file has been read (or no loader was started)
+        """
+        if self._chunk_loader is not None:
+            self._chunk_loader.join(timeout)
+            return not self._chunk_loader.is_alive()
+        return True
     
     def get_chunks_for_document(self, doc_id: str) -> List[Dict]:
         """Get chunks for a specific document, loading them if needed"""
@@ -108,8 +132,7 @@ class DocumentProcessor:
             chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
             if os.path.exists(chunks_file):
                 try:
-                    with open(chunks_file, 'r', encoding='utf-8') as f:
-                        self.document_chunks[doc_id] = json.load(f)
+                    self.document_chunks[doc_id] = self._read_chunks_file(doc_id, chunks_file)
                 except Exception as e:
                     print(f"Error loading chunks for {doc_id}: {e}")
                     return []
@@ -118,6 +141,61 @@ class DocumentProcessor:
         
         return self.document_chunks.get(doc_id, [])
     
+    def _read_chunks_file(self, doc_id: str, chunks_file: str) -> List[Dict]:
+        """
+        Read a chunks file, supporting both storage formats
+        
+        The current format stores the normalized document text once together with
+        chunk offsets. Older files are a plain list of chunks with inline text.
+        """
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if isinstance(data, dict):
+            self.document_texts[doc_id] = data.get("text", "")
+            return data.get("chunks", [])
+        
+        # Legacy format: chunks carry their own text
+        return data
+    
+    def _serialize_chunks(self, doc_id: str, chunks: List[Dict]):
+        """Build the on-disk representation of a document's chunks"""
+        text = self.document_texts.get(doc_id)
+        if text is None:
+            # Legacy documents keep their inline chunk text
+            return chunks
+        
+        # Only keep the part of the text that chunks actually reference
+        text_end = max((chunk["end"] for chunk in chunks), default=0)
+        return {"format": 2, "text": text[:text_end], "chunks": chunks}
+    
+    def _write_chunks_file(self, doc_id: str, chunks: List[Dict]):
+        """Write a document's chunks to storage"""
+        chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
+        with open(chunks_file, 'w', encoding='utf-8') as f:
+            json.dump(self._serialize_chunks(doc_id, chunks), f, ensure_ascii=False, separators=(',', ':'))
+    
+    def get_chunk_text(self, doc_id: str, chunk: Dict) -> str:
+        """
+        Get the text of a chunk, materializing it from the document text if needed
+        
+        Args:
+            doc_id: ID of the document the chunk belongs to
+            chunk: Chunk metadata (offsets, or inline text for legacy chunks)
+            
+        Returns:
+            The chunk text
+        """
+        if "text" in chunk:
+            return chunk["text"]
+        
+        cache_key = (doc_id, chunk["start"], chunk["end"])
+        chunk_text = self.chunk_text_cache.get(cache_key)
+        if chunk_text is None:
+            chunk_text = self.document_texts.get(doc_id, "")[chunk["start"]:chunk["end"]]
+            self.chunk_text_cache.put(cache_key, chunk_text)
+        return chunk_text
+    
     def _save_documents_async(self):
         """Save documents asynchronously to avoid blocking"""
         import threading
@@ -132,9 +210,7 @@ class DocumentProcessor:
                 # Save chunks for each document (create a copy to avoid iteration issues)
                 doc_chunks_copy = dict(self.document_chunks)
                 for doc_id, chunks in doc_chunks_copy.items():
-                    chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
-                    with open(chunks_file, 'w', encoding='utf-8') as f:
-                        json.dump(chunks, f, indent=2, ensure_ascii=False)
+                    self._write_chunks_file(doc_id, chunks)
             except Exception as e:
                 print(f"Error saving documents: {e}")
         
@@ -142,6 +218,16 @@ class DocumentProcessor:
         thread = threading.Thread(target=save_worker, daemon=True)
         thread.start()
     
+    def _save_document(self, doc_id: str):
+        """Save the metadata and one document's chunks (the other chunk files are unchanged)"""
+        try:
+            metadata_file = os.path.join(self.storage_dir, "metadata.json")
+            with open(metadata_file, 'w', encoding='utf-8') as f:
+                json.dump(self.documents, f, indent=2, ensure_ascii=False)
+            self._write_chunks_file(doc_id, self.document_chunks[doc_id])
+        except Exception as e:
+            print(f"Error saving document {doc_id}: {e}")
+
     def save_documents(self):
         """Save document metadata and chunks to storage (synchronous version)"""
         try:
@@ -152,9 +238,7 @@ class DocumentProcessor:
             
             # Save chunks for each document
             for doc_id, chunks in self.document_chunks.items():
-                chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
-                with open(chunks_file, 'w', encoding='utf-8') as f:
-                    json.dump(chunks, f, indent=2, ensure_ascii=False)
+                self._write_chunks_file(doc_id, chunks)
         except Exception as e:
             print(f"Error saving documents: {e}")
     
@@ -199,6 +283,8 @@ class DocumentProcessor:
                 print(f"File too large: {file_size / 1024 / 1024:.1f}MB")
                 return None
             
+            start_time = time.perf_counter()
+            
             # Generate document ID
             doc_id = self._generate_doc_id(file_path)
             
@@ -208,6 +294,9 @@ class DocumentProcessor:
                 print(f"Could not extract text from: {file_path}")
                 return None
             
+            # Normalize once; chunks only store offsets into this text
+            text_content = self._normalize_text(text_content)
+            
             # Create document metadata
             doc_metadata = {
                 "filename": os.path.basename(file_path),
@@ -223,11 +312,20 @@ class DocumentProcessor:
             
             # Create chunks with ultra-fast processing
             chunks = self._create_chunks_ultra_fast(text_content)
+            self.document_texts[doc_id] = text_content
             self.document_chunks[doc_id] = chunks
+            self._drop_cached_chunk_text()
+            self._bump_corpus_generation()
             doc_metadata["chunks_count"] = len(chunks)
             
-            # Save to storage (synchronous to ensure it's saved)
-            self.save_documents()
+            # Save to storage (synchronous to ensure it's saved); only this document's
+            # chunks are written, so adding a document does not rewrite the whole library
+            self._save_document(doc_id)
+            
+            registry.observe("ingestion_ms", (time.perf_counter() - start_time) * 1000,
+                             "Time to extract, chunk and save a document")
+            registry.counter("ingested_documents_total", "Documents processed").inc()
+            registry.counter("ingested_bytes_total", "Bytes of document files processed").inc(file_size)
             
             print(f"Successfully processed document: {os.path.basename(file_path)}")
             print(f"Created {len(chunks)} chunks for context")
@@ -318,6 +416,7 @@ class DocumentProcessor:
         """Extract text from PDF file (ultra-fast version)"""
         text = ""
         try:
+            PyPDF2 = _load_backend("PyPDF2")
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 
@@ -358,6 +457,7 @@ class DocumentProcessor:
         """Extract text from DOCX file (ultra-fast version)"""
         text = ""
         try:
+            docx = _load_backend("docx")
             doc = docx.Document(file_path)
             # Limit paragraphs for speed
             max_paragraphs = min(100, len(doc.paragraphs))
@@ -379,6 +479,8 @@ class DocumentProcessor:
         """Extract text from spreadsheet files (ultra-fast version)"""
         text = ""
         try:
+            pd = _load_backend("pandas")
+            
             # Read only first 100 rows for speed
             if file_path.endswith(('.xlsx', '.xls')):
                 df = pd.read_excel(file_path, nrows=100)
@@ -397,6 +499,25 @@ class DocumentProcessor:
         """Extract text from spreadsheet files (legacy method)"""
         return self._extract_spreadsheet_text_fast(file_path)
     
+    def _normalize_text(self, text: str) -> str:
+        """Normalize line endings so chunk offsets are stable across platforms"""
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    
+    def _make_chunk(self, text: str, start: int, end: int) -> Optional[Dict]:
+        """Create chunk metadata for text[start:end] with surrounding whitespace trimmed"""
+        end = min(end, len(text))
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start >= end:
+            return None
+        return {
+            "start": start,
+            "end": end,
+            "length": end - start
+        }
+    
     def _create_chunks_ultra_fast(self, text: str) -> List[Dict]:
         """Create overlapping chunks from text with ultra-fast performance"""
         chunks = []
@@ -419,14 +540,9 @@ class DocumentProcessor:
                         end = i + 1
                         break
             
-            chunk_text = text[start:end].strip()
-            if chunk_text:
-                chunks.append({
-                    "text": chunk_text,
-                    "start": start,
-                    "end": end,
-                    "length": len(chunk_text)
-                })
+            chunk = self._make_chunk(text, start, end)
+            if chunk:
+                chunks.append(chunk)
             
             # Move start position with reduced overlap
             start = end - overlap
@@ -455,14 +571,9 @@ class DocumentProcessor:
                         end = i + 1
                         break
             
-            chunk_text = text[start:end].strip()
-            if chunk_text:
-                chunks.append({
-                    "text": chunk_text,
-                    "start": start,
-                    "end": end,
-                    "length": len(chunk_text)
-                })
+            chunk = self._make_chunk(text, start, end)
+            if chunk:
+                chunks.append(chunk)
             
             # Move start position with overlap
             start = end - self.overlap
@@ -492,6 +603,14 @@ class DocumentProcessor:
         # Simple keyword matching for now
         # In a more advanced implementation, you could use embeddings or semantic search
         query_words = query.lower().split()
+        
+        # Scores only depend on the multiset of query words, so sorted terms plus the
+        # corpus generation identify a result exactly
+        cache_key = (self._corpus_generation, tuple(sorted(query_words)), max_chunks)
+        cached_context = self.context_cache.get(cache_key)
+        if cached_context is not None:
+            return cached_context
+        
         relevant_chunks = []
         
         for doc_id in self.documents:
@@ -502,7 +621,7 @@ class DocumentProcessor:
             chunks = self.get_chunks_for_document(doc_id)
             
             for chunk in chunks:
-                chunk_text = chunk["text"].lower()
+                chunk_text = self.get_chunk_text(doc_id, chunk).lower()
                 score = 0
                 
                 # Simple keyword scoring
@@ -524,9 +643,40 @@ class DocumentProcessor:
         # Build context string
         context_parts = []
         for item in relevant_chunks[:max_chunks]:
-            context_parts.append(f"From document '{item['filename']}':\n{item['chunk']['text']}\n")
+            chunk_text = self.get_chunk_text(item['doc_id'], item['chunk'])
+            context_parts.append(f"From document '{item['filename']}':\n{chunk_text}\n")
         
-        return "\n".join(context_parts)
+        context = "\n".join(context_parts)
+        self.context_cache.put(cache_key, context)
+        return context
+    
+    def get_corpus_fingerprint(self) -> str:
+        """Get an identifier for the current document set (stable across restarts)"""
+        return hashlib.md5(",".join(sorted(self.documents)).encode()).hexdigest()[:16]
+    
+    def get_cache_stats(self) -> Dict:
+        """Get statistics for the retrieval and chunk text caches"""
+        return {
+            'corpus_generation': self._corpus_generation,
+            'context_cache': self.context_cache.get_stats(),
+            'chunk_text_cache': self.chunk_text_cache.get_stats()
+        }
+    
+    def get_chunk_store_stats(self) -> Dict:
+        """Get document, chunk and on-disk size totals without loading any chunks"""
+        total_chunks = 0
+        total_text = 0
+        total_size = 0
+        for doc_id, metadata in list(self.documents.items()):
+            total_chunks += metadata.get("chunks_count", 0)
+            total_text += metadata.get("content_length", 0)
+            total_size += self._get_document_storage_size(doc_id)
+        return {
+            'documents': len(self.documents),
+            'chunks': total_chunks,
+            'text_bytes': total_text,
+            'disk_bytes': total_size
+        }
     
     def list_documents(self) -> List[Dict]:
         """Get list of all uploaded documents"""
@@ -559,6 +709,10 @@ class DocumentProcessor:
             if doc_id in self.document_chunks:
                 del self.document_chunks[doc_id]
             
+            self.document_texts.pop(doc_id, None)
+            self._drop_cached_chunk_text()
+            self._bump_corpus_generation()
+            
             # Remove chunk file
             chunks_file = os.path.join(self.storage_dir, f"{doc_id}_chunks.json")
             if os.path.exists(chunks_file):
@@ -570,6 +724,15 @@ class DocumentProcessor:
             print(f"Error removing document {doc_id}: {e}")
             return False
     
+    def _drop_cached_chunk_text(self):
+        """Forget materialized chunk text after the document set changes"""
+        self.chunk_text_cache.clear()
+    
+    def _bump_corpus_generation(self):
+        """Invalidate cached retrieval results after the document set changes"""
+        self._corpus_generation += 1
+        self.context_cache.clear()
+    
     def remove_multiple_documents(self, doc_ids: List[str]) -> Dict[str, bool]:
         """Remove multiple documents and return success status for each"""
         results = {}
@@ -621,6 +784,9 @@ class DocumentProcessor:
         """Remove all documents"""
         self.documents.clear()
         self.document_chunks.clear()
+        self.document_texts.clear()
+        self._drop_cached_chunk_text()
+        self._bump_corpus_generation()
         self.save_documents()
         
         # Clean up chunk files
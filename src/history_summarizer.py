@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Rolling conversation summaries for Llamita
+Older turns are compressed by a small model in the background so prompts stay the same size
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from metrics import registry
+from request_scheduler import BACKGROUND
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below between a user and the assistant Llamita in at most {words} words. "
+    "Keep facts, names, numbers, preferences and decisions the user may refer to later. "
+    "Write plain sentences, no preamble.\n\n"
+    "{previous}"
+    "Conversation:\n{conversation}\n\n"
+    "Summary:"
+)
+MAX_RETRY_BACKOFF = 600.0  # Longest wait in seconds before retrying a session whose summaries keep failing
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    return estimate_tokens(message["content"]) + 2
+
+
+class HistorySummarizer:
+    def __init__(self, ollama_client, model: str, max_history_tokens: int = 1024, max_summary_tokens: int = 256,
+                 keep_recent: int = 4, timeout: float = 120, max_input_tokens: int = 2048,
+                 history_limit_factor: int = 4, retry_backoff: float = 30.0):
+        """
+        Initialize the summarizer
+
+        Args:
+            ollama_client: Client used for summary generations (background priority)
+            model: Small model that writes the summaries
+            max_history_tokens: Ceiling for summary + verbatim history in each prompt
+            max_summary_tokens: Maximum length of the rolling summary
+            keep_recent: Most recent messages that are never summarized
+            timeout: Summary request timeout in seconds
+            max_input_tokens: Most history tokens folded in by one summary request
+                              (longer backlogs are summarized a batch at a time)
+            history_limit_factor: Sessions keep at most this many times max_history_length
+                                  exchanges, a backstop for when summaries keep failing
+            retry_backoff: Seconds before a session is summarized again after a failure
+                           (doubles with every further failure, up to MAX_RETRY_BACKOFF)
+        """
+        self.ollama_client = ollama_client
+        self.model = model
+        self.max_history_tokens = max_history_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.keep_recent = keep_recent
+        self.timeout = timeout
+        self.max_input_tokens = max_input_tokens
+        self.history_limit_factor = history_limit_factor
+        self.retry_backoff = retry_backoff
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._pending = set()
+        self._failures: Dict[str, Tuple[int, float]] = {}  # session id -> (failures in a row, retry time)
+        self._lock = threading.Lock()
+
+    def max_messages(self, session) -> int:
+        """Hard limit on the number of messages in a session's history"""
+        return max(self.keep_recent + 2, session.max_history_length * 2 * self.history_limit_factor)
+
+    def prompt_history(self, history: List[Dict], summary: str = "") -> List[Dict]:
+        """
+        The most recent messages that fit under the token ceiling
+
+        Older messages are left out of the prompt even before they have been
+        summarized, so prompt size never grows past the ceiling.
+        """
+        budget = self.max_history_tokens - estimate_tokens(summary)
+        selected = []
+        for message in reversed(history):
+            budget -= message_tokens(message)
+            if budget < 0:
+                break
+            selected.append(message)
+        selected.reverse()
+        return selected
+
+    def needs_summary(self, session) -> bool:
+        with session.lock:
+            if len(session.history) <= self.keep_recent:
+                return False
+            tokens = estimate_tokens(session.summary) + sum(message_tokens(message) for message in session.history)
+        return tokens > self.max_history_tokens
+
+    def maybe_summarize(self, session):
+        """Queue a background summary of the session's older turns if its history is over the ceiling"""
+        if not self.needs_summary(session):
+            return
+        with self._lock:
+            if session.session_id in self._pending:
+                return
+            failure = self._failures.get(session.session_id)
+            if failure and time.monotonic() < failure[1]:
+                return
+            self._pending.add(session.session_id)
+        self._executor.submit(self._summarize, session)
+
+    def _summary_batch(self, older: List[Dict]) -> List[Dict]:
+        """The oldest messages that fit in one summary request (at least one)"""
+        budget = self.max_input_tokens
+        for count, message in enumerate(older):
+            budget -= message_tokens(message)
+            if budget < 0:
+                return older[:max(1, count)]
+        return older
+
+    def _record_failure(self, session_id: str):
+        with self._lock:
+            failures = self._failures.get(session_id, (0, 0.0))[0] + 1
+            delay = min(MAX_RETRY_BACKOFF, self.retry_backoff * 2 ** (failures - 1))
+            self._failures[session_id] = (failures, time.monotonic() + delay)
+        registry.counter("history_summary_failures_total", "Conversation summaries that failed").inc()
+        print(f"⏳ Summarizing session {session_id} failed, retrying in {delay:g}s")
+
+    def _summarize(self, session):
+        summarized = False
+        try:
+            with session.lock:
+                older = self._summary_batch(session.history[:-self.keep_recent])
+                previous = session.summary
+            if not older:
+                return
+
+            summary = self.summarize(older, previous)
+            if not summary:
+                self._record_failure(session.session_id)
+                return
+
+            with session.lock:
+                # The history may have been cleared while the summary was generated
+                if session.history[:len(older)] != older:
+                    return
+                session.history = session.history[len(older):]
+                session.summary = summary
+            summarized = True
+            with self._lock:
+                self._failures.pop(session.session_id, None)
+            registry.counter("history_summaries_total", "Conversation summaries generated").inc()
+            print(f"🗜️ Summarized {len(older)} older messages of session {session.session_id}")
+        except Exception as e:
+            print(f"⚠️ Error summarizing conversation: {e}")
+            self._record_failure(session.session_id)
+        finally:
+            with self._lock:
+                self._pending.discard(session.session_id)
+        if summarized:
+            # Turns added while this summary was generated, or ones left for the next batch,
+            # may still be over the ceiling
+            self.maybe_summarize(session)
+
+    def summarize(self, messages: List[Dict], previous: str = "") -> Optional[str]:
+        """
+        Fold messages into the previous summary
+
+        Returns:
+            The new summary, or None if the model could not produce one
+        """
+        # A single huge message is cut so the request stays under max_input_tokens
+        max_chars = self.max_input_tokens * 4
+        conversation = "\n".join(
+            f"{'User' if message['role'] == 'user' else 'Llamita'}: {message['content'][:max_chars]}"
+            for message in messages
+        )
+        prompt = SUMMARY_PROMPT.format(
+            words=self.max_summary_tokens * 3 // 4,
+            previous=f"Summary so far:\n{previous}\n\n" if previous else "",
+            conversation=conversation
+        )
+        try:
+            with registry.span("history_summary"):
+                result = self.ollama_client.generate(prompt, self.model, options={"num_predict": self.max_summary_tokens},
+                                                     timeout=self.timeout, priority=BACKGROUND)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Conversation summary failed: {e}")
+            return None
+        if result is None:
+            return None
+
+        summary = result.get("response", "").strip()
+        # Enforce the ceiling even if the model ignored the length instruction
+        return summary[:self.max_summary_tokens * 4]
+
+
+def create_history_summarizer(ollama_client) -> Optional[HistorySummarizer]:
+    """
+    Create a HistorySummarizer configured from config.py
+
+    Returns:
+        The summarizer, or None if HISTORY_SUMMARY_ENABLED is off
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    if not getattr(config, 'HISTORY_SUMMARY_ENABLED', False):
+        return None
+    return HistorySummarizer(
+        ollama_client,
+        getattr(config, 'SUMMARY_MODEL', "llama3.2:1b"),
+        max_history_tokens=getattr(config, 'HISTORY_MAX_TOKENS', 1024),
+        max_summary_tokens=getattr(config, 'SUMMARY_MAX_TOKENS', 256),
+        keep_recent=getattr(config, 'SUMMARY_KEEP_RECENT', 4),
+        max_input_tokens=getattr(config, 'SUMMARY_MAX_INPUT_TOKENS', 2048),
+        history_limit_factor=getattr(config, 'HISTORY_LIMIT_FACTOR', 4),
+        retry_backoff=getattr(config, 'SUMMARY_RETRY_BACKOFF', 30.0)
+    )
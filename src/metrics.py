@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for Llamita
+Counters, histograms and timing spans for the chat and document pipeline
+"""
+
+import math
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Bucket upper bounds in milliseconds, used for every *_ms histogram
+DEFAULT_MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers (shared with the benchmark scripts)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # The smallest value with at least fraction of the values at or below it
+    # (the tolerance keeps e.g. 0.9 * 100 = 90.00000000000001 at rank 90)
+    rank = math.ceil(fraction * len(ordered) - 1e-9)
+    return ordered[min(len(ordered) - 1, max(0, rank - 1))]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict:
+        return {"type": "counter", "value": self.value}
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_MS_BUCKETS,
+                 reservoir_size: int = 1024):
+        """
+        Histogram with fixed buckets plus a window of recent values for percentiles
+
+        Args:
+            name: Metric name
+            help_text: Description of the metric
+            buckets: Sorted bucket upper bounds
+            reservoir_size: Number of recent observations kept for percentiles
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._recent = deque(maxlen=reservoir_size)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self._recent.append(value)
+
+    def cumulative_buckets(self):
+        """Get (upper bound, cumulative count) pairs, ending with +Inf, plus count and sum"""
+        with self._lock:
+            counts = list(self.bucket_counts)
+            count = self.count
+            total = self.sum
+        pairs = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            pairs.append((bound, running))
+        return pairs, count, total
+
+    def percentile(self, fraction: float) -> float:
+        """Percentile over the recent observations"""
+        with self._lock:
+            recent = list(self._recent)
+        return percentile(recent, fraction)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            count = self.count
+            total = self.sum
+        return {
+            "type": "histogram",
+            "count": count,
+            "sum": round(total, 3),
+            "mean": round(total / count, 3) if count else 0.0,
+            "p50": round(self.percentile(0.5), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "p99": round(self.percentile(0.99), 3)
+        }
+
+
+class LogHistogram:
+    def __init__(self, relative_error: float = 0.01):
+        """
+        Streaming percentile sketch with logarithmic buckets
+
+        Every value is counted in the bucket [gamma^(i-1), gamma^i), so memory
+        depends on the range of values, not on how many were recorded, and
+        percentiles are accurate to within relative_error.
+
+        Args:
+            relative_error: Maximum relative error of reported percentiles
+        """
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float, count: int = 1):
+        self.count += count
+        self.sum += value * count
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        if rank <= self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 2) if self.count else 0.0,
+            "p50": round(self.percentile(0.5), 2),
+            "p95": round(self.percentile(0.95), 2),
+            "p99": round(self.percentile(0.99), 2)
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_error": self.relative_error,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(index): count for index, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LogHistogram":
+        sketch = cls(data.get("relative_error", 0.01))
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        return sketch
+
+
+class MetricsRegistry:
+    def __init__(self, trace_history: int = 50):
+        """
+        Initialize the registry
+
+        Args:
+            trace_history: Number of recent per-request timing traces to keep
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=trace_history)
+        self._collectors = []
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Get or create a counter"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, help_text)
+            return metric
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        """Get or create a gauge"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Gauge(name, help_text)
+            return metric
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]):
+        """
+        Register a callback that updates gauges whenever metrics are read
+
+        Used for values that are cheap to read on demand (cache sizes, hit
+        rates) so nothing has to be updated on the hot path.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[["MetricsRegistry"], None]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_MS_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help_text, buckets)
+            return metric
+
+    def observe(self, name: str, value: float, help_text: str = ""):
+        """Record a value in the named histogram"""
+        self.histogram(name, help_text).observe(value)
+
+    @contextmanager
+    def span(self, name: str, trace: Optional[Dict] = None):
+        """
+        Time a block of code in milliseconds
+
+        The duration is recorded in the histogram '<name>_ms' and, when given,
+        stored in trace[name + '_ms'].
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self.observe(f"{name}_ms", elapsed_ms)
+            if trace is not None:
+                trace[f"{name}_ms"] = round(elapsed_ms, 2)
+
+    def record_trace(self, trace: Dict):
+        """Keep the timing breakdown of one request"""
+        self._traces.append(dict(trace, timestamp=time.time()))
+
+    def recent_traces(self) -> List[Dict]:
+        """Get the most recent request traces, newest last"""
+        return list(self._traces)
+
+    def metrics(self) -> List:
+        """Get all registered metrics, after running the collectors"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"⚠️ Metrics collector error: {e}")
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict:
+        """Get the current value of every metric"""
+        return {metric.name: metric.snapshot() for metric in self.metrics()}
+
+    def reset(self):
+        """Drop every metric and trace"""
+        with self._lock:
+            self._metrics.clear()
+            self._collectors.clear()
+        self._traces.clear()
+
+
+# Shared registry used by the app
+registry = MetricsRegistry()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Prometheus-style metrics endpoint for Llamita
+Serves the shared metrics registry in the text exposition format
+"""
+
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from metrics import Counter, Gauge, Histogram, MetricsRegistry, registry
+
+METRIC_PREFIX = "llamita_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metric_name(name: str) -> str:
+    return METRIC_PREFIX + re.sub(r'[^a-zA-Z0-9_:]', '_', name)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def render_metrics(metrics_registry: MetricsRegistry = registry) -> str:
+    """
+    Render every metric in the Prometheus text exposition format
+
+    Args:
+        metrics_registry: Registry to export
+
+    Returns:
+        Exposition text, one block per metric
+    """
+    lines = []
+    for metric in sorted(metrics_registry.metrics(), key=lambda m: m.name):
+        name = _metric_name(metric.name)
+        if metric.help_text:
+            lines.append(f"# HELP {name} {_escape_help(metric.help_text)}")
+
+        if isinstance(metric, Histogram):
+            lines.append(f"# TYPE {name} histogram")
+            buckets, count, total = metric.cumulative_buckets()
+            for bound, cumulative in buckets:
+                lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f"{name}_sum {_format_value(round(total, 6))}")
+            lines.append(f"{name}_count {count}")
+        elif isinstance(metric, Counter):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {_format_value(metric.value)}")
+        elif isinstance(metric, Gauge):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics(self.server.metrics_registry).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsExporter:
+    """HTTP server exposing /metrics from a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464,
+                 metrics_registry: MetricsRegistry = registry):
+        """
+        Initialize the exporter
+
+        Args:
+            host: Interface to listen on (localhost only by default)
+            port: Port to listen on (0 picks a free port)
+            metrics_registry: Registry to export
+        """
+        self.host = host
+        self.port = port
+        self.metrics_registry = metrics_registry
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> bool:
+        """Start serving; returns False if the port could not be opened"""
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        except OSError as e:
+            print(f"⚠️ Metrics exporter could not start on {self.host}:{self.port}: {e}")
+            return False
+        self.httpd.daemon_threads = True
+        self.httpd.metrics_registry = self.metrics_registry
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📈 Metrics available at {self.url}")
+        return True
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
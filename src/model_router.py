@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Small/large model routing for Llamita
+Simple chit-chat goes to a fast small model, complex or document questions to the large one
+"""
+
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from metrics import LogHistogram, registry
+
+SMALL = "small"
+LARGE = "large"
+ROUTES = (SMALL, LARGE)
+
+# Words that usually mean the user wants reasoning, not small talk
+COMPLEX_WORDS = {
+    "analyze", "analyse", "calculate", "code", "compare", "debug", "derive", "describe", "difference",
+    "explain", "implement", "list", "plan", "prove", "reason", "step", "steps", "summarize",
+    "summarise", "translate", "why", "write"
+}
+CODE_PATTERN = re.compile(r"```|\bdef |\bclass |[{};]\s*$|=>|\bSELECT\b", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+# Timings summarised per route
+ROUTE_TIMINGS = ("ttft_ms", "generation_ms")
+
+
+class ModelRouter:
+    def __init__(self, small_model: str, large_model: str, max_small_words: int = 12):
+        """
+        Initialize the router
+
+        Args:
+            small_model: Fast model for short, simple messages
+            large_model: Model for everything else
+            max_small_words: Longest message (in words) the small model may answer
+        """
+        self.small_model = small_model
+        self.large_model = large_model
+        self.max_small_words = max_small_words
+
+        self._lock = threading.Lock()
+        self._stats = {route: {"turns": 0, "reasons": {}, **{name: LogHistogram() for name in ROUTE_TIMINGS}}
+                       for route in ROUTES}
+
+    def classify(self, message: str, document_context: str = "") -> Tuple[str, str]:
+        """
+        Decide which model should answer
+
+        Returns:
+            (route, reason), e.g. ("large", "documents") or ("small", "simple")
+        """
+        if document_context:
+            return LARGE, "documents"
+        words = WORD_PATTERN.findall(message.lower())
+        if len(words) > self.max_small_words:
+            return LARGE, "long"
+        if CODE_PATTERN.search(message):
+            return LARGE, "code"
+        if COMPLEX_WORDS.intersection(words):
+            return LARGE, "complex"
+        return SMALL, "simple"
+
+    def model_for(self, route: str) -> str:
+        return self.small_model if route == SMALL else self.large_model
+
+    def route(self, message: str, document_context: str = "") -> Tuple[str, str, str]:
+        """
+        Classify a message and count the decision
+
+        Returns:
+            (model, route, reason)
+        """
+        route, reason = self.classify(message, document_context)
+        with self._lock:
+            stats = self._stats[route]
+            stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+        registry.counter(f"route_{route}_total", f"Messages routed to the {route} model").inc()
+        return self.model_for(route), route, reason
+
+    def record(self, route: str, timings: Dict):
+        """Add a finished turn's timings to the route's latency statistics"""
+        with self._lock:
+            stats = self._stats[route]
+            stats["turns"] += 1
+            for name in ROUTE_TIMINGS:
+                if name in timings:
+                    stats[name].add(timings[name])
+        for name in ROUTE_TIMINGS:
+            if name in timings:
+                registry.observe(f"route_{route}_{name}", timings[name])
+
+    def get_stats(self) -> Dict:
+        """Turns, routing reasons and latency percentiles per route"""
+        with self._lock:
+            return {
+                route: {
+                    "model": self.model_for(route),
+                    "turns": stats["turns"],
+                    "reasons": dict(stats["reasons"]),
+                    **{name: stats[name].summary() for name in ROUTE_TIMINGS}
+                }
+                for route, stats in self._stats.items()
+            }
+
+
+def create_model_router(large_model: Optional[str] = None) -> Optional[ModelRouter]:
+    """
+    Create a ModelRouter configured from config.py
+
+    Returns:
+        The router, or None if MODEL_ROUTING_ENABLED is off
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    if not getattr(config, 'MODEL_ROUTING_ENABLED', False):
+        return None
+    return ModelRouter(
+        getattr(config, 'SMALL_MODEL', "llama3.2:1b"),
+        large_model or getattr(config, 'DEFAULT_MODEL', "llama3:8b"),
+        max_small_words=getattr(config, 'ROUTING_MAX_SMALL_WORDS', 12)
+    )
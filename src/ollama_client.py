@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Ollama HTTP client for Llamita
+Single place where requests to the Ollama API are built and sent
+"""
+
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from backend_pool import BackendPool
+from metrics import registry
+from request_scheduler import BACKGROUND, EMBEDDING, INTERACTIVE, RequestScheduler, get_default_scheduler
+
+# Histogram buckets for generation speed (tokens per second)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500)
+
+
+class GenerationCancelled(Exception):
+    """Raised from a token callback to stop a generation (the client went away or the chat was cleared)"""
+
+
+class OllamaClient:
+    def __init__(self, url: str = "http://localhost:11434/api/generate", keep_alive: Optional[str] = "30m",
+                 scheduler: Optional[RequestScheduler] = None, pool: Optional[BackendPool] = None):
+        """
+        Initialize the client
+
+        Args:
+            url: Ollama generate URL (or the server base URL)
+            keep_alive: How long Ollama keeps a model loaded after each request
+                        (e.g. "30m", "-1" for forever, None for the server default)
+            scheduler: Limits concurrent requests by priority (default: shared by all clients)
+            pool: Spread requests across several Ollama servers instead of url
+                  (the scheduler's per-server limits are scaled to its healthy backends)
+        """
+        self.base_url = url.rsplit('/api/', 1)[0].rstrip('/')
+        self.keep_alive = keep_alive
+        self.scheduler = scheduler or get_default_scheduler()
+        self.pool = pool
+        if pool is not None:
+            pool.add_listener(self.scheduler.set_backends)
+
+    def _call(self, model: str, send: Callable[[str], object]):
+        """
+        Run send(base_url) against the server for this request
+
+        With a backend pool the least busy healthy backend is used, and the
+        request moves on to the next one if the connection fails.
+        """
+        if self.pool is None:
+            return send(self.base_url)
+
+        tried = []
+        while True:
+            backend = self.pool.choose(model, exclude=tried)
+            if backend is None:
+                raise requests.exceptions.ConnectionError("No Ollama backend could be reached")
+            tried.append(backend)
+            try:
+                with self.pool.lease(backend, model):
+                    return send(backend.base_url)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # The pool marked the backend down; try the next one
+                registry.counter("ollama_failovers_total", "Requests retried on another Ollama backend").inc()
+
+    def _with_keep_alive(self, data: Dict) -> Dict:
+        if self.keep_alive is not None:
+            data["keep_alive"] = self.keep_alive
+        return data
+
+    def generate(self, prompt: str, model: str, options: Optional[Dict] = None, timeout: float = 30,
+                 on_token: Optional[Callable[[str], None]] = None, priority: str = INTERACTIVE) -> Optional[Dict]:
+        """
+        Run a generation and wait for the complete answer
+        
+        The response is streamed from Ollama so time-to-first-token can be
+        measured; the pieces are joined before returning.
+
+        Args:
+            prompt: Fully assembled prompt
+            model: Model name
+            options: Ollama model options (temperature, etc.)
+            timeout: Request timeout in seconds
+            on_token: Called with each piece of text as it arrives
+            priority: Scheduler class (interactive, embedding or background)
+
+        Returns:
+            Ollama's final JSON response with the full 'response' text and a
+            'timings' dict (milliseconds), or None if the server returned an error
+
+        Raises:
+            requests.exceptions.RequestException: If Ollama cannot be reached
+                (SchedulerBusy if too many requests are already waiting)
+        """
+        with self.scheduler.slot(priority) as queue_ms:
+            result = self._call(model, lambda base_url: self._generate(base_url, prompt, model, options,
+                                                                       timeout, on_token))
+        if result is not None:
+            result["timings"]["queue_ms"] = round(queue_ms, 2)
+        return result
+
+    def _generate(self, base_url: str, prompt: str, model: str, options: Optional[Dict], timeout: float,
+                  on_token: Optional[Callable[[str], None]]) -> Optional[Dict]:
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True
+        }
+        if options:
+            data["options"] = options
+
+        registry.counter("ollama_requests_total", "Generate requests sent to Ollama").inc()
+        timings = {}
+        start_time = time.perf_counter()
+        try:
+            response = requests.post(f"{base_url}/api/generate", json=self._with_keep_alive(data),
+                                     timeout=timeout, stream=True)
+        except requests.exceptions.RequestException:
+            registry.counter("ollama_errors_total", "Failed Ollama requests").inc()
+            raise
+        timings["http_send_ms"] = (time.perf_counter() - start_time) * 1000
+
+        with response:
+            if response.status_code != 200:
+                registry.counter("ollama_errors_total", "Failed Ollama requests").inc()
+                print(f"❌ Ollama error: {response.status_code}")
+                return None
+
+            pieces = []
+            result = {}
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    piece = result.get("response", "")
+                    if piece:
+                        if not pieces:
+                            timings["ttft_ms"] = (time.perf_counter() - start_time) * 1000
+                        pieces.append(piece)
+                        if on_token:
+                            on_token(piece)
+            except requests.exceptions.RequestException as e:
+                registry.counter("ollama_errors_total", "Failed Ollama requests").inc()
+                if pieces:
+                    # Part of the answer was already delivered, so it cannot be retried elsewhere
+                    raise requests.exceptions.ChunkedEncodingError(f"Ollama stream interrupted: {e}") from e
+                raise
+
+        timings["generation_ms"] = (time.perf_counter() - start_time) * 1000
+        result["response"] = "".join(pieces)
+        result["timings"] = self._record_timings(model, timings, result)
+        return result
+
+    def _record_timings(self, model: str, timings: Dict, result: Dict) -> Dict:
+        """Add Ollama's own statistics to the client timings and record them as metrics"""
+        # Ollama reports durations in nanoseconds
+        if result.get("prompt_eval_duration"):
+            timings["prompt_eval_ms"] = result["prompt_eval_duration"] / 1e6
+        if result.get("load_duration"):
+            timings["load_ms"] = result["load_duration"] / 1e6
+        if result.get("eval_count") and result.get("eval_duration"):
+            timings["tokens_per_s"] = result["eval_count"] / (result["eval_duration"] / 1e9)
+            registry.histogram("ollama_tokens_per_s", "Generation speed in tokens per second", TOKEN_RATE_BUCKETS)
+
+        for name, value in timings.items():
+            registry.observe(f"ollama_{name}", value)
+        if "tokens_per_s" in timings:
+            registry.counter("ollama_generated_tokens_total", "Tokens generated by Ollama").inc(result["eval_count"])
+
+        timings = {name: round(value, 2) for name, value in timings.items()}
+        timings["model"] = model
+        timings["prompt_tokens"] = result.get("prompt_eval_count", 0)
+        timings["eval_count"] = result.get("eval_count", 0)
+        return timings
+
+    def embeddings(self, text: str, model: str, timeout: float = 10,
+                   priority: str = EMBEDDING) -> Optional[List[float]]:
+        """
+        Get an embedding vector for text
+
+        Raises:
+            requests.exceptions.RequestException: If Ollama cannot be reached
+        """
+        data = {"model": model, "prompt": text}
+        with self.scheduler.slot(priority):
+            response = self._call(model, lambda base_url: requests.post(
+                f"{base_url}/api/embeddings", json=self._with_keep_alive(data), timeout=timeout))
+        if response.status_code != 200:
+            print(f"❌ Ollama embedding error: {response.status_code}")
+            return None
+        return response.json().get('embedding')
+
+    def warm_up(self, model: str, timeout: float = 120, priority: str = BACKGROUND) -> bool:
+        """
+        Load a model into memory without generating anything
+
+        An empty prompt makes Ollama load the model and return immediately,
+        so the first real message does not pay the model load time.
+
+        Returns:
+            True if the model is loaded and ready
+        """
+        try:
+            data = {"model": model, "prompt": ""}
+            with self.scheduler.slot(priority):
+                response = self._call(model, lambda base_url: requests.post(
+                    f"{base_url}/api/generate", json=self._with_keep_alive(data), timeout=timeout))
+            if response.status_code == 200:
+                return True
+            print(f"⚠️ Model warm-up failed: {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Model warm-up failed: {e}")
+        return False
+
+
+def create_ollama_client() -> OllamaClient:
+    """
+    Create an OllamaClient configured from config.py
+
+    With more than one entry in OLLAMA_URLS, requests are balanced across
+    those servers; otherwise OLLAMA_URL is used.
+    """
+    try:
+        import config
+    except ImportError:
+        config = None
+
+    url = getattr(config, 'OLLAMA_URL', "http://localhost:11434/api/generate")
+    urls = list(getattr(config, 'OLLAMA_URLS', None) or [])
+    pool = None
+    if len(urls) > 1:
+        pool = BackendPool(
+            urls,
+            health_check_interval=getattr(config, 'OLLAMA_HEALTH_CHECK_INTERVAL', 15),
+            affinity_weight=getattr(config, 'OLLAMA_AFFINITY_WEIGHT', 2)
+        )
+        pool.start()
+        print(f"🔀 Balancing Ollama requests across {len(urls)} servers")
+    elif urls:
+        url = urls[0]
+    return OllamaClient(url, keep_alive=getattr(config, 'OLLAMA_KEEP_ALIVE', "30m"), pool=pool)
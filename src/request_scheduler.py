@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Priority scheduling for Ollama requests
+Keeps interactive chat fast while embeddings, warm-up and background work share the server
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+
+from metrics import registry
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"
+EMBEDDING = "embedding"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, EMBEDDING, BACKGROUND)
+
+DEFAULT_MAX_IN_FLIGHT = {INTERACTIVE: 2, EMBEDDING: 1, BACKGROUND: 1}
+
+
+class SchedulerBusy(requests.exceptions.RequestException):
+    """Raised instead of queueing when too many requests are already waiting"""
+
+
+class RequestScheduler:
+    def __init__(self, max_in_flight: Optional[Dict[str, int]] = None, max_parallel: int = 2,
+                 max_queued: int = 32, queue_timeout: float = 60.0):
+        """
+        Initialize the scheduler
+
+        A request starts when its class is below its in-flight limit, the total
+        is below max_parallel, and no higher priority class has a request
+        waiting that could start. Within a class requests start in arrival order.
+
+        Limits are per Ollama server. With a backend pool they are multiplied
+        by the number of healthy backends (see set_backends), so adding
+        servers adds capacity; the pool spreads the requests across them.
+
+        Args:
+            max_in_flight: Maximum concurrent requests per priority class and server
+            max_parallel: Maximum concurrent requests per server (Ollama's OLLAMA_NUM_PARALLEL)
+            max_queued: Requests allowed to wait per class before new ones are rejected
+            queue_timeout: Seconds a request may wait before it is rejected
+        """
+        self.max_in_flight = dict(DEFAULT_MAX_IN_FLIGHT)
+        self.max_in_flight.update(max_in_flight or {})
+        self.max_parallel = max_parallel
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.backends = 1
+
+        self._in_flight = {priority: 0 for priority in PRIORITIES}
+        self._waiting = {priority: deque() for priority in PRIORITIES}
+        self._condition = threading.Condition()
+
+    def _can_start(self, priority: str, ticket) -> bool:
+        if self._waiting[priority][0] is not ticket:
+            return False
+        if sum(self._in_flight.values()) >= self.max_parallel * self.backends:
+            return False
+        if self._in_flight[priority] >= self.max_in_flight[priority] * self.backends:
+            return False
+        for higher in PRIORITIES[:PRIORITIES.index(priority)]:
+            if self._waiting[higher] and self._in_flight[higher] < self.max_in_flight[higher] * self.backends:
+                return False
+        return True
+
+    def set_backends(self, count: int):
+        """Scale the limits to the number of Ollama servers requests are spread across"""
+        with self._condition:
+            self.backends = max(1, count)
+            # Waiting requests may be able to start now
+            self._condition.notify_all()
+
+    def capacity(self, priority: str = INTERACTIVE) -> int:
+        """Requests of a class that can run at once with the current number of backends"""
+        return min(self.max_in_flight[priority], self.max_parallel) * self.backends
+
+    def _update_gauges(self):
+        for priority in PRIORITIES:
+            registry.gauge(f"ollama_queue_depth_{priority}", f"Waiting {priority} Ollama requests").set(
+                len(self._waiting[priority]))
+            registry.gauge(f"ollama_in_flight_{priority}", f"Running {priority} Ollama requests").set(
+                self._in_flight[priority])
+
+    def acquire(self, priority: str = INTERACTIVE) -> float:
+        """
+        Wait for a slot
+
+        Returns:
+            Milliseconds spent waiting
+
+        Raises:
+            SchedulerBusy: If the queue for this class is full or the wait timed out
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITIES}")
+
+        start_time = time.perf_counter()
+        with self._condition:
+            if len(self._waiting[priority]) >= self.max_queued:
+                registry.counter("ollama_rejected_total", "Ollama requests rejected by the scheduler").inc()
+                raise SchedulerBusy(f"Too many {priority} requests waiting for Ollama")
+
+            ticket = object()
+            self._waiting[priority].append(ticket)
+            self._update_gauges()
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while not self._can_start(priority, ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        registry.counter("ollama_rejected_total", "Ollama requests rejected by the scheduler").inc()
+                        raise SchedulerBusy(f"Waited {self.queue_timeout:g}s for an Ollama slot")
+                    self._condition.wait(remaining)
+            except BaseException:
+                self._waiting[priority].remove(ticket)
+                self._update_gauges()
+                self._condition.notify_all()
+                raise
+
+            self._waiting[priority].popleft()
+            self._in_flight[priority] += 1
+            self._update_gauges()
+            # The next request in line may be able to start as well
+            self._condition.notify_all()
+
+        wait_ms = (time.perf_counter() - start_time) * 1000
+        registry.observe(f"ollama_queue_wait_{priority}_ms", wait_ms)
+        return wait_ms
+
+    def release(self, priority: str = INTERACTIVE):
+        with self._condition:
+            self._in_flight[priority] -= 1
+            self._update_gauges()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE):
+        """Hold a slot for the duration of a request; yields the wait in milliseconds"""
+        wait_ms = self.acquire(priority)
+        try:
+            yield wait_ms
+        finally:
+            self.release(priority)
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {
+                priority: {
+                    "in_flight": self._in_flight[priority],
+                    "waiting": len(self._waiting[priority]),
+                    "max_in_flight": self.max_in_flight[priority] * self.backends
+                }
+                for priority in PRIORITIES
+            }
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """Scheduler shared by every OllamaClient in the process, configured from config.py"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            try:
+                import config
+            except ImportError:
+                config = None
+            _default_scheduler = RequestScheduler(
+                max_in_flight=getattr(config, 'OLLAMA_MAX_IN_FLIGHT', None),
+                max_parallel=getattr(config, 'OLLAMA_MAX_PARALLEL', 2),
+                max_queued=getattr(config, 'OLLAMA_MAX_QUEUED', 32),
+                queue_timeout=getattr(config, 'OLLAMA_QUEUE_TIMEOUT', 60.0)
+            )
+        return _default_scheduler
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+On-disk response cache for Llamita
+Returns stored Ollama answers instantly when the exact same prompt is sent again
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+# Ollama samples with this temperature when the request does not set one
+OLLAMA_DEFAULT_TEMPERATURE = 0.8
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str = "response_cache", ttl: float = 24 * 60 * 60,
+                 max_entries: int = 500, max_bytes: int = 20 * 1024 * 1024):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_dir: Directory that holds one JSON file per cached response
+            ttl: Seconds a cached response stays valid
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of the cache directory
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = {}  # key -> (last_used, size_in_bytes)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Build the in-memory index from the files already on disk"""
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    self._index[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+        except Exception as e:
+            print(f"Response cache error: {e}")
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def is_cacheable(options: Optional[Dict], force: bool = False) -> bool:
+        """
+        Check whether a request is deterministic enough to cache
+
+        Args:
+            options: Ollama model options sent with the request
+            force: Cache even when sampling with temperature > 0
+
+        Returns:
+            True if responses for this request may be cached
+        """
+        if force:
+            return True
+        temperature = (options or {}).get("temperature", OLLAMA_DEFAULT_TEMPERATURE)
+        return temperature <= 0
+
+    @staticmethod
+    def make_key(model: str, options: Optional[Dict], prompt: str) -> str:
+        """Build a cache key from the model, its options and the assembled prompt"""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        key_source = json.dumps(
+            {"model": model, "options": options or {}, "prompt": prompt_hash},
+            sort_keys=True
+        )
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired"""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+
+            path = self._entry_path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except Exception:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Touch the entry so size-based eviction drops least recently used answers first
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+            self._index[key] = (now, self._index[key][1])
+            self.hits += 1
+            return entry.get("response")
+
+    def put(self, key: str, response: str, model: str = ""):
+        """Store a response and evict old entries if the cache is over its limits"""
+        entry = {
+            "created_at": time.time(),
+            "model": model,
+            "response": response
+        }
+        with self._lock:
+            path = self._entry_path(key)
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                self._index[key] = (time.time(), os.path.getsize(path))
+            except Exception as e:
+                print(f"Response cache error: {e}")
+                return
+            self._enforce_limits()
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _enforce_limits(self):
+        """Evict least recently used entries until the cache fits its limits"""
+        total_bytes = sum(size for _, size in self._index.values())
+        if len(self._index) <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        for key, (_, size) in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if len(self._index) <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            total_bytes -= size
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._index),
+                'size_bytes': sum(size for _, size in self._index.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Semantic response cache for Llamita
+Reuses answers for paraphrased questions by comparing question embeddings
+"""
+
+import math
+import time
+import threading
+import importlib
+import importlib.util
+from typing import Callable, Dict, List, Optional
+
+# numpy is optional and only imported on the first lookup to keep startup fast
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+class SemanticCache:
+    def __init__(self, embed_fn: Callable[[str], Optional[List[float]]], threshold: float = 0.92,
+                 max_entries: int = 200, max_age: float = 7 * 24 * 60 * 60):
+        """
+        Initialize the semantic cache
+
+        Args:
+            embed_fn: Function returning an embedding vector for a text (or None on failure)
+            threshold: Minimum cosine similarity for two questions to count as the same
+            max_entries: Maximum number of cached questions (least recently used are evicted)
+            max_age: Seconds a cached answer stays valid
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = []  # dicts with question, answer, scope, created_at, last_used
+        self._vectors = []  # unit-length embeddings, parallel to _entries
+        self._matrix = None  # stacked _vectors, rebuilt lazily when numpy is available
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        """Embed a text and normalize it to unit length"""
+        try:
+            vector = self.embed_fn(text)
+        except Exception as e:
+            print(f"Semantic cache embedding error: {e}")
+            return None
+        if not vector:
+            return None
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            return None
+        return [value / norm for value in vector]
+
+    def find_similar(self, question: str, scope: str = "", embedding: Optional[List[float]] = None) -> Optional[Dict]:
+        """
+        Find the closest cached question within the similarity threshold
+
+        Args:
+            question: The incoming user message
+            scope: Identifier of the document set (and model) the answer must match
+            embedding: Precomputed unit-length embedding of the question
+
+        Returns:
+            Dict with the cached question, answer and similarity, or None
+        """
+        if embedding is None:
+            embedding = self.embed(question)
+        if embedding is None:
+            return None
+
+        with self._lock:
+            self._expire()
+            similarities = self._similarities(embedding)
+
+            best_index = None
+            best_similarity = self.threshold
+            for index, similarity in enumerate(similarities):
+                if similarity >= best_similarity and self._entries[index]["scope"] == scope:
+                    best_index = index
+                    best_similarity = similarity
+
+            if best_index is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_index]
+            entry["last_used"] = time.time()
+            self.hits += 1
+            return {
+                "question": entry["question"],
+                "answer": entry["answer"],
+                "similarity": round(float(best_similarity), 4)
+            }
+
+    def add(self, question: str, answer: str, scope: str = "", embedding: Optional[List[float]] = None):
+        """Store the answer to a question"""
+        if embedding is None:
+            embedding = self.embed(question)
+        if embedding is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries.append({
+                "question": question,
+                "answer": answer,
+                "scope": scope,
+                "created_at": now,
+                "last_used": now
+            })
+            self._vectors.append(embedding)
+            self._matrix = None
+
+            self._expire()
+            while len(self._entries) > self.max_entries:
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+                self._drop(oldest)
+
+    def _similarities(self, embedding: List[float]) -> List[float]:
+        """Cosine similarity between the embedding and every cached question"""
+        if not self._vectors:
+            return []
+
+        if NUMPY_AVAILABLE:
+            np = importlib.import_module("numpy")
+            if self._matrix is None:
+                self._matrix = np.asarray(self._vectors, dtype=np.float32)
+            if self._matrix.shape[1] != len(embedding):
+                return [0.0] * len(self._vectors)
+            return (self._matrix @ np.asarray(embedding, dtype=np.float32)).tolist()
+
+        return [
+            sum(a * b for a, b in zip(vector, embedding)) if len(vector) == len(embedding) else 0.0
+            for vector in self._vectors
+        ]
+
+    def _expire(self):
+        """Drop entries older than max_age"""
+        cutoff = time.time() - self.max_age
+        for index in range(len(self._entries) - 1, -1, -1):
+            if self._entries[index]["created_at"] < cutoff:
+                self._drop(index)
+
+    def _drop(self, index: int):
+        del self._entries[index]
+        del self._vectors[index]
+        self._matrix = None
+
+    def clear(self):
+        """Remove every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._matrix = None
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Multi-session support for Llamita
+Many independent conversations sharing one document library and one Ollama client
+"""
+
+import os
+import re
+import json
+import time
+import functools
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Union
+
+import metrics
+from chat_engine import ChatEngine, Session
+from request_scheduler import INTERACTIVE
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class FairScheduler:
+    def __init__(self, max_concurrent: Union[int, Callable[[], int]] = 2):
+        """
+        Run jobs round-robin across sessions
+
+        Each session's jobs run one at a time and in order (its history stays
+        consistent), while up to max_concurrent sessions run in parallel. A
+        session with many queued messages cannot hold back the others: after
+        each job it goes to the back of the line.
+
+        Args:
+            max_concurrent: Number of jobs running at the same time, or a function
+                            returning it (checked before each job, so the limit can
+                            follow e.g. the number of healthy Ollama backends)
+        """
+        self._limit = max_concurrent if callable(max_concurrent) else (lambda: max_concurrent)
+        self._queues: Dict[str, deque] = {}
+        self._ready = deque()
+        self._running = set()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._ensure_workers()
+
+    @property
+    def max_concurrent(self) -> int:
+        return max(1, self._limit())
+
+    def _ensure_workers(self):
+        """Start worker threads up to the current limit (call with _condition held or before use)"""
+        while len(self._workers) < self.max_concurrent:
+            worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"chat-worker-{len(self._workers)}")
+            self._workers.append(worker)
+            worker.start()
+
+    def submit(self, key: str, function: Callable, *args, **kwargs) -> Future:
+        """Queue a job for a session; returns a Future with its result"""
+        future = Future()
+        with self._condition:
+            queue = self._queues.setdefault(key, deque())
+            queue.append((future, function, args, kwargs))
+            if key not in self._running and len(queue) == 1:
+                self._ready.append(key)
+            self._ensure_workers()
+            metrics.registry.gauge("chat_queue_depth", "Chat turns waiting for a worker").set(self.pending())
+            self._condition.notify()
+        return future
+
+    def pending(self) -> int:
+        """Number of queued jobs that have not started"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def is_busy(self, key: str) -> bool:
+        with self._condition:
+            return key in self._running or bool(self._queues.get(key))
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                # Workers beyond a limit that has since shrunk stay idle; the timeout
+                # picks up a limit that grew without a new submission
+                while not self._ready or len(self._running) >= self.max_concurrent:
+                    self._condition.wait(timeout=1.0)
+                key = self._ready.popleft()
+                future, function, args, kwargs = self._queues[key].popleft()
+                self._running.add(key)
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._condition:
+                self._running.discard(key)
+                if self._queues[key]:
+                    self._ready.append(key)
+                else:
+                    del self._queues[key]
+                # A slot is free, maybe for another session's job
+                self._condition.notify()
+                metrics.registry.gauge("chat_queue_depth", "Chat turns waiting for a worker").set(self.pending())
+
+
+class SessionManager:
+    def __init__(self, chat_engine: ChatEngine, storage_dir: str = "sessions", max_sessions: int = 100,
+                 idle_timeout: float = 30 * 60, max_concurrent: Optional[int] = None, max_history_length: int = 10):
+        """
+        Initialize the session manager
+
+        Args:
+            chat_engine: Engine shared by all sessions (document library and Ollama client)
+            storage_dir: Directory where evicted sessions are saved
+            max_sessions: Sessions kept in memory; the least recently used are saved to disk
+            idle_timeout: Seconds without activity before a session is moved to disk
+            max_concurrent: Chat turns generated at the same time (None follows the interactive
+                            capacity of the Ollama request scheduler, which grows with the
+                            number of healthy backends)
+            max_history_length: Exchanges kept per session
+        """
+        self.chat_engine = chat_engine
+        self.storage_dir = storage_dir
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_history_length = max_history_length
+        if max_concurrent is None:
+            max_concurrent = functools.partial(chat_engine.ollama_client.scheduler.capacity, INTERACTIVE)
+        self.scheduler = FairScheduler(max_concurrent)
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        os.makedirs(storage_dir, exist_ok=True)
+
+    @staticmethod
+    def is_valid_id(session_id: str) -> bool:
+        return bool(session_id and SESSION_ID_PATTERN.match(session_id))
+
+    def _session_file(self, session_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{session_id}.json")
+
+    def create_session(self) -> Session:
+        session = self.chat_engine.new_session(max_history_length=self.max_history_length)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._evict_overflow()
+        return session
+
+    def get_session(self, session_id: str, create: bool = False) -> Optional[Session]:
+        """
+        Get a session from memory, or load it back from disk
+
+        Sessions evicted by this manager are restored as they were; other
+        saved conversations are resumed from their most recent exchanges.
+
+        Args:
+            session_id: Session identifier
+            create: Create the session if it does not exist
+
+        Returns:
+            The session, or None if it does not exist (or the id is invalid)
+        """
+        if not self.is_valid_id(session_id):
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_active = time.time()
+                return session
+
+            session = self._load_session(session_id) or self.chat_engine.resume_session(
+                session_id, self.max_history_length)
+            if session is None:
+                if not create:
+                    return None
+                session = self.chat_engine.new_session(session_id, self.max_history_length)
+            self._sessions[session_id] = session
+            self._evict_overflow()
+            return session
+
+    def delete_session(self, session_id: str) -> bool:
+        if not self.is_valid_id(session_id):
+            return False
+        with self._lock:
+            existed = self._sessions.pop(session_id, None) is not None
+            session_file = self._session_file(session_id)
+            if os.path.exists(session_file):
+                os.remove(session_file)
+                existed = True
+            if self.chat_engine.conversation_store and self.chat_engine.conversation_store.delete(session_id):
+                existed = True
+            return existed
+
+    def list_sessions(self) -> List[Dict]:
+        """Sessions in memory, most recently used last"""
+        with self._lock:
+            return [
+                {"session_id": session.session_id, "messages": len(session.history),
+                 "last_active": session.last_active}
+                for session in self._sessions.values()
+            ]
+
+    def chat(self, session: Session, message: str, on_token: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        Queue a chat turn for a session
+
+        Returns:
+            Future resolving to the answer (None on an Ollama error); raises
+            requests.exceptions.RequestException if Ollama cannot be reached
+        """
+        return self.scheduler.submit(session.session_id, self.chat_engine.chat, session, message, on_token)
+
+    def respond(self, session: Session, message: str, on_token: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue an answer without recording it in the session history"""
+        return self.scheduler.submit(session.session_id, self.chat_engine.respond, session, message, on_token)
+
+    # Eviction
+
+    def evict_idle(self) -> int:
+        """Save sessions idle for longer than idle_timeout to disk; returns how many were evicted"""
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [session_id for session_id, session in self._sessions.items() if session.last_active < cutoff]
+            evicted = sum(1 for session_id in idle if self._evict(session_id))
+            metrics.registry.gauge("sessions_in_memory", "Chat sessions held in memory").set(len(self._sessions))
+        if evicted:
+            print(f"💤 Moved {evicted} idle session(s) to disk")
+        return evicted
+
+    def _evict_overflow(self):
+        """Save the least recently used sessions to disk while over max_sessions"""
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            self._evict(session_id)
+        metrics.registry.gauge("sessions_in_memory", "Chat sessions held in memory").set(len(self._sessions))
+
+    def _evict(self, session_id: str) -> bool:
+        # Sessions with queued or running turns stay in memory
+        if self.scheduler.is_busy(session_id):
+            return False
+        session = self._sessions.pop(session_id)
+        self._save_session(session)
+        metrics.registry.counter("sessions_evicted_total", "Sessions moved from memory to disk").inc()
+        return True
+
+    def _save_session(self, session: Session):
+        try:
+            session_file = self._session_file(session.session_id)
+            temp_file = session_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(session.to_dict(), f, ensure_ascii=False)
+            os.replace(temp_file, session_file)
+        except Exception as e:
+            print(f"Error saving session {session.session_id}: {e}")
+
+    def _load_session(self, session_id: str) -> Optional[Session]:
+        session_file = self._session_file(session_id)
+        if not os.path.exists(session_file):
+            return None
+        try:
+            with open(session_file, 'r', encoding='utf-8') as f:
+                session = Session.from_dict(json.load(f))
+            os.remove(session_file)
+            return session
+        except Exception as e:
+            print(f"Error loading session {session_id}: {e}")
+            return None
+
+    def save_all(self):
+        """Save every session in memory to disk (e.g. on shutdown)"""
+        with self._lock:
+            for session in self._sessions.values():
+                self._save_session(session)
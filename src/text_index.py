@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Inverted index with BM25 ranking
+Shared full-text search machinery for Llamita's stored text (conversations, documents)
+"""
+
+import re
+import math
+import threading
+import importlib
+import importlib.util
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# numpy is optional and only imported on the first search to keep startup fast
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it", "of",
+    "on", "or", "so", "that", "the", "their", "then", "there", "these", "they", "this", "to", "was",
+    "will", "with", "you", "i", "me", "my", "we", "what", "do", "does", "did"
+}
+MAX_TERM_FREQUENCY = 65535
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words and numbers, without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class TextIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Append-only inverted index
+
+        Texts get consecutive numbers as they are added. Postings are kept in
+        compact arrays (a doc number and a term frequency per entry), so
+        hundreds of thousands of short texts fit in tens of megabytes.
+        Removed texts are only masked out of results.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = array('I')
+        self._removed = set()
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._lengths) - len(self._removed)
+
+    def add(self, text: str) -> int:
+        """Index a text; returns its number"""
+        tokens = tokenize(text)
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        with self._lock:
+            doc = len(self._lengths)
+            self._lengths.append(len(tokens))
+            self._total_length += len(tokens)
+            for token, frequency in frequencies.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = (array('I'), array('H'))
+                postings[0].append(doc)
+                postings[1].append(min(frequency, MAX_TERM_FREQUENCY))
+        return doc
+
+    def remove(self, doc: int):
+        with self._lock:
+            if doc < len(self._lengths) and doc not in self._removed:
+                self._removed.add(doc)
+                self._total_length -= self._lengths[doc]
+
+    def search(self, query: str, limit: int = 10, allowed: Optional[set] = None) -> List[Tuple[int, float]]:
+        """
+        Rank indexed texts against a query with BM25
+
+        Args:
+            query: Search words
+            limit: Maximum number of results
+            allowed: Only consider these text numbers (None for all)
+
+        Returns:
+            (text number, score) pairs, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            count = len(self)
+            if not terms or not count:
+                return []
+            average_length = max(self._total_length / count, 1.0)
+            matched = [(self._postings[term], self._idf(len(self._postings[term][0]), count))
+                       for term in terms if term in self._postings]
+            if not matched:
+                return []
+            if NUMPY_AVAILABLE:
+                return self._search_numpy(matched, average_length, limit, allowed)
+            return self._search_python(matched, average_length, limit, allowed)
+
+    @staticmethod
+    def _idf(document_frequency: int, count: int) -> float:
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _search_python(self, matched, average_length, limit, allowed):
+        scores: Dict[int, float] = {}
+        for (docs, frequencies), idf in matched:
+            for doc, frequency in zip(docs, frequencies):
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(
+            ((doc, score) for doc, score in scores.items()
+             if doc not in self._removed and (allowed is None or doc in allowed)),
+            key=lambda item: item[1], reverse=True
+        )
+        return ranked[:limit]
+
+    def _search_numpy(self, matched, average_length, limit, allowed):
+        np = importlib.import_module("numpy")
+        # Copies, so the arrays can keep growing while results are used
+        lengths = np.array(self._lengths, dtype=np.float32)
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        for (docs, frequencies), idf in matched:
+            docs = np.array(docs, dtype=np.int64)
+            frequencies = np.array(frequencies, dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / average_length)
+            scores[docs] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        if self._removed:
+            scores[np.fromiter(self._removed, dtype=np.int64)] = 0.0
+        if allowed is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            allowed_docs = np.fromiter((doc for doc in allowed if doc < len(scores)), dtype=np.int64)
+            mask[allowed_docs] = True
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(scores[candidates], -limit)[-limit:]]
+        candidates = candidates[np.argsort(scores[candidates])[::-1]]
+        return [(int(doc), float(scores[doc])) for doc in candidates]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "texts": len(self),
+                "terms": len(self._postings),
+                "postings": sum(len(docs) for docs, _ in self._postings.values())
+            }
@@ -13,23 +13,28 @@ import time
 import subprocess
 import sys
 import os
+import importlib.util
 from datetime import datetime
 
-# Import document processor
-try:
-    from document_processor import DocumentProcessor, DocumentUploadDialog
-    DOCUMENT_PROCESSING_AVAILABLE = True
-except ImportError:
-    DOCUMENT_PROCESSING_AVAILABLE = False
+# Document and Google Docs modules are imported when the processors are
+# initialized (in a background thread), not at startup
+DOCUMENT_PROCESSING_AVAILABLE = importlib.util.find_spec("document_processor") is not None
+if not DOCUMENT_PROCESSING_AVAILABLE:
     print("⚠️ Document processing not available - install required dependencies")
 
-# Import Google Docs processor
-try:
-    from google_docs_processor import GoogleDocsProcessor, GoogleDocsUploadDialog
-    GOOGLE_DOCS_AVAILABLE = True
-except ImportError:
-    GOOGLE_DOCS_AVAILABLE = False
+GOOGLE_DOCS_AVAILABLE = importlib.util.find_spec("google_docs_processor") is not None
+if not GOOGLE_DOCS_AVAILABLE:
     print("⚠️ Google Docs integration not available - install required dependencies")
+
+import metrics
+from analytics import Analytics
+from chat_engine import create_chat_engine, register_collectors
+from chat_transcript import ChatTranscript
+from conversation_search import create_conversation_search
+from ollama_client import GenerationCancelled
+from request_scheduler import SchedulerBusy
+from semantic_cache import SemanticCache
+
 try:
     import config
 except ImportError:
@@ -294,18 +299,21 @@ class VoiceAssistant:
                                 fg=config.COLORS['button_bg'], bg=config.COLORS['background'])
         progress_label.pack()
         
-        # Start initialization in background
+        # Start initialization as soon as the loading screen has been drawn
         print("🔄 Starting initialization process...")
-        self.root.after(100, self.initialize_with_loading)
+        self.root.after_idle(self.initialize_with_loading)
     
     def initialize_with_loading(self):
         """Initialize components with loading progress updates"""
         try:
             print("🔄 Step 1: Starting initialization...")
+            self._startup_began = time.perf_counter()
+            self._ui_ready = False
+            self._startup_finished = False
             # Step 1: Initialize basic components
             self.update_loading_status("Setting up components...", "⏳")
-            # Ensure minimum loading time of 3 seconds
-            self.root.after(1000, self.step_2_initialize_processors)
+            # Each step schedules the next one as soon as it is done
+            self.root.after_idle(self.step_2_initialize_processors)
         except Exception as e:
             print(f"❌ Error in initialization: {e}")
             self.hide_loading_screen()
@@ -313,32 +321,17 @@ class VoiceAssistant:
     def step_2_initialize_processors(self):
         """Step 2: Initialize document processors"""
         try:
-            # Initialize processors in background
-            self.document_processor = None
-            self.google_processor = None
-            self._processors_ready = False
+            self.update_loading_status("Initializing AI components...", "⏳")
             
-            def init_processors():
-                try:
-                    if DOCUMENT_PROCESSING_AVAILABLE:
-                        self.document_processor = DocumentProcessor()
-                        print("✅ Document processing initialized")
-                    
-                    if GOOGLE_DOCS_AVAILABLE:
-                        self.google_processor = GoogleDocsProcessor()
-                        print("✅ Google Docs integration initialized")
-                    
-                    self._processors_ready = True
-                except Exception as e:
-                    print(f"⚠️ Error initializing processors: {e}")
+            # Initialize processors in background; the loading screen waits for them
+            self.start_processor_initialization(
+                on_done=lambda: self.root.after(0, self.on_processors_initialized)
+            )
             
-            # Start initialization in background
-            import threading
-            thread = threading.Thread(target=init_processors, daemon=True)
-            thread.start()
+            # Load the model while the rest of the app starts up
+            self.start_model_warm_up()
             
-            self.update_loading_status("Initializing AI components...", "⏳")
-            self.root.after(1000, self.step_3_setup_ui)
+            self.root.after_idle(self.step_3_setup_ui)
         except Exception as e:
             print(f"❌ Error in processor initialization: {e}")
             self.hide_loading_screen()
@@ -347,11 +340,12 @@ class VoiceAssistant:
         """Step 3: Setup UI components"""
         try:
             self.update_loading_status("Setting up interface...", "⏳")
+            phase_start = time.perf_counter()
             self.setup_ui()
             # Store reference to chat_text for later use
             self.chat_text = getattr(self, 'chat_text', None)
-            self.update_loading_status("Cleaning up processes...", "⏳")
-            self.root.after(1000, self.step_4_finalize)
+            self.log_startup_phase("setup_ui", phase_start)
+            self.root.after_idle(self.step_4_finalize)
         except Exception as e:
             print(f"❌ Error in UI setup: {e}")
             self.hide_loading_screen()
@@ -359,19 +353,93 @@ class VoiceAssistant:
     def step_4_finalize(self):
         """Step 4: Finalize initialization"""
         try:
+            self.update_loading_status("Cleaning up processes...", "⏳")
+            phase_start = time.perf_counter()
             self.cleanup_previous_processes()
-            self.update_loading_status("Ready!", "✅")
-            # Add a longer delay to make loading screen more visible
-            self.root.after(2000, self.hide_loading_screen)
+            self.log_startup_phase("finalize", phase_start)
+            self._ui_ready = True
+            self.finish_startup_if_ready()
         except Exception as e:
             print(f"❌ Error in finalization: {e}")
             self.hide_loading_screen()
     
+    def on_processors_initialized(self):
+        """Called on the UI thread once the document processors are initialized"""
+        self.finish_startup_if_ready()
+    
+    def finish_startup_if_ready(self):
+        """Close the loading screen once both the UI and the processors are ready"""
+        if getattr(self, '_startup_finished', False):
+            return
+        if not getattr(self, '_ui_ready', False) or not getattr(self, '_processors_done', False):
+            return
+        
+        self._startup_finished = True
+        self.update_loading_status("Ready!", "✅")
+        self.log_startup_phase("total", self._startup_began)
+        self.hide_loading_screen()
+    
+    def log_startup_phase(self, phase, started_at):
+        """Log how long a startup phase took"""
+        print(f"⏱️ Startup phase '{phase}': {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    
+    def start_processor_initialization(self, on_done=None):
+        """
+        Initialize the document processors in a background thread
+        
+        Args:
+            on_done: Called from the worker thread when initialization has finished
+                     (successfully or not)
+        """
+        self.document_processor = None
+        self.google_processor = None
+        self._processors_ready = False
+        self._processors_done = False
+        
+        def init_processors():
+            global DOCUMENT_PROCESSING_AVAILABLE, GOOGLE_DOCS_AVAILABLE
+            phase_start = time.perf_counter()
+            try:
+                if DOCUMENT_PROCESSING_AVAILABLE:
+                    try:
+                        from document_processor import DocumentProcessor
+                        self.document_processor = DocumentProcessor()
+                        if getattr(self, 'chat_engine', None):
+                            self.chat_engine.document_processor = self.document_processor
+                        print("✅ Document processing initialized")
+                    except ImportError as e:
+                        DOCUMENT_PROCESSING_AVAILABLE = False
+                        print(f"⚠️ Document processing not available: {e}")
+                
+                if GOOGLE_DOCS_AVAILABLE:
+                    try:
+                        from google_docs_processor import GoogleDocsProcessor
+                        self.google_processor = GoogleDocsProcessor()
+                        print("✅ Google Docs integration initialized")
+                    except ImportError as e:
+                        GOOGLE_DOCS_AVAILABLE = False
+                        print(f"⚠️ Google Docs integration not available: {e}")
+                
+                self._processors_ready = True
+            except Exception as e:
+                print(f"⚠️ Error initializing processors: {e}")
+            finally:
+                self._processors_done = True
+                self.log_startup_phase("initialize_processors", phase_start)
+                if on_done:
+                    on_done()
+        
+        thread = threading.Thread(target=init_processors, daemon=True)
+        thread.start()
+    
     def update_loading_status(self, message, icon):
         """Update loading screen status"""
         try:
             self.loading_label.config(text=message)
             self.progress_var.set(icon)
+            # Redraw now; the next step runs right after this one
+            if self.loading_window:
+                self.loading_window.update_idletasks()
         except Exception as e:
             print(f"⚠️ Error updating loading status: {e}")
     
@@ -416,10 +484,38 @@ class VoiceAssistant:
         self.voice_input_enabled = False
         self.is_listening = False
         self.ollama_url = config.OLLAMA_URL
+        self.model_state = "unknown"  # unknown, loading, ready or unavailable
+        self._responding = False  # A response is being generated in the background
+        
+        # Chat core (Ollama client, response cache, routing, summaries, saved conversations),
+        # configured the same way as the command line chat and the API server; documents are attached once loaded
+        self.chat_engine = create_chat_engine(getattr(self, 'document_processor', None))
+        self.ollama_client = self.chat_engine.ollama_client
+        self.response_cache = self.chat_engine.response_cache
+        self.session = self.chat_engine.new_session(max_history_length=10)
+        self.conversation_search = create_conversation_search(self.chat_engine.conversation_store)
         
-        # Conversation context
-        self.conversation_history = []
-        self.max_history_length = 10
+        # Optional cache for answers to paraphrased questions
+        self.semantic_cache = None
+        if getattr(config, 'SEMANTIC_CACHE_ENABLED', False):
+            self.semantic_cache = SemanticCache(
+                self.get_embedding,
+                threshold=getattr(config, 'SEMANTIC_CACHE_THRESHOLD', 0.92),
+                max_entries=getattr(config, 'SEMANTIC_CACHE_MAX_ENTRIES', 200),
+                max_age=getattr(config, 'SEMANTIC_CACHE_MAX_AGE', 7 * 24 * 60 * 60)
+            )
+        
+        # Usage events (saved only if ANALYTICS_ENABLED) and the optional metrics endpoint
+        self.analytics = Analytics(
+            enabled=getattr(config, 'ANALYTICS_ENABLED', False),
+            analytics_file=getattr(config, 'ANALYTICS_FILE', "llamita_analytics.jsonl"),
+            flush_interval=getattr(config, 'ANALYTICS_FLUSH_INTERVAL', 2.0),
+            max_bytes=getattr(config, 'ANALYTICS_MAX_BYTES', 5 * 1024 * 1024)
+        )
+        self.analytics.track_app_start()
+        self.metrics_exporter = None
+        if getattr(config, 'METRICS_EXPORTER_ENABLED', False):
+            self.start_metrics_exporter()
         
         # Voice input state (text responses only)
         self.voice_input_enabled = False
@@ -429,29 +525,11 @@ class VoiceAssistant:
         try:
             print("🔄 Initializing components directly...")
             
-            # Initialize processors
-            self.document_processor = None
-            self.google_processor = None
-            self._processors_ready = False
-            
-            def init_processors():
-                try:
-                    if DOCUMENT_PROCESSING_AVAILABLE:
-                        self.document_processor = DocumentProcessor()
-                        print("✅ Document processing initialized")
-                    
-                    if GOOGLE_DOCS_AVAILABLE:
-                        self.google_processor = GoogleDocsProcessor()
-                        print("✅ Google Docs integration initialized")
-                    
-                    self._processors_ready = True
-                except Exception as e:
-                    print(f"⚠️ Error initializing processors: {e}")
+            # Initialize processors in background
+            self.start_processor_initialization()
             
-            # Start initialization in background
-            import threading
-            thread = threading.Thread(target=init_processors, daemon=True)
-            thread.start()
+            # Load the model while the UI is being set up
+            self.start_model_warm_up()
             
             # Setup UI immediately
             print("🔄 Setting up UI...")
@@ -514,6 +592,18 @@ class VoiceAssistant:
         )
         status_frame.pack_propagate(False)
         status_frame.configure(height=40)
+        
+        # Model readiness indicator
+        self.model_status_label = tk.Label(
+            status_frame,
+            text="",
+            font=("Helvetica", 11),
+            fg=config.COLORS['text_secondary'],
+            bg=config.COLORS['secondary']
+        )
+        self.model_status_label.pack(side=tk.RIGHT, padx=10)
+        self.update_model_status()
+        
         self.status_label.pack(expand=True)
         
         # Control buttons frame
@@ -530,6 +620,28 @@ class VoiceAssistant:
             )
             self.upload_button.pack(side=tk.LEFT)
         
+        # Metrics debug panel button (debug mode only; Ctrl+Shift+M always works)
+        if getattr(config, 'ENABLE_DEBUG_MODE', False):
+            self.metrics_button = ttk.Button(
+                control_frame,
+                text="Metrics",
+                command=self.open_metrics_panel,
+                style='Rounded.TButton'
+            )
+            self.metrics_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.root.bind('<Control-Shift-KeyPress-M>', lambda e: self.open_metrics_panel())
+        
+        # Search past conversations (Ctrl+F)
+        if self.conversation_search:
+            self.history_button = ttk.Button(
+                control_frame,
+                text="History",
+                command=self.open_history_search,
+                style='Rounded.TButton'
+            )
+            self.history_button.pack(side=tk.LEFT, padx=(10, 0))
+            self.root.bind('<Control-KeyPress-f>', lambda e: self.open_history_search())
+        
         # Clear conversation button with improved responsiveness
         self.clear_button = ttk.Button(
             control_frame,
@@ -609,6 +721,14 @@ class VoiceAssistant:
         )
         self.chat_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
         
+        # Only recent messages stay in the widget; older ones are loaded from the conversation store on scroll
+        self.transcript = ChatTranscript(
+            self.chat_text,
+            loader=self.load_transcript_range,
+            window_size=getattr(config, 'TRANSCRIPT_WINDOW_MESSAGES', 200),
+            page_size=getattr(config, 'TRANSCRIPT_PAGE_SIZE', 50)
+        )
+        
         # Add welcome message
         welcome_msg = "Llamita: Hello! I'm Llamita, your intelligent AI assistant. I'm here to help you with any questions, tasks, or conversations you might have. Simply type your message and I'll respond."
         
@@ -670,7 +790,7 @@ class VoiceAssistant:
     def send_message(self, event=None):
         """Send a text message to the assistant"""
         text = self.input_entry.get().strip()
-        if not text:
+        if not text or self._responding:
             return
         
         # Clear input and restore focus for better responsiveness
@@ -678,24 +798,86 @@ class VoiceAssistant:
         self.input_entry.focus_set()
         
         # Add user message to chat
-        self.add_to_chat(f"You: {text}")
+        self.transcript.add_message("user", text)
         
-        # Add to conversation history
-        self.conversation_history.append({"role": "user", "content": text})
+        self.analytics.track_message_sent(len(text))
         
-        # Get AI response with context
+        # Get AI response with context (the exchange is added to the session history).
+        # Everything that talks to Ollama runs in a worker thread; streamed tokens are drawn
+        # by the transcript a frame at a time
         self.update_status("Getting AI response...", "yellow")
-        response = self.get_ollama_response_with_context(text)
+        self._responding = True
+        stream_id = self.transcript.begin_stream()
+        thread = threading.Thread(target=self.respond_in_background, args=(text, self.session, stream_id),
+                                  daemon=True)
+        thread.start()
+    
+    def respond_in_background(self, text, session, stream_id):
+        """Answer a message from the semantic cache or Ollama (runs in a worker thread)"""
+        match, query_embedding = self.find_semantic_match(text)
+        if match is None:
+            self.generate_response(text, session, stream_id, query_embedding)
+        elif getattr(config, 'SEMANTIC_CACHE_MODE', "offer") == "serve":
+            self.call_in_ui(self.use_cached_answer, text, session, stream_id, match["answer"])
+        else:
+            self.call_in_ui(self.offer_cached_answer, text, session, stream_id, match, query_embedding)
+    
+    def generate_response(self, text, session, stream_id, query_embedding=None):
+        """Generate an answer with Ollama (runs in a worker thread)"""
+        def on_token(piece):
+            # The transcript no longer shows this answer (the chat was cleared): stop generating
+            if not self.transcript.stream_token(stream_id, piece):
+                raise GenerationCancelled()
         
+        response = self.get_ollama_response_with_context(text, session, on_token=on_token)
+        if response and query_embedding is not None:
+            self.semantic_cache.add(text, response, scope=self.get_semantic_cache_scope(),
+                                    embedding=query_embedding)
+        self.call_in_ui(self.on_response, session, stream_id, response)
+    
+    def call_in_ui(self, function, *args):
+        """Run function on the Tk thread (from a worker thread)"""
+        try:
+            self.root.after(0, lambda: function(*args))
+        except Exception as e:
+            # The window was closed while the answer was generated
+            print(f"⚠️ Error updating the chat: {e}")
+    
+    def offer_cached_answer(self, text, session, stream_id, match, query_embedding):
+        """Ask whether to reuse the answer to a similar earlier question (runs on the UI thread)"""
+        if session is not self.session:
+            return
+        if messagebox.askyesno(
+            "Similar Question",
+            f"You asked something similar before:\n\n\"{match['question']}\"\n\nUse the earlier answer?"
+        ):
+            self.use_cached_answer(text, session, stream_id, match["answer"])
+            return
+        thread = threading.Thread(target=self.generate_response, args=(text, session, stream_id, query_embedding),
+                                  daemon=True)
+        thread.start()
+    
+    def use_cached_answer(self, text, session, stream_id, answer):
+        """Answer from the semantic cache (runs on the UI thread)"""
+        if session is not self.session:
+            return
+        self.chat_engine.record_cached_answer(session, text, answer)
+        self.on_response(session, stream_id, answer)
+    
+    def on_response(self, session, stream_id, response):
+        """Show a response (runs on the UI thread)"""
+        if session is not self.session:
+            # The chat was cleared while the answer was generated
+            return
+        self._responding = False
+        self.transcript.end_stream(stream_id, response)
+        self.finish_response(response)
+    
+    def finish_response(self, response):
+        """Record analytics and report the outcome of a message"""
         if response:
-            self.add_to_chat(f"Llamita: {response}")
-            # Add response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": response})
-            
-            # Keep conversation history manageable
-            if len(self.conversation_history) > self.max_history_length * 2:
-                self.conversation_history = self.conversation_history[-self.max_history_length * 2:]
-            
+            self.analytics.track_response_received(len(response))
+            self.analytics.track_turn(self.session.last_turn_timings)
             self.update_status("Response received", "green")
         else:
             self.add_to_chat("Llamita: ❌ Sorry, I couldn't get a response. Please check that:")
@@ -719,6 +901,46 @@ class VoiceAssistant:
         self.status_label.config(text=f"Status: {message}", fg=color)
         self.root.update_idletasks()
     
+    def start_model_warm_up(self):
+        """Load the default model in the background so the first message is fast"""
+        if not getattr(config, 'WARM_UP_MODEL', True):
+            return
+        
+        def warm_up():
+            ready = False
+            for model in self.chat_engine.models():
+                model_ready = self.ollama_client.warm_up(model)
+                print(f"{'✅' if model_ready else '⚠️'} Model {model}: {'ready' if model_ready else 'unavailable'}")
+                ready = ready or model_ready
+            self.set_model_state("ready" if ready else "unavailable")
+        
+        self.set_model_state("loading")
+        thread = threading.Thread(target=warm_up, daemon=True)
+        thread.start()
+    
+    def set_model_state(self, state):
+        """Record model readiness and refresh the status bar from the UI thread"""
+        self.model_state = state
+        try:
+            self.root.after(0, self.update_model_status)
+        except Exception as e:
+            print(f"⚠️ Error updating model status: {e}")
+    
+    def update_model_status(self):
+        """Show model readiness in the status bar"""
+        if not hasattr(self, 'model_status_label'):
+            return
+        
+        states = {
+            "loading": ("⏳ Loading model...", config.COLORS['warning']),
+            "ready": ("🟢 Model ready", config.COLORS['success']),
+            "unavailable": ("🔴 Model not loaded", config.COLORS['error'])
+        }
+        text, color = states.get(self.model_state, ("", config.COLORS['text_secondary']))
+        if text:
+            text = f"{text} ({config.DEFAULT_MODEL})"
+        self.model_status_label.config(text=text, fg=color)
+    
 
     
     # Voice listening loop (disabled for simplified interface - uncomment for future use)
@@ -728,61 +950,63 @@ class VoiceAssistant:
         pass
     """
     
-    def get_ollama_response_with_context(self, text):
+    def get_ollama_response_with_context(self, text, session=None, on_token=None):
         """Get response from Ollama with conversation context and document context"""
         try:
-            # Build context from conversation history
-            context_prompt = ""
-            
-            # Add system prompt
-            system_prompt = config.SYSTEM_PROMPTS.get("default", "You are Llamita, a helpful AI assistant.")
-            context_prompt += f"{system_prompt}\n\n"
-            
-            # Add document context if available
-            if DOCUMENT_PROCESSING_AVAILABLE and self.document_processor:
-                document_context = self.document_processor.get_document_context(text)
-                if document_context:
-                    context_prompt += f"Relevant document information:\n{document_context}\n\n"
-                    print(f"📄 Added document context for query: {text[:50]}...")
-            
-            # Add conversation history
-            for message in self.conversation_history:
-                if message["role"] == "user":
-                    context_prompt += f"User: {message['content']}\n"
-                elif message["role"] == "assistant":
-                    context_prompt += f"Llamita: {message['content']}\n"
-            
-            # Add current user message
-            context_prompt += f"User: {text}\nLlamita:"
-            
-            # Prepare the request with context
-            data = {
-                "model": config.DEFAULT_MODEL,
-                "prompt": context_prompt,
-                "stream": False
-            }
-            
-            # Send request to Ollama
-            response = requests.post(
-                self.ollama_url,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                print(f"❌ Ollama error: {response.status_code}")
-                return None
+            response = self.chat_engine.chat(session or self.session, text, on_token)
+            if response is not None and self.model_state != "ready":
+                self.set_model_state("ready")
+            return response
                 
+        except GenerationCancelled:
+            print("⏹️ Stopped generating an answer that is no longer shown")
+            return None
+        except SchedulerBusy as e:
+            # Ollama is reachable, just saturated by other work
+            print(f"⏳ Ollama busy: {e}")
+            return None
         except requests.exceptions.RequestException as e:
             print(f"❌ Request error: {e}")
+            self.set_model_state("unavailable")
             return None
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return None
     
+    def get_embedding(self, text):
+        """Get an embedding vector for text from Ollama"""
+        try:
+            return self.ollama_client.embeddings(text, getattr(config, 'EMBEDDING_MODEL', "nomic-embed-text"))
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Embedding request error: {e}")
+        return None
+    
+    def get_semantic_cache_scope(self):
+        """Identify the model and document set a cached answer was produced for"""
+        return f"{config.DEFAULT_MODEL}:{self.chat_engine.corpus_fingerprint()}"
+    
+    def find_semantic_match(self, text):
+        """
+        Look for an earlier answer to a paraphrase of this question
+        
+        Embeds the question with Ollama, so call it from a worker thread.
+        
+        Returns:
+            Tuple of (semantic cache match or None, question embedding or None)
+        """
+        if not self.semantic_cache:
+            return None, None
+        
+        query_embedding = self.semantic_cache.embed(text)
+        if query_embedding is None:
+            return None, None
+        
+        match = self.semantic_cache.find_similar(text, scope=self.get_semantic_cache_scope(),
+                                                 embedding=query_embedding)
+        if match:
+            print(f"⚡ Similar question found ({match['similarity']:.2f}): {match['question'][:50]}")
+        return match, query_embedding
+    
     def get_ollama_response(self, text):
         """Get response from Ollama (legacy method - kept for compatibility)"""
         return self.get_ollama_response_with_context(text)
@@ -792,17 +1016,142 @@ class VoiceAssistant:
 
     
     def add_to_chat(self, message):
-        """Add message to chat display"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n\n"
+        """Add a note (not part of the saved conversation) to the chat display"""
+        # The transcript scrolls once per idle period instead of redrawing after every insert
+        self.transcript.add_note(message)
+    
+    def load_transcript_range(self, start, end):
+        """Saved messages start..end-1 of the current conversation, for paging the transcript"""
+        store = self.chat_engine.conversation_store if getattr(self, 'chat_engine', None) else None
+        if not store or not getattr(self, 'session', None):
+            return []
+        return store.load_range(self.session.session_id, start, end)
+    
+
+    
+    def start_metrics_exporter(self):
+        """Serve metrics over HTTP and register gauges for cache and document stats"""
+        from metrics_exporter import MetricsExporter
         
-        self.chat_text.insert(tk.END, formatted_message)
-        self.chat_text.see(tk.END)
+        exporter = MetricsExporter(
+            host=getattr(config, 'METRICS_EXPORTER_HOST', "127.0.0.1"),
+            port=getattr(config, 'METRICS_EXPORTER_PORT', 9464)
+        )
+        if exporter.start():
+            self.metrics_exporter = exporter
+            # Same cache and chunk store gauges as the API server's /metrics
+            register_collectors(self.chat_engine, self.semantic_cache)
+    
+    def open_metrics_panel(self):
+        """Open a debug window showing request timings and metrics"""
+        if getattr(self, 'metrics_window', None) and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
         
-        # Update the display
-        self.root.update_idletasks()
+        self.metrics_window = tk.Toplevel(self.root)
+        self.metrics_window.title("🦙 Llamita - Metrics")
+        self.metrics_window.geometry("520x600")
+        self.metrics_window.configure(bg=config.COLORS['background'])
+        
+        metrics_text = scrolledtext.ScrolledText(
+            self.metrics_window,
+            wrap=tk.NONE,
+            font=("Courier", 11),
+            bg=config.COLORS['secondary'],
+            fg=config.COLORS['text']
+        )
+        metrics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def refresh():
+            if not self.metrics_window.winfo_exists():
+                return
+            try:
+                # The timings are filled in by the thread generating the answer, so work on a copy
+                session = self.session
+                with session.lock:
+                    timings = dict(session.last_turn_timings)
+                lines = ["Last request:"]
+                for name, value in timings.items():
+                    lines.append(f"  {name:22s} {value}")
+                
+                lines.append("")
+                lines.append(f"{'metric':30s} {'count':>6s} {'p50':>9s} {'p95':>9s}")
+                for name, snapshot in sorted(metrics.registry.snapshot().items()):
+                    if snapshot["type"] == "histogram":
+                        lines.append(f"{name:30s} {snapshot['count']:6d} {snapshot['p50']:9.1f} {snapshot['p95']:9.1f}")
+                    else:
+                        lines.append(f"{name:30s} {snapshot['value']:6.0f}")
+                
+                metrics_text.delete(1.0, tk.END)
+                metrics_text.insert(tk.END, "\n".join(lines))
+            except Exception as e:
+                print(f"⚠️ Error refreshing metrics panel: {e}")
+            finally:
+                self.metrics_window.after(1000, refresh)
+        
+        refresh()
     
-
+    def open_history_search(self):
+        """Open a window for searching saved conversations"""
+        if getattr(self, 'history_window', None) and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
+        
+        self.history_window = tk.Toplevel(self.root)
+        self.history_window.title("🦙 Llamita - Search Conversations")
+        self.history_window.geometry("640x520")
+        self.history_window.configure(bg=config.COLORS['background'])
+        
+        query_entry = tk.Entry(
+            self.history_window,
+            font=("Arial", 13),
+            bg=config.COLORS['secondary'],
+            fg=config.COLORS['text'],
+            insertbackground=config.COLORS['text']
+        )
+        query_entry.pack(fill=tk.X, padx=10, pady=(10, 0))
+        query_entry.focus_set()
+        
+        results_text = scrolledtext.ScrolledText(
+            self.history_window,
+            wrap=tk.WORD,
+            font=("Arial", 12),
+            bg=config.COLORS['secondary'],
+            fg=config.COLORS['text']
+        )
+        results_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def show_results(query, results, elapsed_ms):
+            if not self.history_window.winfo_exists():
+                return
+            lines = [f"{len(results)} result(s) for '{query}' in {elapsed_ms:.0f} ms"]
+            if not self.conversation_search.ready.is_set():
+                lines.append("(still indexing older conversations)")
+            for result in results:
+                when = datetime.fromtimestamp(result.get("ts", 0)).strftime("%Y-%m-%d %H:%M")
+                speaker = "You" if result["role"] == "user" else "Llamita"
+                lines.append(f"\n{when}  [{result['conversation_id']}]\n{speaker}: {result['content'][:500]}")
+            results_text.delete(1.0, tk.END)
+            results_text.insert(tk.END, "\n".join(lines))
+        
+        def search(event=None):
+            query = query_entry.get().strip()
+            if not query:
+                return
+            
+            def search_worker():
+                start_time = time.perf_counter()
+                try:
+                    results = self.conversation_search.search(query, limit=20)
+                except Exception as e:
+                    print(f"❌ Conversation search error: {e}")
+                    results = []
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                self.root.after(0, lambda: show_results(query, results, elapsed_ms))
+            
+            threading.Thread(target=search_worker, daemon=True).start()
+        
+        query_entry.bind('<Return>', search)
     
     def open_document_upload(self):
         """Open the document upload dialog"""
@@ -837,10 +1186,12 @@ class VoiceAssistant:
                 self.document_processor.load_documents()
             
             if GOOGLE_DOCS_AVAILABLE and self.google_processor:
+                from google_docs_processor import GoogleDocsUploadDialog
                 print("📄 Using Google Docs dialog...")
                 # Use enhanced dialog with Google Docs support
                 dialog = GoogleDocsUploadDialog(self.root, self.document_processor, self.google_processor)
             else:
+                from document_processor import DocumentUploadDialog
                 print("📄 Using basic dialog...")
                 # Use basic dialog
                 dialog = DocumentUploadDialog(self.root, self.document_processor)
@@ -857,9 +1208,10 @@ class VoiceAssistant:
             self._dialog_open = False
     
     def clear_chat(self):
-        """Clear the chat display and conversation history"""
-        self.chat_text.delete(1.0, tk.END)
-        self.conversation_history.clear()
+        """Clear the chat display and start a new conversation (the old one stays saved)"""
+        self.session = self.chat_engine.new_session(max_history_length=10)
+        self._responding = False
+        self.transcript.reset()
         self.add_to_chat("Llamita: Chat cleared. How can I help you?")
     
     def on_closing(self):
@@ -867,6 +1219,12 @@ class VoiceAssistant:
         if not self._closing:
             self._closing = True
             print("🔄 Closing Llamita...")
+            if getattr(self, 'metrics_exporter', None):
+                self.metrics_exporter.stop()
+            if getattr(self, 'analytics', None):
+                self.analytics.close()
+            if getattr(self, 'chat_engine', None) and self.chat_engine.conversation_store:
+                self.chat_engine.conversation_store.close()
             self.root.destroy()
             print("✅ Llamita closed successfully")
 